@@ -1,7 +1,17 @@
+import sys
+import importlib.util
+from pathlib import Path
+
+repo_root = Path(__file__).resolve().parents[1]
+bootstrap_path = repo_root / "scripts" / "bootstrap.py"
+spec = importlib.util.spec_from_file_location("bootstrap", bootstrap_path)
+bootstrap = importlib.util.module_from_spec(spec)
+sys.modules["bootstrap"] = bootstrap
+spec.loader.exec_module(bootstrap)
 import pandas as pd
 import joblib
-import requests
 import os
+from providers.http_client import http_get
 
 def get_odds():
     # Fetch NBA player prop odds from SportsDataIO
@@ -17,7 +27,7 @@ def get_odds():
         url = f"https://api.sportsdata.io/v3/nba/odds/json/PlayerPropsByDate/{date_str}"
         print(f"Requesting NBA player props for {date_str}...")
         try:
-            response = requests.get(url, headers=headers, timeout=30)
+            response = http_get(url, headers=headers, timeout=30)
             with open(f"output/odds_raw_{date_str}.json", "w", encoding="utf-8") as f:
                 f.write(response.text)
             if response.status_code != 200:
@@ -1,3 +1,107 @@
+"""
+implied_totals.py
+
+Implied team scores from Vegas totals and spreads.
+
+The whole slate is handled as one odds frame (one row per book/market/outcome,
+as produced by providers.odds_store): each book's main total and home spread
+are reduced to a consensus per game across books (median, or a weighted mean
+when book weights are given) in a few groupbys, then converted to implied
+scores. Cost is linear in the number of odds rows.
+
+Functions:
+    odds_frame_from_games(games): Flatten fetch_nba_games_and_markets-style games into an odds frame.
+    calculate_consensus_implied_scores(odds_df, book_weights=None): One row per game with consensus lines and implied scores.
+    team_implied_totals(games_df): One row per team, for joining onto player projections.
+    calculate_implied_scores(game): Implied scores for a single game dict.
+"""
+import numpy as np
+import pandas as pd
+from providers.odds_store import OUTCOME_COLUMNS, flatten_odds_payload
+
+GAME_COLUMNS = [
+    "game_id", "home_team", "away_team", "commence_time", "consensus_total",
+    "consensus_spread", "books", "home_implied_score", "away_implied_score"
+]
+
+
+def odds_frame_from_games(games):
+    events = [{**game, "id": game.get("game_id") or game.get("id")} for game in games]
+    return pd.DataFrame(list(flatten_odds_payload(events)), columns=OUTCOME_COLUMNS)
+
+
+def _main_line(df):
+    """
+    Per (event, book), the main line: the point whose price is closest to even
+    money (alternate lines are priced further from it); ties take the median point.
+    """
+    df = df.dropna(subset=["point"])
+    if df.empty:
+        return pd.DataFrame(columns=["event_id", "bookmaker", "point"])
+    price = df["price"].astype(float)
+    # American odds are |price| >= 100; anything else is decimal.
+    prob = np.where(price.abs() >= 100,
+                    np.where(price > 0, 100 / (price + 100), -price / (100 - price)),
+                    1 / price)
+    juice = pd.Series(np.abs(prob - 0.5), index=df.index).fillna(1.0)
+    best = juice.groupby([df["event_id"], df["bookmaker"]]).transform("min")
+    df = df[juice == best]
+    return df.groupby(["event_id", "bookmaker"], as_index=False)["point"].median()
+
+
+def _consensus(per_book, book_weights, name):
+    if per_book.empty:
+        return pd.DataFrame(columns=["event_id", name, f"{name}_books"])
+    grouped = per_book.groupby("event_id")["point"]
+    if book_weights:
+        w = per_book["bookmaker"].map(book_weights).fillna(1.0)
+        value = (per_book["point"] * w).groupby(per_book["event_id"]).sum() / w.groupby(per_book["event_id"]).sum()
+    else:
+        value = grouped.median()
+    return pd.DataFrame({name: value, f"{name}_books": grouped.size()}).reset_index()
+
+
+def calculate_consensus_implied_scores(odds_df, book_weights=None):
+    """
+    Args:
+        odds_df: odds frame with at least event_id, home_team, away_team, commence_time,
+            bookmaker, market, outcome, point, price.
+        book_weights: optional {bookmaker: weight}; unlisted books weigh 1. Without
+            weights the consensus is the median across books.
+    Returns:
+        DataFrame with GAME_COLUMNS, one row per game. consensus_spread is the home
+        team's spread (negative when home is favoured); implied scores are None when
+        a game has no total or no spread.
+    """
+    if odds_df.empty:
+        return pd.DataFrame(columns=GAME_COLUMNS)
+    games = odds_df.drop_duplicates("event_id")[["event_id", "home_team", "away_team", "commence_time"]]
+
+    totals = odds_df[(odds_df["market"] == "totals") & (odds_df["outcome"] == "Over")]
+    spreads = odds_df[(odds_df["market"] == "spreads") & (odds_df["outcome"] == odds_df["home_team"])]
+    total = _consensus(_main_line(totals), book_weights, "consensus_total")
+    spread = _consensus(_main_line(spreads), book_weights, "consensus_spread")
+
+    out = games.merge(total, on="event_id", how="left").merge(spread, on="event_id", how="left")
+    out["books"] = out[["consensus_total_books", "consensus_spread_books"]].max(axis=1).fillna(0).astype(int)
+    # A home favourite at -6 on a 230 total is projected 118-112.
+    out["home_implied_score"] = ((out["consensus_total"] - out["consensus_spread"]) / 2).round(2)
+    out["away_implied_score"] = ((out["consensus_total"] + out["consensus_spread"]) / 2).round(2)
+    out = out.rename(columns={"event_id": "game_id"})[GAME_COLUMNS]
+    return out.astype(object).where(out.notna(), None)
+
+
+def team_implied_totals(games_df):
+    """Long form of calculate_consensus_implied_scores: game_id, team, opponent, is_home, implied_score, consensus_total, consensus_spread."""
+    shared = ["game_id", "consensus_total", "consensus_spread"]
+    home = games_df[shared].assign(team=games_df["home_team"], opponent=games_df["away_team"],
+                                   is_home=True, implied_score=games_df["home_implied_score"])
+    away = games_df[shared].assign(team=games_df["away_team"], opponent=games_df["home_team"],
+                                   is_home=False, implied_score=games_df["away_implied_score"])
+    return pd.concat([home, away], ignore_index=True)[
+        ["game_id", "team", "opponent", "is_home", "implied_score", "consensus_total", "consensus_spread"]]
+
+
 def calculate_implied_scores(game):
     """
     Compute implied team scores from Vegas lines (spreads/totals).
@@ -6,23 +110,11 @@ def calculate_implied_scores(game):
     Returns:
         dict: home_implied_score, away_implied_score
     """
-    total = None
-    spread = None
-    # Find best available total and spread from bookmakers
-    for bookmaker in game.get('bookmakers', []):
-        for market in bookmaker.get('markets', []):
-            if market['key'] == 'totals' and market['outcomes']:
-                total = market['outcomes'][0].get('point')
-            if market['key'] == 'spreads' and market['outcomes']:
-                for outcome in market['outcomes']:
-                    if outcome['name'] == game['home_team']:
-                        spread = outcome.get('point')
-    if total is None or spread is None:
+    scores = calculate_consensus_implied_scores(odds_frame_from_games([game]))
+    if scores.empty:
         return {'home_implied_score': None, 'away_implied_score': None}
-    # Implied scores
-    home_implied = (total + spread) / 2
-    away_implied = (total - spread) / 2
+    row = scores.iloc[0]
     return {
-        'home_implied_score': round(home_implied, 2),
-        'away_implied_score': round(away_implied, 2)
+        'home_implied_score': row['home_implied_score'],
+        'away_implied_score': row['away_implied_score']
     }
@@ -1,10 +1,59 @@
 import logging
 import os
-from providers.balldontlie_provider import BallDontLieProvider
+from providers.balldontlie_provider import BallDontLieProvider, parse_minutes
 from config import PLAYER_POOL_LOG
 
+MIN_AVG_MINUTES = 12
+MIN_GAMES_PLAYED = 3
 
-def build_today_player_pool(games):
+
+def index_slate_players(games, provider, bundle=None):
+    """
+    Single pass over the slate: fetch each team's recent games and each box
+    score exactly once, and build pid -> {name, team, minutes, games}.
+
+    Box scores are shared between teams (two slate teams may have met
+    recently), so they are keyed by game id and fetched at most once. A
+    bundle from analysis.slate_prefetch.prefetch_slate is used first; the
+    provider is only called for anything it is missing.
+    """
+    team_games = dict(bundle['team_games']) if bundle else {}
+    box_scores = dict(bundle['box_scores']) if bundle else {}
+    processed = set()
+    player_index = {}
+    for game in games:
+        for team in [game['home_team'], game['away_team']]:
+            if team in processed:
+                continue
+            processed.add(team)
+            if team not in team_games:
+                team_games[team] = provider.get_recent_team_games(team)
+            for g in team_games[team]:
+                gid = g['id']
+                if gid not in box_scores:
+                    box_scores[gid] = provider.get_game_box_score(gid)
+                for stat in box_scores[gid]:
+                    # Box scores list both sides; only credit players on this team.
+                    stat_team = stat.get('team')
+                    if stat_team and stat_team.lower() != team.lower():
+                        continue
+                    mins = parse_minutes(stat.get('min', 0))
+                    if mins <= 0:
+                        continue
+                    pid = stat.get('player_id')
+                    entry = player_index.setdefault(pid, {
+                        'player_name': stat.get('player_name'),
+                        'team': team,
+                        'minutes': [],
+                        'games': set(),
+                    })
+                    if gid not in entry['games']:
+                        entry['games'].add(gid)
+                        entry['minutes'].append(mins)
+    return player_index
+
+
+def build_today_player_pool(games, bundle=None):
     os.makedirs(os.path.dirname(PLAYER_POOL_LOG), exist_ok=True)
     pool_logger = logging.getLogger('player_pool')
     handler = logging.FileHandler(PLAYER_POOL_LOG)
@@ -14,53 +63,31 @@ def build_today_player_pool(games):
     pool_logger.setLevel(logging.INFO)
 
     provider = BallDontLieProvider()
-    from database.db_manager import get_player_recent_stats
-    player_minutes = {}
-    player_games = {}
-    team_players = {}
-    for game in games:
-        for team in [game['home_team'], game['away_team']]:
-            recent_games = provider.get_recent_team_games(team)
-            team_players[team] = set()
-            for g in recent_games:
-                box = provider.get_game_box_score(g['id'])
-                for stat in box:
-                    pid = stat.get('player_id')
-                    pname = stat.get('player_name')
-                    mins = stat.get('min', 0)
-                    if mins > 0:
-                        team_players[team].add(pid)
-                        player_minutes.setdefault(pid, []).append(mins)
-                        player_games.setdefault(pid, []).append(g['id'])
     # Always use DB for recent players, fallback if API fails
     from database.db_manager import get_recent_players_by_date
     player_pool = []
     skipped = []
+    seen = set()
     try:
-        for team, pids in team_players.items():
-            for pid in pids:
-                avg_min = sum(player_minutes[pid]) / len(player_minutes[pid]) if player_minutes[pid] else 0
-                games_played = len(player_games[pid])
-                pname = None
-                for g in games:
-                    for t in [g['home_team'], g['away_team']]:
-                        if t == team:
-                            recent_games = provider.get_recent_team_games(team)
-                            for game_obj in recent_games:
-                                box = provider.get_game_box_score(game_obj['id'])
-                                for stat in box:
-                                    if stat.get('player_id') == pid:
-                                        pname = stat.get('player_name')
-                                        break
-                if avg_min >= 12 and games_played >= 3:
-                    player_pool.append({'player_id': pid, 'player_name': pname, 'team': team})
-                else:
-                    skipped.append({'player_id': pid, 'player_name': pname, 'team': team, 'reason': f"avg_min={avg_min}, games_played={games_played}"})
+        player_index = index_slate_players(games, provider, bundle=bundle)
+        for pid, entry in player_index.items():
+            avg_min = sum(entry['minutes']) / len(entry['minutes']) if entry['minutes'] else 0
+            games_played = len(entry['games'])
+            pname = entry['player_name']
+            team = entry['team']
+            if avg_min >= MIN_AVG_MINUTES and games_played >= MIN_GAMES_PLAYED:
+                player_pool.append({'player_id': pid, 'player_name': pname, 'team': team})
+                seen.add(pid)
+            else:
+                skipped.append({'player_id': pid, 'player_name': pname, 'team': team, 'reason': f"avg_min={avg_min}, games_played={games_played}"})
     except Exception as e:
         pool_logger.warning(f"API player pool failed, falling back to DB only: {e}")
-    # Always add DB players (ensures pool even if API fails)
+    # Always add DB players (ensures pool even if API fails), skipping ones already pooled
     db_players = get_recent_players_by_date(days=7)
     for pid, pname, team in db_players:
+        if pid in seen:
+            continue
+        seen.add(pid)
         player_pool.append({'player_id': pid, 'player_name': pname, 'team': team})
     pool_logger.info(f"Teams processed: {[g['home_team'] for g in games] + [g['away_team'] for g in games]}")
     pool_logger.info(f"Players detected: {len(player_pool)}")
@@ -3,22 +3,26 @@ from providers.balldontlie_provider import BallDontLieProvider
 
 def generate_player_projections(player_pool, implied_scores=None):
     provider = BallDontLieProvider()
-    from database.db_manager import get_player_recent_stats, save_game_log
+    from database.db_manager import get_recent_stats_for_players
+    # Last 5 games for the whole pool in one query, averaged in one groupby
+    recent = get_recent_stats_for_players([p['player_id'] for p in player_pool], last_n=5)
+    averages = recent.groupby('player_id').agg(
+        games=('minutes', 'size'),
+        minutes=('minutes', 'mean'),
+        points=('points', 'mean'),
+        rebounds=('rebounds', 'mean'),
+        assists=('assists', 'mean'),
+    ).to_dict('index')
+    # Fallback: players with too little DB history are fetched from the API in batched requests
+    fallback_ids = [p['player_id'] for p in player_pool if averages.get(p['player_id'], {}).get('games', 0) < 3]
+    api_stats = provider.get_recent_player_stats_batch(fallback_ids, last_n=5) if fallback_ids else {}
     projections = []
     for player in player_pool:
-        rows = get_player_recent_stats(player['player_id'], last_n=5)
-        if len(rows) < 3:
-            # Fallback: call API and store
-            stats = provider.get_recent_player_stats(player['player_id'])
-            avg_minutes = stats['minutes']
-            points = stats['points']
-            rebounds = stats['rebounds']
-            assists = stats['assists']
-        else:
-            avg_minutes = sum([r[0] for r in rows]) / len(rows)
-            points = sum([r[1] for r in rows]) / len(rows)
-            rebounds = sum([r[2] for r in rows]) / len(rows)
-            assists = sum([r[3] for r in rows]) / len(rows)
+        stats = api_stats.get(player['player_id']) or averages[player['player_id']]
+        avg_minutes = stats['minutes']
+        points = stats['points']
+        rebounds = stats['rebounds']
+        assists = stats['assists']
         if avg_minutes < 10:
             logging.warning(f"Skipped player {player['player_name']} (avg_minutes={avg_minutes})")
             continue
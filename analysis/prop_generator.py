@@ -13,6 +13,7 @@ def generate_props_from_projections(projections):
             'PLAYER_NAME': p['player_name'],
             'TEAM_ABBREVIATION': p['team'],
             'StatType': 'PTS',
+            'Projection': p['projected_points'],
             'Line': pts_line,
             'OverOdds': -110,
             'UnderOdds': -110
@@ -21,6 +22,7 @@ def generate_props_from_projections(projections):
             'PLAYER_NAME': p['player_name'],
             'TEAM_ABBREVIATION': p['team'],
             'StatType': 'REB',
+            'Projection': p['projected_rebounds'],
             'Line': rebs_line,
             'OverOdds': -110,
             'UnderOdds': -110
@@ -29,6 +31,7 @@ def generate_props_from_projections(projections):
             'PLAYER_NAME': p['player_name'],
             'TEAM_ABBREVIATION': p['team'],
             'StatType': 'AST',
+            'Projection': p['projected_assists'],
             'Line': asts_line,
             'OverOdds': -110,
             'UnderOdds': -110
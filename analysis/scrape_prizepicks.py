@@ -1,6 +1,16 @@
-import requests
+import sys
+import importlib.util
+from pathlib import Path
+
+repo_root = Path(__file__).resolve().parents[1]
+bootstrap_path = repo_root / "scripts" / "bootstrap.py"
+spec = importlib.util.spec_from_file_location("bootstrap", bootstrap_path)
+bootstrap = importlib.util.module_from_spec(spec)
+sys.modules["bootstrap"] = bootstrap
+spec.loader.exec_module(bootstrap)
 import pandas as pd
 import time
+from providers.http_client import http_get
 
 def fetch_prizepicks_props():
     # PrizePicks public API endpoint for projections
@@ -12,7 +22,7 @@ def fetch_prizepicks_props():
     }
     for _ in range(3):
         try:
-            response = requests.get(url, params=params, timeout=20)
+            response = http_get(url, params=params, timeout=20)
             if response.status_code == 200:
                 return response.json()
             else:
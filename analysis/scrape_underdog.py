@@ -1,13 +1,23 @@
-import requests
+import sys
+import importlib.util
+from pathlib import Path
+
+repo_root = Path(__file__).resolve().parents[1]
+bootstrap_path = repo_root / "scripts" / "bootstrap.py"
+spec = importlib.util.spec_from_file_location("bootstrap", bootstrap_path)
+bootstrap = importlib.util.module_from_spec(spec)
+sys.modules["bootstrap"] = bootstrap
+spec.loader.exec_module(bootstrap)
 import pandas as pd
 import time
+from providers.http_client import http_get
 
 def fetch_underdog_props():
     # Underdog NBA props endpoint (public, but may change)
     url = "https://api.underdogfantasy.com/beta/v3/over_under_lines"
     for _ in range(3):  # Retry up to 3 times
         try:
-            response = requests.get(url, timeout=20)
+            response = http_get(url, timeout=20)
             if response.status_code == 200:
                 return response.json()
             else:
@@ -0,0 +1,69 @@
+"""
+slate_prefetch.py
+
+Concurrent prefetch stage for the player pool build. Team game lists and box
+scores for different games are independent, so they are fetched on a bounded
+thread pool (all requests still pass through the provider's shared token
+bucket) and handed to build_today_player_pool as one in-memory bundle.
+
+Functions:
+    prefetch_slate(games, provider=None, max_workers=None):
+        Returns {'team_games': {team: [game, ...]}, 'box_scores': {game_id: [row, ...]},
+                 'requests': int, 'wall_clock_seconds': float, 'sequential_seconds': float}
+"""
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from providers.balldontlie_provider import BallDontLieProvider
+from config import BDL_PREFETCH_CONCURRENCY
+
+
+def _timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - start
+
+
+def prefetch_slate(games, provider=None, max_workers=None):
+    provider = provider or BallDontLieProvider()
+    max_workers = max_workers or BDL_PREFETCH_CONCURRENCY
+    teams = []
+    for game in games:
+        for team in [game['home_team'], game['away_team']]:
+            if team not in teams:
+                teams.append(team)
+
+    started = time.perf_counter()
+    sequential = 0.0
+    team_games = {}
+    box_scores = {}
+    if teams:
+        # Warm the team-id map once so workers don't all race on the teams endpoint.
+        provider.get_team_id(teams[0])
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        for team, (recent, elapsed) in zip(teams, pool.map(lambda t: _timed(provider.get_recent_team_games, t), teams)):
+            team_games[team] = recent
+            sequential += elapsed
+        game_ids = []
+        for recent in team_games.values():
+            for g in recent:
+                if g['id'] not in game_ids:
+                    game_ids.append(g['id'])
+        # Box scores go out in multi-game batches; the batches themselves run concurrently.
+        chunks = [game_ids[i:i + provider.BATCH_SIZE] for i in range(0, len(game_ids), provider.BATCH_SIZE)]
+        for boxes, elapsed in pool.map(lambda c: _timed(provider.get_box_scores, c), chunks):
+            box_scores.update(boxes)
+            sequential += elapsed
+    wall_clock = time.perf_counter() - started
+
+    logging.info(
+        f"Slate prefetch: {len(teams)} teams, {len(box_scores)} box scores in {wall_clock:.2f}s "
+        f"(sequential estimate {sequential:.2f}s, workers={max_workers})"
+    )
+    return {
+        'team_games': team_games,
+        'box_scores': box_scores,
+        'requests': len(teams) + len(chunks),
+        'wall_clock_seconds': round(wall_clock, 3),
+        'sequential_seconds': round(sequential, 3),
+    }
@@ -4,40 +4,153 @@ Closing Line Snapshot Collector
 Collects current NBA prop odds from The Odds API and stores timestamped snapshots
 for forward CLV tracking.
 
+Player props are only served per event, so each open game is fetched through
+fetch_nba_player_props on the credit planner's schedule; events whose cached
+payload is still fresh cost no credits and add no rows. Snapshots are taken
+on the ingest path: capture_ingested_props is registered as an OddsAdapter
+ingest listener, so every payload written to odds_outcomes is captured when
+it is fetched, including stale-while-revalidate refreshes in the background.
+
+Capture is change-only: each outcome is compared with its last stored
+(line, odds), kept in memory and seeded from the database the first time an
+event is seen, and only outcomes that changed are written. An event's values
+are dropped from memory once its commence_time has passed. Every observed
+event also gets its closing_line_heartbeats row bumped, so storage scales with
+market activity rather than polling frequency while observation times are kept.
+
 Functions:
-    collect_current_prop_odds()
+    collect_current_prop_odds(plan=None)
+    capture_ingested_props(event_ids, fetched_at): Ingest listener writing changed snapshots.
+    player_prop_snapshot_rows(event_ids, timestamp_collected)
+    snapshot_deltas(rows, observed_at): Changed rows and per-event heartbeats.
 """
 
 import logging
+import threading
+import pandas as pd
 from datetime import datetime
-from database.clv_tracking import insert_closing_line_snapshot
-from providers.odds_provider import fetch_nba_games_and_markets
+from database.clv_tracking import get_commence_times, get_last_snapshot_values, insert_snapshot_deltas
+from providers.odds_adapter import add_ingest_listener
+from providers.odds_credit_planner import parse_commence_time
+from providers.odds_provider import fetch_nba_games_and_markets, fetch_nba_player_props
+from providers.odds_store import get_player_prop_quotes
 
 LOG_PATH = "logs/closing_line_capture.log"
 logging.basicConfig(filename=LOG_PATH, level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
 
-def collect_current_prop_odds():
+def player_prop_snapshot_rows(event_ids, timestamp_collected):
+    """
+    closing_line_snapshots rows for the given events, read from the flattened
+    odds_outcomes store: one row per (book, market, player) from the Over
+    outcome (get_player_prop_quotes), with the stat type from the shared
+    STAT_TYPE_BY_MARKET vocabulary.
+    """
+    quotes = get_player_prop_quotes(event_ids=event_ids)
+    if quotes.empty:
+        return []
+    snapshot = quotes[["game_date", "game_id", "player_name", "stat_type", "sportsbook", "line", "odds"]]
+    snapshot = snapshot.assign(timestamp_collected=timestamp_collected)
+    return list(snapshot.itertuples(index=False, name=None))
+
+# Last stored (line, odds) per (game_id, player_name, stat_type, sportsbook).
+_last_values = {}
+_seeded_games = set()
+# Tip-off (naive UTC) per seeded event, for pruning the two above.
+_commence_times = {}
+# Listeners run on the fetching thread, which may be a background refresh.
+_capture_lock = threading.Lock()
+
+
+def _value(x):
+    return None if pd.isna(x) else float(x)
+
+
+def _prune_started_games(now):
+    """Forget the in-memory values of events that have tipped off; their props are closed."""
+    started = {game_id for game_id, tipoff in _commence_times.items() if tipoff is not None and tipoff <= now}
+    if not started:
+        return
+    for key in [key for key in _last_values if key[0] in started]:
+        del _last_values[key]
+    _seeded_games.difference_update(started)
+    for game_id in started:
+        del _commence_times[game_id]
+
+
+def snapshot_deltas(rows, observed_at):
     """
-    Fetches current NBA player prop odds and stores timestamped snapshots.
+    Args:
+        rows: snapshot tuples from player_prop_snapshot_rows.
+        observed_at: timestamp of this capture.
+    Returns:
+        (changed rows, heartbeats): the rows whose (line, odds) differ from the
+        last stored values, and one (game_id, observed_at, outcomes, changed)
+        tuple per event in `rows`.
+    """
+    rows = list(rows)
+    _prune_started_games(datetime.fromisoformat(observed_at))
+    unseeded = {row[1] for row in rows} - _seeded_games
+    if unseeded:
+        _last_values.update(get_last_snapshot_values(unseeded))
+        _seeded_games.update(unseeded)
+        commence_times = get_commence_times(unseeded)
+        _commence_times.update((game_id, parse_commence_time(commence_times.get(game_id))) for game_id in unseeded)
+    changed, per_game = [], {}
+    for row in rows:
+        key, value = row[1:5], (_value(row[5]), _value(row[6]))
+        counts = per_game.setdefault(row[1], [0, 0])
+        counts[0] += 1
+        if _last_values.get(key) != value:
+            _last_values[key] = value
+            changed.append(row)
+            counts[1] += 1
+    heartbeats = [(game_id, observed_at, outcomes, n_changed) for game_id, (outcomes, n_changed) in per_game.items()]
+    return changed, heartbeats
+
+
+def capture_ingested_props(event_ids, fetched_at):
+    """
+    OddsAdapter ingest listener: write the player-prop outcomes of the just
+    ingested events whose (line, odds) changed, stamped with the fetch time,
+    and bump their heartbeats. Payloads without player props write nothing.
+    Returns the number of snapshot rows written.
+    """
+    with _capture_lock:
+        try:
+            rows = player_prop_snapshot_rows(event_ids, fetched_at)
+            if not rows:
+                return 0
+            changed, heartbeats = snapshot_deltas(rows, fetched_at)
+            written = insert_snapshot_deltas(changed, heartbeats)
+        except Exception as e:
+            # The in-memory values may be ahead of what was stored; reseed next time.
+            _last_values.clear()
+            _seeded_games.clear()
+            _commence_times.clear()
+            logging.error(f"Failed to capture prop odds snapshot: {e}")
+            return 0
+    logging.info(f"Captured {written} changed of {len(rows)} prop odds rows from "
+                 f"{len(heartbeats)} events fetched at {fetched_at}")
+    return written
+
+
+add_ingest_listener(capture_ingested_props)
+
+
+def collect_current_prop_odds(plan=None):
+    """
+    Fetches current NBA player prop odds; snapshots are stored by
+    capture_ingested_props as each payload is ingested.
     Logs all actions. Fails gracefully if API unavailable.
+
+    Args:
+        plan: an odds credit plan (plan_odds_fetches); computed from the slate if omitted.
     """
     try:
         games = fetch_nba_games_and_markets()
-        now = datetime.utcnow().isoformat()
-        for game in games:
-            game_id = game.get("game_id")
-            game_date = game.get("commence_time", "")[:10]
-            for market in game.get("markets", []):
-                if market.get("key", "").startswith("player_"):
-                    for outcome in market.get("outcomes", []):
-                        player_name = outcome.get("player")
-                        stat_type = market.get("key").replace("player_", "").upper()
-                        sportsbook = outcome.get("book", "unknown")
-                        line = outcome.get("line")
-                        odds = outcome.get("odds")
-                        insert_closing_line_snapshot(
-                            game_date, game_id, player_name, stat_type, sportsbook, line, odds, now
-                        )
-        logging.info(f"Collected odds snapshot for {len(games)} games at {now}")
+        results = fetch_nba_player_props(games, plan=plan)
+        refreshed = sum(1 for _, result in results if result["source"] == "api")
+        logging.info(f"Fetched props for {len(results)} events, {refreshed} refreshed from the API "
+                     f"({len(games)} games on slate)")
     except Exception as e:
         logging.error(f"Failed to collect odds snapshot: {e}")
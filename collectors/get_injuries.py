@@ -1,10 +1,20 @@
-import requests
+import sys
+import importlib.util
+from pathlib import Path
+
+repo_root = Path(__file__).resolve().parents[1]
+bootstrap_path = repo_root / "scripts" / "bootstrap.py"
+spec = importlib.util.spec_from_file_location("bootstrap", bootstrap_path)
+bootstrap = importlib.util.module_from_spec(spec)
+sys.modules["bootstrap"] = bootstrap
+spec.loader.exec_module(bootstrap)
 import pandas as pd
 import os
+from providers.http_client import http_get
 
 def get_injuries():
     url = "https://site.api.espn.com/apis/site/v2/sports/basketball/nba/injuries"
-    r = requests.get(url)
+    r = http_get(url)
     data = r.json()
     players = []
     for team in data.get("injuries", []):
@@ -1,9 +1,19 @@
 
-import requests
+import sys
+import importlib.util
+from pathlib import Path
+
+repo_root = Path(__file__).resolve().parents[1]
+bootstrap_path = repo_root / "scripts" / "bootstrap.py"
+spec = importlib.util.spec_from_file_location("bootstrap", bootstrap_path)
+bootstrap = importlib.util.module_from_spec(spec)
+sys.modules["bootstrap"] = bootstrap
+spec.loader.exec_module(bootstrap)
 import pandas as pd
 import os
 import logging
 from config import RAW_DATA_DIR, LOGS_DIR
+from providers.http_client import http_get
 
 LOG_PATH = os.path.join(LOGS_DIR, "get_nba_stats.log")
 logging.basicConfig(filename=LOG_PATH, level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
@@ -22,7 +32,7 @@ def get_player_gamelogs():
         url = f"https://api.sportsdata.io/v3/nba/stats/json/PlayerGameStatsByDate/{date_str}"
         logging.info(f"Requesting NBA player stats for {date_str} from SportsData.io...")
         try:
-            response = requests.get(url, headers=headers, timeout=30)
+            response = http_get(url, headers=headers, timeout=30)
             logging.info(f"Status code: {response.status_code}")
             if response.status_code != 200:
                 logging.warning(f"Failed to fetch stats: {response.status_code}")
@@ -13,6 +13,7 @@ spec.loader.exec_module(bootstrap)
 get_repo_root = bootstrap.get_repo_root
 import config
 from providers.odds_provider import fetch_nba_games_and_markets
+from providers.odds_store import get_odds_frame
 
 def get_nba_props():
     # Use the refactored provider to get NBA odds
@@ -20,22 +21,9 @@ def get_nba_props():
     if not games:
         print("No NBA odds data found.")
         return
-    import pandas as pd
-    rows = []
-    for game in games:
-        for bookmaker in game.get('bookmakers', []):
-            for market in bookmaker.get('markets', []):
-                rows.append({
-                    "game_id": game.get('game_id'),
-                    "home_team": game.get('home_team'),
-                    "away_team": game.get('away_team'),
-                    "commence_time": game.get('commence_time'),
-                    "bookmaker": bookmaker.get('key'),
-                    "market": market.get('key'),
-                    "outcomes": market.get('outcomes')
-                })
-    if rows:
-        df = pd.DataFrame(rows)
+    # One row per outcome, straight from the flattened odds_outcomes store
+    df = get_odds_frame(event_ids=[g['game_id'] for g in games], markets=["h2h", "spreads", "totals"])
+    if not df.empty:
         df.to_csv("data/raw/nba_odds_adapter_output.csv", index=False)
         print(f"Saved {len(df)} odds rows to data/raw/nba_odds_adapter_output.csv")
     else:
@@ -7,11 +7,11 @@ load_dotenv()
 
 # Base directories
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
-DATA_DIR = os.path.join(BASE_DIR, 'data')
+DATA_DIR = os.getenv('DATA_DIR', os.path.join(BASE_DIR, 'data'))
 RAW_DATA_DIR = os.path.join(DATA_DIR, 'raw')
 PROCESSED_DATA_DIR = os.path.join(DATA_DIR, 'processed')
-OUTPUT_DIR = os.path.join(BASE_DIR, 'output')
-LOGS_DIR = os.path.join(BASE_DIR, 'logs')
+OUTPUT_DIR = os.getenv('OUTPUT_DIR', os.path.join(BASE_DIR, 'output'))
+LOGS_DIR = os.getenv('LOGS_DIR', os.path.join(BASE_DIR, 'logs'))
 
 # Date logic
 TODAY = datetime.now().strftime('%Y-%m-%d')
@@ -28,19 +28,58 @@ BACKTEST_TOP10 = os.path.join(OUTPUT_DIR, 'backtest_top10_props_per_day.csv')
 
 # Database
 DB_PATH = os.getenv('DB_PATH', os.path.join(BASE_DIR, 'database', 'prop_ai.db'))
+CLV_DB_PATH = os.getenv('CLV_DB_PATH', os.path.join(BASE_DIR, 'database', 'clv_tracking.db'))
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv('SQLITE_BUSY_TIMEOUT_MS', 30000))
+SQLITE_CACHE_SIZE_KB = int(os.getenv('SQLITE_CACHE_SIZE_KB', 65536))
+SQLITE_MMAP_SIZE_MB = int(os.getenv('SQLITE_MMAP_SIZE_MB', 256))
 
 # API Keys (from .env)
 NBA_API_KEY = os.getenv('NBA_API_KEY', '')
 ODDS_API_KEY = os.getenv('ODDS_API_KEY', '')
 
 
+# Outbound HTTP (providers/http_client.py)
+HTTP_CONNECT_TIMEOUT = float(os.getenv('HTTP_CONNECT_TIMEOUT', 5))
+HTTP_READ_TIMEOUT = float(os.getenv('HTTP_READ_TIMEOUT', 30))
+HTTP_POOL_MAXSIZE = int(os.getenv('HTTP_POOL_MAXSIZE', 8))
+HTTP_CASSETTE_MODE = os.getenv('HTTP_CASSETTE_MODE', 'off')  # off, record or replay
+HTTP_CASSETTE_DIR = os.getenv('HTTP_CASSETTE_DIR', os.path.join(DATA_DIR, 'cassettes'))
+HTTP_REPLAY_LATENCY_MS = float(os.getenv('HTTP_REPLAY_LATENCY_MS', 0))  # synthetic per-request latency in replay
+
+# CLV audit log (database/clv_tracking.log_clv_action)
+CLV_LOG_MAX_MB = float(os.getenv('CLV_LOG_MAX_MB', 10))  # rotate clv_tracking.log at this size
+CLV_LOG_BACKUP_COUNT = int(os.getenv('CLV_LOG_BACKUP_COUNT', 5))
+CLV_LOG_BUFFER_RECORDS = int(os.getenv('CLV_LOG_BUFFER_RECORDS', 500))  # flush after this many lines
+CLV_LOG_FLUSH_SECONDS = float(os.getenv('CLV_LOG_FLUSH_SECONDS', 2))  # ...or once the oldest is this old
+
 # Other config
 RETRY_ATTEMPTS = int(os.getenv('RETRY_ATTEMPTS', 3))
-RETRY_DELAY = int(os.getenv('RETRY_DELAY', 5))  # seconds
+RETRY_DELAY = int(os.getenv('RETRY_DELAY', 5))  # seconds, cap on a single backoff sleep
+RETRY_BASE_DELAY = float(os.getenv('RETRY_BASE_DELAY', 0.5))  # seconds, first backoff step
+RETRY_AFTER_MAX_SECONDS = int(os.getenv('RETRY_AFTER_MAX_SECONDS', 60))
+CIRCUIT_FAILURE_THRESHOLD = int(os.getenv('CIRCUIT_FAILURE_THRESHOLD', 5))
+CIRCUIT_COOLDOWN_SECONDS = int(os.getenv('CIRCUIT_COOLDOWN_SECONDS', 120))
 
 ODDS_API_KEY = os.getenv("ODDS_API_KEY", "")
 ODDS_DAILY_CREDIT_BUDGET = int(os.getenv("ODDS_DAILY_CREDIT_BUDGET", "200"))
 ODDS_DEFAULT_TTL_MINUTES = int(os.getenv("ODDS_DEFAULT_TTL_MINUTES", "20"))
+ODDS_CACHE_CODEC = os.getenv("ODDS_CACHE_CODEC", "zlib")  # zlib or zstd (needs zstandard)
+ODDS_CACHE_RETENTION_TTLS = int(os.getenv("ODDS_CACHE_RETENTION_TTLS", "6"))  # evict rows older than N x TTL
+ODDS_SLATE_HOLD_MINUTES = int(os.getenv("ODDS_SLATE_HOLD_MINUTES", "1440"))  # slate TTL when the plan skips its refresh; no row is evicted sooner
+ODDS_CACHE_MAX_MB = int(os.getenv("ODDS_CACHE_MAX_MB", "64"))
+ODDS_CACHE_VACUUM_PAGES = int(os.getenv("ODDS_CACHE_VACUUM_PAGES", "2000"))  # free pages returned per eviction pass
+ODDS_CACHE_EVICT_INTERVAL_MINUTES = int(os.getenv("ODDS_CACHE_EVICT_INTERVAL_MINUTES", "60"))
+ODDS_SWR_ENABLED = os.getenv("ODDS_SWR_ENABLED", "False").lower() == "true"  # serve stale odds on budget/provider failure
+ODDS_SWR_MAX_STALE_MINUTES = int(os.getenv("ODDS_SWR_MAX_STALE_MINUTES", "360"))  # how far past TTL a row may be served
+ODDS_MOVEMENT_RETENTION_DAYS = int(os.getenv("ODDS_MOVEMENT_RETENTION_DAYS", "14"))  # prune older line movements
+ODDS_PROP_MARKETS = os.getenv("ODDS_PROP_MARKETS", "player_points,player_rebounds,player_assists,player_threes")
+ODDS_PROP_NEAR_TIPOFF_HOURS = float(os.getenv("ODDS_PROP_NEAR_TIPOFF_HOURS", "3"))
+ODDS_PROP_TTL_NEAR_MINUTES = int(os.getenv("ODDS_PROP_TTL_NEAR_MINUTES", "10"))  # per-event refresh near tip-off
+ODDS_PROP_TTL_FAR_MINUTES = int(os.getenv("ODDS_PROP_TTL_FAR_MINUTES", "120"))  # per-event refresh otherwise
+ODDS_CREDIT_RESERVE = int(os.getenv("ODDS_CREDIT_RESERVE", str(max(1, ODDS_DAILY_CREDIT_BUDGET // 10))))  # never planned
+BDL_CACHE_MAX_ENTRIES = int(os.getenv("BDL_CACHE_MAX_ENTRIES", "512"))
+BDL_REQUESTS_PER_MINUTE = int(os.getenv("BDL_REQUESTS_PER_MINUTE", "60"))
+BDL_PREFETCH_CONCURRENCY = int(os.getenv("BDL_PREFETCH_CONCURRENCY", "4"))
 NOTIFY_EMAIL = os.getenv('NOTIFY_EMAIL', 'your_email@example.com')
 SMTP_SERVER = os.getenv('SMTP_SERVER', 'smtp.example.com')
 SMTP_PORT = int(os.getenv('SMTP_PORT', 587))
@@ -1,28 +1,39 @@
 import os
 import pandas as pd
 import logging
+import time
 from datetime import datetime
-try:
-    import pytz
-except ImportError:
-    pytz = None
 from config import LOGS_DIR, PROCESSED_DATA_DIR, OUTPUT_DIR
 from fetch_games import fetch_games_for_today
-from analysis.implied_totals import calculate_implied_scores
+from analysis.implied_totals import calculate_consensus_implied_scores, odds_frame_from_games
 from providers.balldontlie_provider import BallDontLieProvider
 from analysis.statistical_engine import compute_ev
 from analysis.ai_layer import ai_adjustments
 from analysis.parlay_optimizer_topN import top_n_3_pick_parlays
 from analysis.weighted_prop_engine_dynamic import weighted_prop_pipeline_dynamic
 
-def run_daily_pipeline(reason="manual"):
+def run_daily_pipeline(reason="manual", today=None):
+    """
+    Run the full daily pipeline. `today` (a date) overrides the slate date, e.g.
+    when replaying recorded HTTP cassettes (scripts/replay_slate.py).
+    Returns: dict of stage name -> wall-clock seconds, in run order.
+    """
     os.makedirs(LOGS_DIR, exist_ok=True)
     logging.basicConfig(filename=os.path.join(LOGS_DIR, "pipeline.log"), level=logging.INFO,
                         format="%(asctime)s %(levelname)s %(message)s")
     logging.info(f"=== Starting Daily NBA Player Prop Pipeline - Reason: {reason} ===")
+    timings = {}
+    stage_start = [time.perf_counter()]
+
+    def lap(stage):
+        now = time.perf_counter()
+        timings[stage] = round(now - stage_start[0], 4)
+        stage_start[0] = now
+
     from database.db_manager import initialize_database, initialize_clv_tracking
     initialize_database()
     initialize_clv_tracking()
+    lap("init_db")
 
     # Step 0: Ingest pick'em entries
     from collectors.pickem_bet_ingestor import ingest_pickem_entries
@@ -30,37 +41,51 @@ def run_daily_pipeline(reason="manual"):
         ingest_pickem_entries()
     except Exception as e:
         logging.error(f"Pick'em ingestion failed: {e}")
+    lap("pickem_ingest")
 
     # Step 1: Fetch games (OddsAPI)
-    games = fetch_games_for_today()
+    games = fetch_games_for_today(today)
+    lap("fetch_games")
     if not games:
         logging.warning("No games today — pipeline stops.")
         print("No games today — pipeline stops.")
-        return
+        return timings
     logging.info(f"Found {len(games)} games today.")
     print(f"Found {len(games)} games today.")
 
-    # Step 2: Compute implied team scores
-    implied_scores = []
-    for game in games:
-        try:
-            scores = calculate_implied_scores(game)
-            implied_scores.append({**game, **scores})
-        except Exception as e:
-            logging.error(f"Implied score error for game {game.get('game_id')}: {e}")
-            continue
-
-    # Step 3: Build player pool
+    # Step 2: Compute implied team scores (consensus across books, whole slate at once)
+    no_scores = {'home_implied_score': None, 'away_implied_score': None}
+    try:
+        slate_scores = calculate_consensus_implied_scores(odds_frame_from_games(games)).set_index('game_id')
+        scores_by_game = slate_scores[['home_implied_score', 'away_implied_score']].to_dict('index')
+    except Exception as e:
+        logging.error(f"Implied score error for slate: {e}")
+        scores_by_game = {}
+    implied_scores = [{**game, **scores_by_game.get(game.get('game_id'), no_scores)} for game in games]
+    lap("implied_scores")
+
+    # Step 3: Prefetch slate data concurrently, then build player pool
+    from analysis.slate_prefetch import prefetch_slate
     from analysis.player_pool import build_today_player_pool
-    player_pool = build_today_player_pool(implied_scores)
+    bundle = None
+    try:
+        bundle = prefetch_slate(implied_scores)
+        print(f"Slate prefetch: {bundle['requests']} fetches in {bundle['wall_clock_seconds']}s "
+              f"(sequential estimate {bundle['sequential_seconds']}s)")
+    except Exception as e:
+        logging.error(f"Slate prefetch failed, pool build will fetch sequentially: {e}")
+    player_pool = build_today_player_pool(implied_scores, bundle=bundle)
+    lap("player_pool")
 
     # Step 4: Generate player projections
     from analysis.projection_engine import generate_player_projections
     projections = generate_player_projections(player_pool)
+    lap("projections")
 
     # Step 5: Generate props from projections
     from analysis.prop_generator import generate_props_from_projections
     df_props = generate_props_from_projections(projections)
+    lap("props")
 
     # Step 4: Run EV calculation
     try:
@@ -73,33 +98,47 @@ def run_daily_pipeline(reason="manual"):
     except Exception as e:
         logging.error(f"EV calculation error: {e}")
         df_ev = df_props
+    lap("ev")
 
     # --- CLV Tracking Integration ---
     try:
-        from database.clv_tracking import insert_clv_snapshot, log_clv_action
-        from helpers.clv_utils import update_closing_lines_for_unsettled_props
+        from database.clv_tracking import insert_clv_snapshots, log_clv_action
+        from helpers.clv_utils import update_closing_lines_for_unsettled_props, ANY_SPORTSBOOK
         from analysis.clv_metrics import compute_clv_summary
-        for _, row in df_ev.iterrows():
-            # Use UTC if pytz is available, else local time
-            if pytz:
-                ts = datetime.now(pytz.utc).isoformat()
-            else:
-                ts = datetime.utcnow().isoformat()
-            insert_clv_snapshot(
-                date=row.get("date", datetime.now().strftime("%Y-%m-%d")),
-                player_name=row["PLAYER_NAME"],
-                stat_type="PRA",  # or row.get("STAT_TYPE", "PRA") if available
-                sportsbook="unknown",  # Placeholder, update as needed
-                line_at_pick=row.get("prop_line"),
-                odds_at_pick=None,  # Placeholder, update as needed
-                timestamp_at_pick=ts,
-                projected_value=row.get("projected_PRA"),
-                expected_value=row.get("edge"),
-                closing_line=None,
-                closing_odds=None,
-                result=None,
-                clv=None
-            )
+        from providers.odds_store import get_player_prop_quotes, stat_type_for
+        # Props know their team; the slate maps each team to its odds event id.
+        team_game_ids = {game[side]: game.get('game_id') for game in games for side in ('home_team', 'away_team')}
+        df_clv = df_ev.assign(stat_type=df_ev['StatType'].map(stat_type_for))
+        if 'TEAM_ABBREVIATION' in df_clv.columns:
+            df_clv = df_clv.assign(game_id=df_clv['TEAM_ABBREVIATION'].map(team_game_ids))
+        # Log each pick at the book quoting the best Over price for it, with that
+        # book's line and odds; picks no book quotes keep the model's line and settle
+        # against any book's closing line.
+        quotes = get_player_prop_quotes(event_ids=[g['game_id'] for g in games if g.get('game_id')])
+        best = (quotes.sort_values(['odds', 'line'], ascending=[False, True])
+                .drop_duplicates(['game_id', 'player_name', 'stat_type'])
+                .rename(columns={'player_name': 'PLAYER_NAME'}))
+        if 'game_id' in df_clv.columns:
+            df_clv = df_clv.merge(best[['game_id', 'PLAYER_NAME', 'stat_type', 'sportsbook', 'line', 'odds']],
+                                  on=['game_id', 'PLAYER_NAME', 'stat_type'], how='left')
+            df_clv = df_clv.assign(line=df_clv['line'].fillna(df_clv['Line']),
+                                   odds=df_clv['odds'].fillna(df_clv['OverOdds']),
+                                   sportsbook=df_clv['sportsbook'].fillna(ANY_SPORTSBOOK))
+        else:
+            df_clv = df_clv.assign(line=df_clv['Line'], odds=df_clv['OverOdds'], sportsbook=ANY_SPORTSBOOK)
+        insert_clv_snapshots(
+            df_clv,
+            columns={
+                "player_name": "PLAYER_NAME",
+                "line_at_pick": "line",
+                "odds_at_pick": "odds",
+                "projected_value": "Projection",
+                "expected_value": "EV_Over",
+            },
+            defaults={
+                "date": datetime.now().strftime("%Y-%m-%d"),
+            }
+        )
         # Step: Update closing lines for unsettled props
         update_closing_lines_for_unsettled_props()
         # Step: Compute and log CLV summary
@@ -110,6 +149,9 @@ def run_daily_pipeline(reason="manual"):
     except Exception as e:
         from database.clv_tracking import log_clv_action
         log_clv_action(f"Error in CLV pipeline: {e}")
+    from database.clv_tracking import flush_clv_log
+    flush_clv_log()
+    lap("clv_tracking")
 
     # Step: Compute prop correlations
     try:
@@ -117,6 +159,7 @@ def run_daily_pipeline(reason="manual"):
         compute_rolling_correlations()
     except Exception as e:
         logging.error(f"Correlation engine failed: {e}")
+    lap("correlations")
 
     # Step: Generate parlay suggestions
     try:
@@ -124,6 +167,7 @@ def run_daily_pipeline(reason="manual"):
         generate_suggested_parlays()
     except Exception as e:
         logging.error(f"Parlay suggestion failed: {e}")
+    lap("parlay_suggestions")
 
     # Step 5: Run AI reasoning
     injuries_df = pd.DataFrame(columns=["player", "status", "details"])
@@ -137,6 +181,7 @@ def run_daily_pipeline(reason="manual"):
     except Exception as e:
         logging.error(f"AI reasoning error: {e}")
         df_ai = df_ev
+    lap("ai_adjustments")
 
     # Step 6: Run dynamic weighted prop engine
     try:
@@ -145,6 +190,7 @@ def run_daily_pipeline(reason="manual"):
         print(f"Weighted prop engine output: {len(df_weighted)} props saved to weighted_props.csv")
     except Exception as e:
         logging.error(f"Weighted prop engine error: {e}")
+    lap("weighted_props")
 
     # Step 7: Generate top 3 parlays
     try:
@@ -158,6 +204,7 @@ def run_daily_pipeline(reason="manual"):
             print(parlay_df[["PLAYER_NAME", "TEAM_ABBREVIATION", "adjusted_EV", "confidence"]])
     except Exception as e:
         logging.error(f"Parlay generation error: {e}")
+    lap("top_parlays")
 
     logging.info("=== Pipeline Complete ===")
     print("=== Pipeline Complete ===")
@@ -168,16 +215,20 @@ def run_daily_pipeline(reason="manual"):
     from config import USE_EMAIL_NOTIFICATION, USE_SLACK_NOTIFICATION
 
 
-    today = datetime.now().strftime("%Y-%m-%d")
-    eval_report_path = os.path.join(OUTPUT_DIR, f"daily_eval_{today}.csv")
+    report_date = (today or datetime.now()).strftime("%Y-%m-%d")
+    eval_report_path = os.path.join(OUTPUT_DIR, f"daily_eval_{report_date}.csv")
     summary = build_notification_summary(eval_report_path)
-    subject = f"Prop AI Nightly Report {today}"
+    subject = f"Prop AI Nightly Report {report_date}"
 
     if USE_EMAIL_NOTIFICATION:
         send_email_notification(subject, summary, eval_report_path)
     if USE_SLACK_NOTIFICATION:
-        slack_msg = f"*Prop AI Nightly Report {today}*\n{summary}\nReport: {eval_report_path}"
+        slack_msg = f"*Prop AI Nightly Report {report_date}*\n{summary}\nReport: {eval_report_path}"
         send_slack_notification(slack_msg)
+    lap("notifications")
+
+    logging.info(f"Stage timings (s): {timings}")
+    return timings
 
 if __name__ == "__main__":
     run_daily_pipeline(reason="manual")
@@ -2,101 +2,91 @@ def initialize_suggested_parlays_table():
     """
     Create the suggested_parlays table for storing generated parlay suggestions.
     """
-    conn = get_clv_db_connection()
-    c = conn.cursor()
-    c.execute("""
-    CREATE TABLE IF NOT EXISTS suggested_parlays (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        platform TEXT,
-        generated_date TEXT,
-        legs TEXT,
-        predicted_hit_probability REAL,
-        projected_payout REAL,
-        notes TEXT,
-        status TEXT
-    );
-    """)
-    conn.commit()
-    conn.close()
+    with transaction(CLV_DB_PATH) as conn:
+        c = conn.cursor()
+        c.execute("""
+        CREATE TABLE IF NOT EXISTS suggested_parlays (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            platform TEXT,
+            generated_date TEXT,
+            legs TEXT,
+            predicted_hit_probability REAL,
+            projected_payout REAL,
+            notes TEXT,
+            status TEXT
+        );
+        """)
 
 def insert_suggested_parlay(platform, generated_date, legs, predicted_hit_probability, projected_payout, notes, status):
     """
     Insert a suggested parlay row.
     """
-    conn = get_clv_db_connection()
-    c = conn.cursor()
-    c.execute("""
-    INSERT INTO suggested_parlays (
-        platform, generated_date, legs, predicted_hit_probability, projected_payout, notes, status
-    ) VALUES (?, ?, ?, ?, ?, ?, ?)
-    """, (platform, generated_date, legs, predicted_hit_probability, projected_payout, notes, status))
-    conn.commit()
-    conn.close()
+    with transaction(CLV_DB_PATH) as conn:
+        c = conn.cursor()
+        c.execute("""
+        INSERT INTO suggested_parlays (
+            platform, generated_date, legs, predicted_hit_probability, projected_payout, notes, status
+        ) VALUES (?, ?, ?, ?, ?, ?, ?)
+        """, (platform, generated_date, legs, predicted_hit_probability, projected_payout, notes, status))
 def initialize_prop_correlations_table():
     """
     Create the prop_correlations table for storing rolling correlations.
     """
-    conn = get_clv_db_connection()
-    c = conn.cursor()
-    c.execute("""
-    CREATE TABLE IF NOT EXISTS prop_correlations (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        player1_id TEXT,
-        player2_id TEXT,
-        stat1 TEXT,
-        stat2 TEXT,
-        correlation_coefficient REAL,
-        sample_size INTEGER,
-        last_updated TEXT
-    );
-    """)
-    conn.commit()
-    conn.close()
+    with transaction(CLV_DB_PATH) as conn:
+        c = conn.cursor()
+        c.execute("""
+        CREATE TABLE IF NOT EXISTS prop_correlations (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            player1_id TEXT,
+            player2_id TEXT,
+            stat1 TEXT,
+            stat2 TEXT,
+            correlation_coefficient REAL,
+            sample_size INTEGER,
+            last_updated TEXT
+        );
+        """)
 
 def upsert_prop_correlation(player1_id, player2_id, stat1, stat2, corr, sample_size, last_updated):
     """
     Insert or update a prop correlation row.
     """
-    conn = get_clv_db_connection()
-    c = conn.cursor()
-    c.execute("""
-    INSERT INTO prop_correlations
-        (player1_id, player2_id, stat1, stat2, correlation_coefficient, sample_size, last_updated)
-    VALUES (?, ?, ?, ?, ?, ?, ?)
-    ON CONFLICT(player1_id, player2_id, stat1, stat2)
-    DO UPDATE SET
-        correlation_coefficient=excluded.correlation_coefficient,
-        sample_size=excluded.sample_size,
-        last_updated=excluded.last_updated
-    """, (player1_id, player2_id, stat1, stat2, corr, sample_size, last_updated))
-    conn.commit()
-    conn.close()
+    with transaction(CLV_DB_PATH) as conn:
+        c = conn.cursor()
+        c.execute("""
+        INSERT INTO prop_correlations
+            (player1_id, player2_id, stat1, stat2, correlation_coefficient, sample_size, last_updated)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT(player1_id, player2_id, stat1, stat2)
+        DO UPDATE SET
+            correlation_coefficient=excluded.correlation_coefficient,
+            sample_size=excluded.sample_size,
+            last_updated=excluded.last_updated
+        """, (player1_id, player2_id, stat1, stat2, corr, sample_size, last_updated))
 def initialize_pickem_bets_table():
     """
     Create the pickem_bets table for storing pick'em entries.
     """
-    conn = get_clv_db_connection()
-    c = conn.cursor()
-    c.execute("""
-    CREATE TABLE IF NOT EXISTS pickem_bets (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        platform TEXT NOT NULL,
-        entry_id TEXT UNIQUE NOT NULL,
-        user_id TEXT,
-        bet_type TEXT,
-        legs_count INTEGER,
-        total_entry_amount REAL,
-        potential_payout REAL,
-        status TEXT,
-        bet_timestamp TEXT,
-        projected_lines TEXT,
-        closing_lines TEXT,
-        resolved_timestamp TEXT,
-        raw_data TEXT
-    );
-    """)
-    conn.commit()
-    conn.close()
+    with transaction(CLV_DB_PATH) as conn:
+        c = conn.cursor()
+        c.execute("""
+        CREATE TABLE IF NOT EXISTS pickem_bets (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            platform TEXT NOT NULL,
+            entry_id TEXT UNIQUE NOT NULL,
+            user_id TEXT,
+            bet_type TEXT,
+            legs_count INTEGER,
+            total_entry_amount REAL,
+            potential_payout REAL,
+            status TEXT,
+            bet_timestamp TEXT,
+            projected_lines TEXT,
+            closing_lines TEXT,
+            resolved_timestamp TEXT,
+            raw_data TEXT
+        );
+        """)
 
 def insert_pickem_bet(
     platform, entry_id, user_id, bet_type, legs_count, total_entry_amount,
@@ -106,9 +96,8 @@ def insert_pickem_bet(
     """
     Insert a pick'em bet entry. Ignores duplicates based on entry_id.
     """
-    conn = get_clv_db_connection()
-    c = conn.cursor()
-    try:
+    with transaction(CLV_DB_PATH) as conn:
+        c = conn.cursor()
         c.execute("""
         INSERT OR IGNORE INTO pickem_bets (
             platform, entry_id, user_id, bet_type, legs_count, total_entry_amount,
@@ -120,49 +109,208 @@ def insert_pickem_bet(
             potential_payout, status, bet_timestamp, projected_lines, closing_lines,
             resolved_timestamp, raw_data
         ))
-        conn.commit()
-    finally:
-        conn.close()
 def initialize_closing_line_snapshot_table():
     """
     Create table for timestamped odds snapshots if not exists.
     """
-    conn = get_clv_db_connection()
-    c = conn.cursor()
-    c.execute("""
-    CREATE TABLE IF NOT EXISTS closing_line_snapshots (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        game_date TEXT,
-        game_id TEXT,
-        player_name TEXT,
-        stat_type TEXT,
-        sportsbook TEXT,
-        line REAL,
-        odds REAL,
-        timestamp_collected TEXT
-    );
-    """
-    )
-    conn.commit()
-    conn.close()
+    with transaction(CLV_DB_PATH) as conn:
+        c = conn.cursor()
+        c.execute("""
+        CREATE TABLE IF NOT EXISTS closing_line_snapshots (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            game_date TEXT,
+            game_id TEXT,
+            player_name TEXT,
+            stat_type TEXT,
+            sportsbook TEXT,
+            line REAL,
+            odds REAL,
+            timestamp_collected TEXT
+        );
+        """
+        )
 
 def insert_closing_line_snapshot(game_date, game_id, player_name, stat_type, sportsbook, line, odds, timestamp_collected):
     """
     Insert a new odds snapshot row.
     """
+    with transaction(CLV_DB_PATH) as conn:
+        c = conn.cursor()
+        c.execute("""
+        INSERT INTO closing_line_snapshots (
+            game_date, game_id, player_name, stat_type, sportsbook, line, odds, timestamp_collected
+        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        """, (game_date, game_id, player_name, stat_type, sportsbook, line, odds, timestamp_collected))
+
+def insert_closing_line_snapshots(rows):
+    """
+    Bulk insert of (game_date, game_id, player_name, stat_type, sportsbook, line, odds,
+    timestamp_collected) tuples in one transaction. Returns the number of rows written.
+    """
+    rows = list(rows)
+    if not rows:
+        return 0
+    with transaction(CLV_DB_PATH) as conn:
+        conn.executemany("""
+        INSERT INTO closing_line_snapshots (
+            game_date, game_id, player_name, stat_type, sportsbook, line, odds, timestamp_collected
+        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        """, rows)
+    return len(rows)
+
+_games_table_ready = set()
+
+def initialize_games_table():
+    """
+    Create the games dimension (odds event id -> teams and tip-off), filled from
+    odds ingest and used by closing-line settlement.
+    """
+    with transaction(CLV_DB_PATH) as conn:
+        conn.execute("""
+        CREATE TABLE IF NOT EXISTS games (
+            game_id TEXT PRIMARY KEY,
+            home_team TEXT,
+            away_team TEXT,
+            commence_time TEXT NOT NULL,
+            updated_at TEXT
+        );
+        """)
+    _games_table_ready.add(CLV_DB_PATH)
+
+# latest_pre_tip_line rows for games whose snapshots were stored before the game
+# itself was known (the insert trigger skips those).
+_BACKFILL_LATEST_PRE_TIP_SQL = """
+    INSERT INTO latest_pre_tip_line (game_id, player_name, stat_type, sportsbook, line, odds, timestamp_collected)
+    SELECT game_id, player_name, stat_type, sportsbook, line, odds, timestamp_collected
+    FROM (
+        SELECT s.game_id, s.player_name, s.stat_type, s.sportsbook, s.line, s.odds, s.timestamp_collected,
+               ROW_NUMBER() OVER (PARTITION BY s.game_id, s.player_name, s.stat_type, s.sportsbook
+                                  ORDER BY s.timestamp_collected DESC, s.id DESC) AS rn
+        FROM closing_line_snapshots s
+        JOIN games g ON g.game_id = s.game_id
+        WHERE s.game_id IN (SELECT value FROM json_each(?))
+          AND s.timestamp_collected <= g.commence_time
+          AND s.player_name IS NOT NULL AND s.stat_type IS NOT NULL AND s.sportsbook IS NOT NULL
+    )
+    WHERE rn = 1
+    ON CONFLICT (game_id, player_name, stat_type, sportsbook) DO UPDATE SET
+        line = excluded.line,
+        odds = excluded.odds,
+        timestamp_collected = excluded.timestamp_collected
+    WHERE excluded.timestamp_collected >= latest_pre_tip_line.timestamp_collected
+"""
+
+def upsert_games(rows):
+    """
+    Insert or update (game_id, home_team, away_team, commence_time) rows in the
+    games dimension, then index any snapshots already stored for newly added
+    games into latest_pre_tip_line. Returns the number of rows written.
+    """
+    rows = [r for r in rows if r[0] and r[3]]
+    if not rows:
+        return 0
+    if CLV_DB_PATH not in _games_table_ready:
+        initialize_games_table()
+    now = datetime.utcnow().isoformat()
+    with transaction(CLV_DB_PATH) as conn:
+        game_ids = json.dumps([r[0] for r in rows])
+        known = {r[0] for r in conn.execute(
+            "SELECT game_id FROM games WHERE game_id IN (SELECT value FROM json_each(?))", (game_ids,))}
+        conn.executemany("""
+        INSERT INTO games (game_id, home_team, away_team, commence_time, updated_at)
+        VALUES (?, ?, ?, ?, ?)
+        ON CONFLICT(game_id) DO UPDATE SET
+            home_team=excluded.home_team,
+            away_team=excluded.away_team,
+            commence_time=excluded.commence_time,
+            updated_at=excluded.updated_at
+        WHERE games.commence_time IS NOT excluded.commence_time
+           OR games.home_team IS NOT excluded.home_team
+           OR games.away_team IS NOT excluded.away_team
+        """, [(*r, now) for r in rows])
+        new_ids = [r[0] for r in rows if r[0] not in known]
+        has_latest = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type='table' AND name='latest_pre_tip_line'").fetchone()
+        # Without the table, migration clv/0005 backfills everything when it runs.
+        if new_ids and has_latest:
+            conn.execute(_BACKFILL_LATEST_PRE_TIP_SQL, (json.dumps(new_ids),))
+    return len(rows)
+
+def get_commence_times(game_ids):
+    """{game_id: commence_time} from the games dimension, for the given games that it knows."""
+    if CLV_DB_PATH not in _games_table_ready:
+        initialize_games_table()
+    rows = get_clv_db_connection().execute(
+        "SELECT game_id, commence_time FROM games WHERE game_id IN (SELECT value FROM json_each(?))",
+        (json.dumps(list(game_ids)),)).fetchall()
+    return dict(rows)
+
+def get_closing_line(game_id, player_name, stat_type, sportsbook):
+    """
+    Closing line for a prop: the latest snapshot taken before its game's
+    commence_time, read from latest_pre_tip_line by primary key.
+    """
+    row = get_clv_db_connection().execute("""
+    SELECT line, odds FROM latest_pre_tip_line
+    WHERE game_id=? AND player_name=? AND stat_type=? AND sportsbook=?
+    """, (game_id, player_name, stat_type, sportsbook)).fetchone()
+    if row:
+        return {'closing_line': row[0], 'closing_odds': row[1]}
+    return None
+
+def get_last_snapshot_values(game_ids):
+    """
+    Latest stored (line, odds) per (game_id, player_name, stat_type, sportsbook)
+    for the given games, as a dict; used to seed change-only capture.
+    """
     conn = get_clv_db_connection()
-    c = conn.cursor()
-    c.execute("""
-    INSERT INTO closing_line_snapshots (
-        game_date, game_id, player_name, stat_type, sportsbook, line, odds, timestamp_collected
-    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-    """, (game_date, game_id, player_name, stat_type, sportsbook, line, odds, timestamp_collected))
-    conn.commit()
-    conn.close()
+    rows = conn.execute("""
+    SELECT game_id, player_name, stat_type, sportsbook, line, odds FROM (
+        SELECT game_id, player_name, stat_type, sportsbook, line, odds,
+               ROW_NUMBER() OVER (PARTITION BY game_id, player_name, stat_type, sportsbook
+                                  ORDER BY timestamp_collected DESC, id DESC) AS rn
+        FROM closing_line_snapshots
+        WHERE game_id IN (SELECT value FROM json_each(?))
+    ) WHERE rn = 1
+    """, (json.dumps(list(game_ids)),)).fetchall()
+    return {r[:4]: (r[4], r[5]) for r in rows}
+
+def insert_snapshot_deltas(rows, heartbeats):
+    """
+    Write changed closing_line_snapshots rows and per-event heartbeats in one transaction.
+
+    Args:
+        rows: snapshot tuples as for insert_closing_line_snapshots.
+        heartbeats: (game_id, observed_at, outcomes, changed) per observed event.
+    Returns:
+        Number of snapshot rows written.
+    """
+    rows = list(rows)
+    with transaction(CLV_DB_PATH) as conn:
+        if rows:
+            conn.executemany("""
+            INSERT INTO closing_line_snapshots (
+                game_date, game_id, player_name, stat_type, sportsbook, line, odds, timestamp_collected
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            """, rows)
+        conn.executemany("""
+        INSERT INTO closing_line_heartbeats (
+            game_id, first_observed, last_observed, last_changed, observations, outcomes, changed
+        ) VALUES (?, ?, ?, ?, 1, ?, ?)
+        ON CONFLICT(game_id) DO UPDATE SET
+            last_observed=excluded.last_observed,
+            last_changed=COALESCE(excluded.last_changed, closing_line_heartbeats.last_changed),
+            observations=closing_line_heartbeats.observations + 1,
+            outcomes=excluded.outcomes,
+            changed=excluded.changed
+        """, [(game_id, observed_at, observed_at, observed_at if changed else None, outcomes, changed)
+              for game_id, observed_at, outcomes, changed in heartbeats])
+    return len(rows)
 
 def get_latest_snapshot_before(game_id, player_name, stat_type, sportsbook, game_start_time):
     """
-    Get the latest odds snapshot before game start.
+    Get the latest odds snapshot before game start, from the full snapshot history
+    (for an arbitrary cutoff; use get_closing_line for the game's own tip-off).
     """
     conn = get_clv_db_connection()
     c = conn.cursor()
@@ -173,44 +321,52 @@ def get_latest_snapshot_before(game_id, player_name, stat_type, sportsbook, game
     ORDER BY timestamp_collected DESC LIMIT 1
     """, (game_id, player_name, stat_type, sportsbook, game_start_time))
     row = c.fetchone()
-    conn.close()
     if row:
         return {'closing_line': row[0], 'closing_odds': row[1]}
     return None
+import atexit
+import json
+import logging
+import logging.handlers
 import os
+import queue
 import sqlite3
+import threading
+import time
 from datetime import datetime
+import pandas as pd
+import config
+from config import CLV_LOG_MAX_MB, CLV_LOG_BACKUP_COUNT, CLV_LOG_BUFFER_RECORDS, CLV_LOG_FLUSH_SECONDS
+from database.connection import get_connection, transaction
+from providers.odds_store import stat_type_for
 
-CLV_DB_PATH = os.path.join(os.path.dirname(__file__), "clv_tracking.db")
-CLV_LOG_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), "logs", "clv_tracking.log")
+CLV_DB_PATH = config.CLV_DB_PATH
+CLV_LOG_PATH = os.path.join(config.LOGS_DIR, "clv_tracking.log")
 
 def get_clv_db_connection():
-    conn = sqlite3.connect(CLV_DB_PATH)
-    return conn
+    return get_connection(CLV_DB_PATH)
 
 def initialize_clv_table():
-    conn = get_clv_db_connection()
-    c = conn.cursor()
-    c.execute("""
-    CREATE TABLE IF NOT EXISTS clv_prop_snapshots (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        date TEXT NOT NULL,
-        player_name TEXT NOT NULL,
-        stat_type TEXT NOT NULL,
-        sportsbook TEXT NOT NULL,
-        line_at_pick REAL NOT NULL,
-        odds_at_pick REAL NOT NULL,
-        timestamp_at_pick TEXT NOT NULL,
-        projected_value REAL,
-        expected_value REAL,
-        closing_line REAL,
-        closing_odds REAL,
-        result TEXT,
-        clv REAL
-    );
-    """)
-    conn.commit()
-    conn.close()
+    with transaction(CLV_DB_PATH) as conn:
+        c = conn.cursor()
+        c.execute("""
+        CREATE TABLE IF NOT EXISTS clv_prop_snapshots (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            date TEXT NOT NULL,
+            player_name TEXT NOT NULL,
+            stat_type TEXT NOT NULL,
+            sportsbook TEXT NOT NULL,
+            line_at_pick REAL NOT NULL,
+            odds_at_pick REAL NOT NULL,
+            timestamp_at_pick TEXT NOT NULL,
+            projected_value REAL,
+            expected_value REAL,
+            closing_line REAL,
+            closing_odds REAL,
+            result TEXT,
+            clv REAL
+        );
+        """)
     log_clv_action("Initialized clv_prop_snapshots table.")
 
 def insert_clv_snapshot(
@@ -218,24 +374,159 @@ def insert_clv_snapshot(
     timestamp_at_pick, projected_value, expected_value,
     closing_line=None, closing_odds=None, result=None, clv=None
 ):
-    conn = get_clv_db_connection()
-    c = conn.cursor()
-    c.execute("""
-    INSERT INTO clv_prop_snapshots (
-        date, player_name, stat_type, sportsbook, line_at_pick, odds_at_pick,
-        timestamp_at_pick, projected_value, expected_value,
-        closing_line, closing_odds, result, clv
-    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-    """, (
-        date, player_name, stat_type, sportsbook, line_at_pick, odds_at_pick,
-        timestamp_at_pick, projected_value, expected_value,
-        closing_line, closing_odds, result, clv
-    ))
-    conn.commit()
-    conn.close()
+    with transaction(CLV_DB_PATH) as conn:
+        c = conn.cursor()
+        c.execute("""
+        INSERT INTO clv_prop_snapshots (
+            date, player_name, stat_type, sportsbook, line_at_pick, odds_at_pick,
+            timestamp_at_pick, projected_value, expected_value,
+            closing_line, closing_odds, result, clv
+        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, (
+            date, player_name, stat_type_for(stat_type), sportsbook, line_at_pick, odds_at_pick,
+            timestamp_at_pick, projected_value, expected_value,
+            closing_line, closing_odds, result, clv
+        ))
     log_clv_action(f"Inserted CLV snapshot for {player_name} {stat_type} on {date}.")
 
+CLV_SNAPSHOT_COLUMNS = [
+    "date", "game_id", "player_name", "stat_type", "sportsbook", "line_at_pick", "odds_at_pick",
+    "timestamp_at_pick", "projected_value", "expected_value",
+    "closing_line", "closing_odds", "result", "clv"
+]
+
+def insert_clv_snapshots(df, columns=None, defaults=None):
+    """
+    Bulk insert of clv_prop_snapshots rows from a DataFrame, in one transaction.
+
+    Args:
+        df: one row per prop.
+        columns: {table column: df column} for columns not already named as in the table.
+        defaults: {table column: value} for table columns absent from the frame
+            (timestamp_at_pick defaults to one UTC timestamp for the whole batch).
+            stat_type is normalised to the odds_store vocabulary (stat_type_for).
+    Returns:
+        Number of rows written.
+    """
+    if df is None or df.empty:
+        return 0
+    columns = columns or {}
+    defaults = {"timestamp_at_pick": datetime.utcnow().isoformat(), **(defaults or {})}
+    data = {}
+    for col in CLV_SNAPSHOT_COLUMNS:
+        source = columns.get(col, col)
+        if source in df.columns:
+            values = df[source]
+            if pd.api.types.is_datetime64_any_dtype(values):
+                values = values.map(lambda ts: ts.isoformat() if pd.notna(ts) else None)
+            data[col] = values
+        else:
+            data[col] = defaults.get(col)
+    frame = pd.DataFrame(data, index=df.index, columns=CLV_SNAPSHOT_COLUMNS).astype(object)
+    frame["stat_type"] = frame["stat_type"].map(stat_type_for)
+    frame = frame.where(frame.notna(), None)
+    with transaction(CLV_DB_PATH) as conn:
+        conn.executemany(f"""
+        INSERT INTO clv_prop_snapshots ({', '.join(CLV_SNAPSHOT_COLUMNS)})
+        VALUES ({', '.join('?' for _ in CLV_SNAPSHOT_COLUMNS)})
+        """, frame.itertuples(index=False, name=None))
+    dates = sorted(d for d in frame["date"].dropna().unique())
+    log_clv_action(f"Inserted {len(frame)} CLV snapshots for {', '.join(map(str, dates)) or 'unknown date'}.")
+    return len(frame)
+
+class _ClvLogFormatter(logging.Formatter):
+    def formatTime(self, record, datefmt=None):
+        return datetime.fromtimestamp(record.created).isoformat()
+
+
+class _BufferedHandler(logging.handlers.MemoryHandler):
+    """MemoryHandler that also flushes once its oldest buffered record is flush_seconds old."""
+
+    def __init__(self, capacity, flush_seconds, target):
+        super().__init__(capacity, flushLevel=logging.ERROR, target=target, flushOnClose=True)
+        self.flush_seconds = flush_seconds
+
+    def shouldFlush(self, record):
+        return (super().shouldFlush(record)
+                or record.created - self.buffer[0].created >= self.flush_seconds)
+
+
+class _ClvQueueListener(logging.handlers.QueueListener):
+    """
+    Builds log records from queued (created, message) pairs on the writer thread,
+    and flushes the buffer whenever the queue stays idle for flush_seconds so the
+    last lines before a quiet period reach disk.
+    """
+
+    def __init__(self, log_queue, handler, flush_seconds):
+        super().__init__(log_queue, handler)
+        self.flush_seconds = flush_seconds
+
+    def dequeue(self, block):
+        while True:
+            try:
+                item = self.queue.get(block, timeout=self.flush_seconds if block else None)
+                break
+            except queue.Empty:
+                if not block:
+                    raise
+                for handler in self.handlers:
+                    handler.flush()
+        if item is self._sentinel:
+            return item
+        created, message = item
+        record = logging.LogRecord("prop_ai.clv_audit", logging.INFO, __file__, 0, message, None, None)
+        record.created = created
+        return record
+
+
+_clv_listener = None
+_clv_buffer = None
+_clv_queue = queue.SimpleQueue()
+_clv_lock = threading.Lock()
+
+
+def _start_clv_log():
+    """
+    Start the background thread that drains the CLV audit queue, buffers the
+    records and writes them in batches to a size-rotated clv_tracking.log.
+    """
+    global _clv_listener, _clv_buffer
+    with _clv_lock:
+        if _clv_listener is not None:
+            return
+        os.makedirs(os.path.dirname(CLV_LOG_PATH), exist_ok=True)
+        file_handler = logging.handlers.RotatingFileHandler(
+            CLV_LOG_PATH, maxBytes=int(CLV_LOG_MAX_MB * 1024 * 1024),
+            backupCount=CLV_LOG_BACKUP_COUNT, encoding="utf-8")
+        file_handler.setFormatter(_ClvLogFormatter("%(asctime)s | %(message)s"))
+        _clv_buffer = _BufferedHandler(CLV_LOG_BUFFER_RECORDS, CLV_LOG_FLUSH_SECONDS, file_handler)
+        _clv_listener = _ClvQueueListener(_clv_queue, _clv_buffer, CLV_LOG_FLUSH_SECONDS)
+        _clv_listener.start()
+
+
+def flush_clv_log(shutdown=False):
+    """Write out every queued and buffered CLV log line; with shutdown=True also close the file."""
+    global _clv_listener, _clv_buffer
+    with _clv_lock:
+        if _clv_listener is None:
+            return
+        _clv_listener.stop()  # drains the queue
+        _clv_buffer.flush()
+        if shutdown:
+            file_handler = _clv_buffer.target
+            _clv_buffer.close()
+            file_handler.close()
+            _clv_listener = _clv_buffer = None
+        else:
+            _clv_listener.start()
+
+
+atexit.register(flush_clv_log, shutdown=True)
+
+
 def log_clv_action(message):
-    os.makedirs(os.path.dirname(CLV_LOG_PATH), exist_ok=True)
-    with open(CLV_LOG_PATH, "a", encoding="utf-8") as f:
-        f.write(f"{datetime.now().isoformat()} | {message}\n")
+    """Append a line to the CLV audit log; callers only pay for an enqueue."""
+    if _clv_listener is None:
+        _start_clv_log()
+    _clv_queue.put((time.time(), message))
@@ -0,0 +1,90 @@
+"""
+connection.py
+
+Shared SQLite connection management for every database in the project.
+
+Connections are cached per thread and per database file, opened once with
+WAL journaling and tuned pragmas, and reused for the life of the thread, so
+the scheduler's snapshot thread and the pipeline can write concurrently
+without `database is locked` stalls or a connect/close per row.
+
+Functions:
+    get_connection(db_path): Cached connection for the calling thread.
+    transaction(db_path): Context manager yielding a connection inside
+        BEGIN IMMEDIATE ... COMMIT (ROLLBACK on error). Nested use joins the
+        outer transaction.
+    close_thread_connections(): Close the calling thread's cached connections.
+"""
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+from config import SQLITE_BUSY_TIMEOUT_MS, SQLITE_CACHE_SIZE_KB, SQLITE_MMAP_SIZE_MB
+
+_local = threading.local()
+
+
+class PooledConnection(sqlite3.Connection):
+    """
+    A connection owned by the per-thread pool. close() is a no-op so legacy
+    call sites that close after every query keep working without tearing the
+    cached connection down; use close_thread_connections() to really close.
+    """
+
+    _tx_depth = 0
+
+    def close(self):
+        pass
+
+    def _close(self):
+        super().close()
+
+
+def _apply_pragmas(conn):
+    conn.execute(f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS}")
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute(f"PRAGMA cache_size=-{SQLITE_CACHE_SIZE_KB}")
+    conn.execute(f"PRAGMA mmap_size={SQLITE_MMAP_SIZE_MB * 1024 * 1024}")
+    conn.execute("PRAGMA temp_store=MEMORY")
+
+
+def get_connection(db_path):
+    connections = getattr(_local, "connections", None)
+    if connections is None:
+        connections = _local.connections = {}
+    key = os.path.abspath(db_path)
+    conn = connections.get(key)
+    if conn is None:
+        conn = sqlite3.connect(key, timeout=SQLITE_BUSY_TIMEOUT_MS / 1000, factory=PooledConnection)
+        _apply_pragmas(conn)
+        connections[key] = conn
+    return conn
+
+
+@contextmanager
+def transaction(db_path):
+    conn = get_connection(db_path)
+    if conn._tx_depth == 0:
+        if conn.in_transaction:
+            # Flush anything a legacy caller left uncommitted before taking the write lock.
+            conn.commit()
+        conn.execute("BEGIN IMMEDIATE")
+    conn._tx_depth += 1
+    try:
+        yield conn
+    except BaseException:
+        conn._tx_depth -= 1
+        if conn._tx_depth == 0 and conn.in_transaction:
+            conn.rollback()
+        raise
+    conn._tx_depth -= 1
+    if conn._tx_depth == 0 and conn.in_transaction:
+        conn.commit()
+
+
+def close_thread_connections():
+    connections = getattr(_local, "connections", None) or {}
+    for conn in connections.values():
+        conn._close()
+    connections.clear()
@@ -1,24 +1,40 @@
 # CLV table initialization (called from pipeline)
 def initialize_clv_tracking():
-    from database.clv_tracking import initialize_clv_table
+    from database.clv_tracking import (
+        CLV_DB_PATH, initialize_clv_table, initialize_closing_line_snapshot_table,
+        initialize_prop_correlations_table, initialize_pickem_bets_table,
+        initialize_suggested_parlays_table, initialize_games_table
+    )
+    from database.schema_migrations import run_migrations
     initialize_clv_table()
+    initialize_closing_line_snapshot_table()
+    initialize_prop_correlations_table()
+    initialize_pickem_bets_table()
+    initialize_suggested_parlays_table()
+    initialize_games_table()
+    run_migrations(CLV_DB_PATH, "clv")
 
 import sqlite3
 import os
 from config import DB_PATH
+from database.connection import get_connection, transaction
 
 def get_recent_players_by_date(days=7):
     import datetime
-    conn = sqlite3.connect(DB_PATH)
+    conn = get_connection(DB_PATH)
     c = conn.cursor()
     seven_days_ago = (datetime.datetime.now() - datetime.timedelta(days=days)).strftime('%Y-%m-%d')
     c.execute('''SELECT DISTINCT player_id, name, team FROM players WHERE player_id IN (SELECT player_id FROM game_logs WHERE game_date >= ?)''', (seven_days_ago,))
     players = c.fetchall()
-    conn.close()
     return players
 
 def initialize_database():
-    conn = sqlite3.connect(DB_PATH)
+    from database.schema_migrations import run_migrations
+    with transaction(DB_PATH) as conn:
+        _create_tables(conn)
+    run_migrations(DB_PATH, "player")
+
+def _create_tables(conn):
     c = conn.cursor()
     c.execute('''CREATE TABLE IF NOT EXISTS players (
         player_id INTEGER PRIMARY KEY,
@@ -51,49 +67,76 @@ def initialize_database():
         line REAL,
         sportsbook TEXT
     )''')
-    conn.commit()
-    conn.close()
+
+_UPSERT_GAME_LOG_SQL = '''INSERT INTO game_logs (player_id, game_date, minutes, points, rebounds, assists)
+                 VALUES (?, ?, ?, ?, ?, ?)
+                 ON CONFLICT(player_id, game_date) DO UPDATE SET
+                     minutes=excluded.minutes,
+                     points=excluded.points,
+                     rebounds=excluded.rebounds,
+                     assists=excluded.assists'''
+
+def save_box_scores(rows):
+    """
+    Persist one or many box scores in a single transaction.
+    Args:
+        rows: iterable of dicts with player_id, player_name, team, game_date,
+              minutes, points, rebounds, assists
+    Returns:
+        int: number of game log rows written
+    """
+    rows = [r for r in rows if r.get('player_id') is not None and r.get('game_date')]
+    if not rows:
+        return 0
+    with transaction(DB_PATH) as conn:
+        conn.executemany('''INSERT OR IGNORE INTO players (player_id, name, team) VALUES (?, ?, ?)''',
+                         [(r['player_id'], r['player_name'], r['team']) for r in rows])
+        conn.executemany(_UPSERT_GAME_LOG_SQL,
+                         [(r['player_id'], r['game_date'], r['minutes'], r['points'], r['rebounds'], r['assists']) for r in rows])
+    return len(rows)
 
 def save_player(player):
-    from config import DB_PATH
-    conn = sqlite3.connect(DB_PATH)
-    c = conn.cursor()
-    c.execute('''INSERT OR IGNORE INTO players (player_id, name, team) VALUES (?, ?, ?)''',
-              (player['player_id'], player['player_name'], player['team']))
-    conn.commit()
-    conn.close()
+    with transaction(DB_PATH) as conn:
+        conn.execute('''INSERT OR IGNORE INTO players (player_id, name, team) VALUES (?, ?, ?)''',
+                     (player['player_id'], player['player_name'], player['team']))
 
 def save_game_log(player_id, stats):
-    from config import DB_PATH
-    conn = sqlite3.connect(DB_PATH)
-    c = conn.cursor()
-    c.execute('''INSERT INTO game_logs (player_id, game_date, minutes, points, rebounds, assists)
-                 VALUES (?, ?, ?, ?, ?, ?)''',
-              (player_id, stats['game_date'], stats['minutes'], stats['points'], stats['rebounds'], stats['assists']))
-    conn.commit()
-    conn.close()
+    with transaction(DB_PATH) as conn:
+        conn.execute(_UPSERT_GAME_LOG_SQL,
+                     (player_id, stats['game_date'], stats['minutes'], stats['points'], stats['rebounds'], stats['assists']))
 
 def get_player_recent_stats(player_id, last_n=10):
-    from config import DB_PATH
-    conn = sqlite3.connect(DB_PATH)
+    conn = get_connection(DB_PATH)
     c = conn.cursor()
     c.execute('''SELECT minutes, points, rebounds, assists FROM game_logs WHERE player_id=? ORDER BY game_date DESC LIMIT ?''',
               (player_id, last_n))
     rows = c.fetchall()
-    conn.close()
     return rows
 
+def get_recent_stats_for_players(player_ids, last_n=10):
+    """
+    Last `last_n` game logs for every player in one windowed query.
+    Returns a DataFrame with player_id, game_date, minutes, points, rebounds, assists.
+    """
+    import json
+    import pandas as pd
+    conn = get_connection(DB_PATH)
+    return pd.read_sql_query('''
+        SELECT player_id, game_date, minutes, points, rebounds, assists FROM (
+            SELECT player_id, game_date, minutes, points, rebounds, assists,
+                   ROW_NUMBER() OVER (PARTITION BY player_id ORDER BY game_date DESC) AS rn
+            FROM game_logs
+            WHERE player_id IN (SELECT value FROM json_each(?))
+        ) WHERE rn <= ?''', conn, params=(json.dumps(list(player_ids), default=int), last_n))
+
 # Robust JSON import with UTF-8 handling
 def import_json_to_table(json_path, table_name, mapping_func):
     import json
-    from config import DB_PATH
-    conn = sqlite3.connect(DB_PATH)
-    c = conn.cursor()
     with open(json_path, 'r', encoding='utf-8') as f:
         data = json.load(f)
-    for record in data:
-        values = mapping_func(record)
-        placeholders = ','.join(['?'] * len(values))
-        c.execute(f'INSERT OR IGNORE INTO {table_name} VALUES ({placeholders})', values)
-    conn.commit()
-    conn.close()
+    with transaction(DB_PATH) as conn:
+        c = conn.cursor()
+        for record in data:
+            values = mapping_func(record)
+            placeholders = ','.join(['?'] * len(values))
+            c.execute(f'INSERT OR IGNORE INTO {table_name} VALUES ({placeholders})', values)
@@ -0,0 +1,3 @@
+-- Closing-line lookup: equality on the prop key, range + ORDER BY on time.
+CREATE INDEX IF NOT EXISTS ix_closing_line_snapshots_lookup
+    ON closing_line_snapshots(game_id, player_name, stat_type, sportsbook, timestamp_collected);
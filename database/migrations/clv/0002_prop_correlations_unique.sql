@@ -0,0 +1,7 @@
+-- upsert_prop_correlation uses ON CONFLICT(player1_id, player2_id, stat1, stat2),
+-- which requires a matching unique index. Keep the latest row per key first.
+DELETE FROM prop_correlations WHERE id NOT IN (
+    SELECT MAX(id) FROM prop_correlations GROUP BY player1_id, player2_id, stat1, stat2
+);
+CREATE UNIQUE INDEX IF NOT EXISTS ux_prop_correlations_pair
+    ON prop_correlations(player1_id, player2_id, stat1, stat2);
@@ -0,0 +1,3 @@
+-- Settlement selects only props without a closing line yet.
+CREATE INDEX IF NOT EXISTS ix_clv_prop_snapshots_unsettled
+    ON clv_prop_snapshots(id) WHERE closing_line IS NULL OR closing_odds IS NULL;
@@ -0,0 +1,3 @@
+-- Props carry the odds event id of their game so settlement can join them to
+-- the games dimension and to closing_line_snapshots in one statement.
+ALTER TABLE clv_prop_snapshots ADD COLUMN game_id TEXT;
@@ -0,0 +1,44 @@
+-- Latest pre-tip-off snapshot per (game, player, stat, book), kept current by a
+-- trigger on closing_line_snapshots so closing lines are a primary-key read and
+-- settlement no longer depends on the raw snapshot history.
+CREATE TABLE IF NOT EXISTS latest_pre_tip_line (
+    game_id TEXT NOT NULL,
+    player_name TEXT NOT NULL,
+    stat_type TEXT NOT NULL,
+    sportsbook TEXT NOT NULL,
+    line REAL,
+    odds REAL,
+    timestamp_collected TEXT NOT NULL,
+    PRIMARY KEY (game_id, player_name, stat_type, sportsbook)
+) WITHOUT ROWID;
+
+-- Only snapshots taken before the game's commence_time (games dimension) count;
+-- an out-of-order older snapshot never replaces a newer one.
+CREATE TRIGGER IF NOT EXISTS trg_closing_line_snapshots_latest_pre_tip
+AFTER INSERT ON closing_line_snapshots
+WHEN NEW.game_id IS NOT NULL AND NEW.player_name IS NOT NULL
+ AND NEW.stat_type IS NOT NULL AND NEW.sportsbook IS NOT NULL
+ AND NEW.timestamp_collected <= (SELECT commence_time FROM games WHERE game_id = NEW.game_id)
+BEGIN
+    INSERT INTO latest_pre_tip_line (game_id, player_name, stat_type, sportsbook, line, odds, timestamp_collected)
+    VALUES (NEW.game_id, NEW.player_name, NEW.stat_type, NEW.sportsbook, NEW.line, NEW.odds, NEW.timestamp_collected)
+    ON CONFLICT (game_id, player_name, stat_type, sportsbook) DO UPDATE SET
+        line = excluded.line,
+        odds = excluded.odds,
+        timestamp_collected = excluded.timestamp_collected
+    WHERE excluded.timestamp_collected >= latest_pre_tip_line.timestamp_collected;
+END;
+
+-- Backfill from the existing history.
+INSERT INTO latest_pre_tip_line (game_id, player_name, stat_type, sportsbook, line, odds, timestamp_collected)
+SELECT game_id, player_name, stat_type, sportsbook, line, odds, timestamp_collected
+FROM (
+    SELECT s.game_id, s.player_name, s.stat_type, s.sportsbook, s.line, s.odds, s.timestamp_collected,
+           ROW_NUMBER() OVER (PARTITION BY s.game_id, s.player_name, s.stat_type, s.sportsbook
+                              ORDER BY s.timestamp_collected DESC, s.id DESC) AS rn
+    FROM closing_line_snapshots s
+    JOIN games g ON g.game_id = s.game_id
+    WHERE s.timestamp_collected <= g.commence_time
+      AND s.player_name IS NOT NULL AND s.stat_type IS NOT NULL AND s.sportsbook IS NOT NULL
+)
+WHERE rn = 1;
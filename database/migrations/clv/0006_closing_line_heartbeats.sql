@@ -0,0 +1,12 @@
+-- One row per event recording when the snapshot collector last observed it.
+-- Snapshot rows are written only when a (line, odds) changes, so this is what
+-- shows a line was still current at a later time.
+CREATE TABLE IF NOT EXISTS closing_line_heartbeats (
+    game_id TEXT PRIMARY KEY,
+    first_observed TEXT NOT NULL,
+    last_observed TEXT NOT NULL,
+    last_changed TEXT,
+    observations INTEGER NOT NULL DEFAULT 1,
+    outcomes INTEGER,
+    changed INTEGER
+);
@@ -0,0 +1,22 @@
+-- Picks used to be logged with box-score labels (PTS/REB/AST) while closing
+-- lines use the market-derived vocabulary (odds_store.STAT_TYPE_BY_MARKET), so
+-- they never matched at settlement. Rewrite stored picks into the vocabulary;
+-- insert_clv_snapshots normalises new ones.
+UPDATE clv_prop_snapshots
+SET stat_type = CASE upper(stat_type)
+    WHEN 'PTS' THEN 'POINTS'
+    WHEN 'REB' THEN 'REBOUNDS'
+    WHEN 'AST' THEN 'ASSISTS'
+    WHEN '3PM' THEN 'THREES'
+    WHEN 'FG3M' THEN 'THREES'
+    WHEN 'BLK' THEN 'BLOCKS'
+    WHEN 'STL' THEN 'STEALS'
+    WHEN 'TOV' THEN 'TURNOVERS'
+    WHEN 'PRA' THEN 'POINTS_REBOUNDS_ASSISTS'
+    ELSE CASE WHEN upper(stat_type) LIKE 'PLAYER\_%' ESCAPE '\' THEN upper(substr(stat_type, 8))
+              ELSE upper(stat_type) END
+END
+WHERE stat_type IS NOT upper(stat_type)
+   OR upper(stat_type) IN ('PTS', 'REB', 'AST', '3PM', 'FG3M', 'BLK', 'STL', 'TOV', 'PRA')
+   OR upper(stat_type) LIKE 'PLAYER\_%' ESCAPE '\';
+
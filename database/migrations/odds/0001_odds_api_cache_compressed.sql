@@ -0,0 +1,9 @@
+-- Responses are stored compressed in response_blob; codec names the encoding
+-- ('zlib', 'zstd'). Rows written before this migration keep their TEXT in
+-- response_json under codec 'identity' until eviction removes them.
+-- size_bytes lets the size cap be enforced without reading the payloads.
+ALTER TABLE odds_api_cache ADD COLUMN codec TEXT NOT NULL DEFAULT 'identity';
+ALTER TABLE odds_api_cache ADD COLUMN response_blob BLOB;
+ALTER TABLE odds_api_cache ADD COLUMN size_bytes INTEGER NOT NULL DEFAULT 0;
+UPDATE odds_api_cache SET size_bytes = COALESCE(length(CAST(response_json AS BLOB)), 0);
+CREATE INDEX IF NOT EXISTS ix_odds_api_cache_fetched_at ON odds_api_cache(fetched_at);
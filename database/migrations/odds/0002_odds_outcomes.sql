@@ -0,0 +1,22 @@
+-- Current odds, one row per (event, book, market, outcome, player), flattened
+-- from the bookmakers -> markets -> outcomes JSON when a response is ingested.
+-- description holds the player for prop markets ('' otherwise); fetched_at is
+-- the fetch that produced the row's current point/price.
+CREATE TABLE IF NOT EXISTS odds_outcomes (
+    event_id TEXT NOT NULL,
+    sport TEXT,
+    commence_time TEXT,
+    home_team TEXT,
+    away_team TEXT,
+    bookmaker TEXT NOT NULL,
+    market TEXT NOT NULL,
+    outcome TEXT NOT NULL,
+    description TEXT NOT NULL DEFAULT '',
+    point REAL,
+    price REAL,
+    last_update TEXT,
+    fetched_at TEXT NOT NULL,
+    PRIMARY KEY (event_id, bookmaker, market, outcome, description)
+);
+CREATE INDEX IF NOT EXISTS ix_odds_outcomes_market_event ON odds_outcomes(market, event_id);
+CREATE INDEX IF NOT EXISTS ix_odds_outcomes_commence_time ON odds_outcomes(commence_time);
@@ -0,0 +1,21 @@
+-- Line movements detected when a payload is ingested into odds_outcomes, and a
+-- per-consumer cursor so each consumer reads only movements it has not seen.
+CREATE TABLE IF NOT EXISTS odds_line_movements (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    detected_at TEXT NOT NULL,
+    event_id TEXT NOT NULL,
+    bookmaker TEXT NOT NULL,
+    market TEXT NOT NULL,
+    outcome TEXT NOT NULL,
+    description TEXT NOT NULL DEFAULT '',
+    kind TEXT NOT NULL,
+    old_point REAL,
+    new_point REAL,
+    old_price REAL,
+    new_price REAL
+);
+CREATE INDEX IF NOT EXISTS ix_odds_line_movements_event ON odds_line_movements(event_id, market);
+CREATE TABLE IF NOT EXISTS odds_movement_cursors (
+    consumer TEXT PRIMARY KEY,
+    last_id INTEGER NOT NULL
+);
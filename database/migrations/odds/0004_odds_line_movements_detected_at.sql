@@ -0,0 +1,2 @@
+-- Retention pruning deletes by detected_at.
+CREATE INDEX IF NOT EXISTS ix_odds_line_movements_detected_at ON odds_line_movements(detected_at);
@@ -0,0 +1,7 @@
+-- One row per player per game: drop duplicates left by earlier re-fetches
+-- (keeping the latest insert) and add the key the game_logs upserts target.
+-- Also serves "WHERE player_id=? ORDER BY game_date DESC LIMIT ?".
+DELETE FROM game_logs WHERE id NOT IN (
+    SELECT MAX(id) FROM game_logs GROUP BY player_id, game_date
+);
+CREATE UNIQUE INDEX IF NOT EXISTS ux_game_logs_player_date ON game_logs(player_id, game_date);
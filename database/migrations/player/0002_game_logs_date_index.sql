@@ -0,0 +1,4 @@
+-- Date-range scans: "SELECT DISTINCT game_date ... WHERE game_date BETWEEN"
+-- and the recent-players subquery "SELECT player_id ... WHERE game_date >= ?"
+-- are both answered from this covering index.
+CREATE INDEX IF NOT EXISTS ix_game_logs_date_player ON game_logs(game_date, player_id);
@@ -0,0 +1,7 @@
+-- Legacy rows may hold a full ISO timestamp while writes now store the date
+-- only; 0001 keyed on the raw value, so the same game could be kept twice.
+-- Keep the latest row per player and day, then normalise the dates.
+DELETE FROM game_logs WHERE id NOT IN (
+    SELECT MAX(id) FROM game_logs GROUP BY player_id, substr(game_date, 1, 10)
+);
+UPDATE game_logs SET game_date = substr(game_date, 1, 10) WHERE length(game_date) > 10;
@@ -0,0 +1,92 @@
+"""
+schema_migrations.py
+
+Versioned schema migrations for the project's SQLite databases.
+
+Migrations are plain SQL files under database/migrations/<scope>/ named
+NNNN_description.sql. Each scope (e.g. 'player' for prop_ai.db, 'clv' for
+clv_tracking.db) is versioned independently in a schema_version table inside
+the database it migrates. Pending files are applied in version order, each
+in its own transaction together with its schema_version row, so a failed
+migration leaves the database at the previous version.
+
+Functions:
+    run_migrations(db_path, scope): Apply pending migrations; returns the names applied.
+    current_version(db_path, scope): Highest applied version for a scope (0 if none).
+"""
+import logging
+import os
+import re
+import sqlite3
+from datetime import datetime
+from database.connection import get_connection, transaction
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(__file__), "migrations")
+_FILENAME_RE = re.compile(r"^(\d+)_([\w\-]+)\.sql$")
+
+
+def _ensure_version_table(db_path):
+    with transaction(db_path) as conn:
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS schema_version (
+                scope TEXT NOT NULL,
+                version INTEGER NOT NULL,
+                name TEXT NOT NULL,
+                applied_at TEXT NOT NULL,
+                PRIMARY KEY (scope, version)
+            )
+        """)
+
+
+def current_version(db_path, scope):
+    _ensure_version_table(db_path)
+    row = get_connection(db_path).execute(
+        "SELECT MAX(version) FROM schema_version WHERE scope=?", (scope,)
+    ).fetchone()
+    return row[0] or 0
+
+
+def _discover(scope):
+    scope_dir = os.path.join(MIGRATIONS_DIR, scope)
+    if not os.path.isdir(scope_dir):
+        return []
+    found = []
+    for fname in os.listdir(scope_dir):
+        m = _FILENAME_RE.match(fname)
+        if m:
+            found.append((int(m.group(1)), fname, os.path.join(scope_dir, fname)))
+    return sorted(found)
+
+
+def _split_statements(sql):
+    """Split a script into complete statements (trigger bodies stay intact)."""
+    statements, buf = [], ""
+    for line in sql.splitlines(True):
+        buf += line
+        if sqlite3.complete_statement(buf):
+            if buf.strip():
+                statements.append(buf.strip())
+            buf = ""
+    if buf.strip():
+        statements.append(buf.strip())
+    return statements
+
+
+def run_migrations(db_path, scope):
+    applied = []
+    version = current_version(db_path, scope)
+    for number, fname, path in _discover(scope):
+        if number <= version:
+            continue
+        with open(path, "r", encoding="utf-8") as f:
+            sql = f.read()
+        with transaction(db_path) as conn:
+            for statement in _split_statements(sql):
+                conn.execute(statement)
+            conn.execute(
+                "INSERT INTO schema_version (scope, version, name, applied_at) VALUES (?, ?, ?, ?)",
+                (scope, number, fname, datetime.utcnow().isoformat())
+            )
+        logging.info(f"Applied {scope} migration {fname}")
+        applied.append(fname)
+    return applied
@@ -7,12 +7,13 @@ logger = logging.getLogger(__name__)
 
 """
 Fetch NBA games for today's date using OddsAPI provider.
+Pass `today` (a date) to filter for another day, e.g. when replaying a recorded slate.
 Returns: List of games for today.
 """
-def fetch_games_for_today():
+def fetch_games_for_today(today=None):
     games = fetch_nba_games_and_markets()
     from datetime import datetime, timedelta
-    today = datetime.now().date()
+    today = today or datetime.now().date()
     tomorrow = today + timedelta(days=1)
     filtered_games = []
     for game in games:
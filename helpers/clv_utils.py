@@ -1,55 +1,78 @@
-import os
 from datetime import datetime
-from database.clv_tracking import get_clv_db_connection, log_clv_action
+from database.clv_tracking import log_clv_action, CLV_DB_PATH
+from database.connection import transaction
 
-def update_closing_lines_for_unsettled_props():
+# Every unsettled prop whose game has tipped off takes its closing line from
+# latest_pre_tip_line (maintained on snapshot insert, migration clv/0005),
+# joined on the table's primary key, in one statement. Stat types are in the
+# odds_store vocabulary on both sides (insert_clv_snapshots normalises picks).
+_SETTLE_SQL = """
+    UPDATE clv_prop_snapshots AS p
+    SET closing_line = l.line,
+        closing_odds = l.odds,
+        clv = l.line - p.line_at_pick
+    FROM latest_pre_tip_line l
+    JOIN games g ON g.game_id = l.game_id
+    WHERE l.game_id = p.game_id AND l.player_name = p.player_name
+      AND l.stat_type = p.stat_type AND l.sportsbook = p.sportsbook
+      AND (p.closing_line IS NULL OR p.closing_odds IS NULL)
+      AND g.commence_time < ?
+      AND l.timestamp_collected <= g.commence_time
+      AND l.line IS NOT NULL
+"""
+
+# Sportsbook recorded for picks no book quoted when they were logged.
+ANY_SPORTSBOOK = "unknown"
+
+# Picks logged without a book settle against the last pre-tip quote from any
+# book for the same (game, player, stat); ties go to the first book by name.
+_SETTLE_ANY_BOOK_SQL = """
+    UPDATE clv_prop_snapshots AS p
+    SET closing_line = l.line,
+        closing_odds = l.odds,
+        clv = l.line - p.line_at_pick
+    FROM (
+        SELECT l.game_id, l.player_name, l.stat_type, l.line, l.odds,
+               ROW_NUMBER() OVER (PARTITION BY l.game_id, l.player_name, l.stat_type
+                                  ORDER BY l.timestamp_collected DESC, l.sportsbook) AS rn
+        FROM latest_pre_tip_line l
+        JOIN games g ON g.game_id = l.game_id
+        WHERE g.commence_time < ?
+          AND l.timestamp_collected <= g.commence_time
+          AND l.line IS NOT NULL
+          AND l.game_id IN (SELECT game_id FROM clv_prop_snapshots
+                            WHERE sportsbook = ? AND (closing_line IS NULL OR closing_odds IS NULL))
+    ) l
+    WHERE l.rn = 1 AND l.game_id = p.game_id AND l.player_name = p.player_name
+      AND l.stat_type = p.stat_type AND p.sportsbook = ?
+      AND (p.closing_line IS NULL OR p.closing_odds IS NULL)
+"""
+
+def update_closing_lines_for_unsettled_props(now=None):
     """
     Updates closing_line and closing_odds for unsettled props using latest snapshot before game start.
-    Computes CLV. Logs all updates to logs/clv_tracking.log.
+    Computes CLV. Props are settled with set-based UPDATEs joining the games dimension
+    and latest_pre_tip_line: on their own book, or on any book for props logged with
+    sportsbook ANY_SPORTSBOOK. Logs a summary to logs/clv_tracking.log.
+    Returns: number of props settled.
     """
-    import logging
-    from database.clv_tracking import get_latest_snapshot_before
-    BATCH_SIZE = 20
-    conn = get_clv_db_connection()
-    c = conn.cursor()
-    c.execute("""
-        SELECT id, player_name, stat_type, date, line_at_pick, sportsbook, game_id
-        FROM clv_prop_snapshots
-        WHERE closing_line IS NULL OR closing_odds IS NULL
-    """)
-    rows = c.fetchall()
-    if not rows:
-        log_clv_action("No unsettled props found for CLV update.")
-        conn.close()
-        return
-
-    updates = []
-    for row in rows:
-        prop_id, player_name, stat_type, date, line_at_pick, sportsbook, game_id = row
-        # Assume game start time is available as commence_time in ISO format in a games table
-        c2 = conn.cursor()
-        c2.execute("SELECT commence_time FROM games WHERE game_id=?", (game_id,))
-        game_row = c2.fetchone()
-        if not game_row:
-            log_clv_action(f"No game start time for {game_id} ({player_name} {stat_type})")
-            continue
-        game_start_time = game_row[0]
-        now = datetime.utcnow().isoformat()
-        if now > game_start_time:
-            closing = get_latest_snapshot_before(game_id, player_name, stat_type, sportsbook, game_start_time)
-            if closing and closing.get('closing_line') is not None:
-                closing_line = closing['closing_line']
-                closing_odds = closing.get('closing_odds')
-                clv = closing_line - line_at_pick if closing_line is not None and line_at_pick is not None else None
-                updates.append((closing_line, closing_odds, clv, prop_id))
-                log_clv_action(f"Set closing line for {player_name} {stat_type} {date} (id={prop_id}): line={closing_line}, odds={closing_odds}, clv={clv}")
-            else:
-                log_clv_action(f"No closing snapshot for {player_name} {stat_type} {date} (id={prop_id})")
-    if updates:
-        c.executemany("""
-            UPDATE clv_prop_snapshots
-            SET closing_line=?, closing_odds=?, clv=?
-            WHERE id=?
-        """, updates)
-        conn.commit()
-    conn.close()
+    now = now or datetime.utcnow().isoformat()
+    with transaction(CLV_DB_PATH) as conn:
+        unsettled, no_game, not_started = conn.execute("""
+            SELECT COUNT(*),
+                   SUM(g.game_id IS NULL),
+                   SUM(g.game_id IS NOT NULL AND g.commence_time >= ?)
+            FROM clv_prop_snapshots p
+            LEFT JOIN games g ON g.game_id = p.game_id
+            WHERE p.closing_line IS NULL OR p.closing_odds IS NULL
+        """, (now,)).fetchone()
+        if not unsettled:
+            log_clv_action("No unsettled props found for CLV update.")
+            return 0
+        settled = conn.execute(_SETTLE_SQL, (now,)).rowcount
+        settled += conn.execute(_SETTLE_ANY_BOOK_SQL, (now, ANY_SPORTSBOOK, ANY_SPORTSBOOK)).rowcount
+    log_clv_action(
+        f"Settled {settled} of {unsettled} unsettled props: {no_game or 0} without a known game, "
+        f"{not_started or 0} not started, {unsettled - settled - (no_game or 0) - (not_started or 0)} "
+        f"without a closing snapshot.")
+    return settled
@@ -41,7 +41,8 @@ def setup_logging(log_path):
 
 # === Helper 4: Get DB connection ===
 def get_db_conn():
-    return sqlite3.connect(config.DB_PATH)
+    from database.connection import get_connection
+    return get_connection(config.DB_PATH)
 
 # === Helper 5: Init runs table ===
 def init_runs_table():
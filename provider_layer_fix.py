@@ -3,6 +3,7 @@
 
 import requests
 import logging
+from providers.http_client import http_get
 from datetime import datetime
 import time
 
@@ -23,7 +24,7 @@ def fetch_todays_games(retries=3, delay=2):
     for attempt in range(1, retries + 1):
         try:
             logging.info(f"Fetching games for today: {today_str}")
-            response = requests.get(GAMES_ENDPOINT, params=params)
+            response = http_get(GAMES_ENDPOINT, params=params)
             logging.info(f"Request URL: {response.url} | Status: {response.status_code}")
             logging.info(f"Raw response snippet: {response.text[:200]}")  # first 200 chars
 
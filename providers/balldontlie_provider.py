@@ -2,9 +2,19 @@
 import requests
 from datetime import datetime
 from zoneinfo import ZoneInfo
+from collections import OrderedDict
+import hashlib
+import json
+import threading
 import time
 import logging
 import os
+from config import DB_PATH, BDL_CACHE_MAX_ENTRIES, BDL_REQUESTS_PER_MINUTE
+from providers.rate_limiter import TokenBucket
+from providers.http_client import http_get
+from providers.http_cassettes import cassette_mode
+from providers.retry_policy import RetryPolicy, CircuitOpenError
+from database.connection import get_connection, transaction
 
 ET = ZoneInfo("America/New_York")
 
@@ -17,34 +27,203 @@ logging.basicConfig(
 )
 
 
+def parse_minutes(value):
+    """BallDontLie reports minutes as a number, "34" or "34:12"; normalise to float."""
+    if value is None or value == "":
+        return 0.0
+    if isinstance(value, (int, float)):
+        return float(value)
+    try:
+        if ":" in value:
+            mins, secs = value.split(":", 1)
+            return int(mins) + int(secs) / 60
+        return float(value)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+class ResponseCache:
+    """
+    Two-tier cache for provider responses: an in-process LRU in front of a
+    SQLite table, so repeated lookups within a run skip both the network and
+    the disk, and later runs (e.g. the three daily scheduler scans) skip the
+    network for data that has not expired.
+
+    Entries carry an absolute expiry; an expiry of None means the entry never
+    expires (used for final box scores).
+    """
+
+    def __init__(self, db_path, max_entries=512):
+        self.db_path = db_path
+        self.max_entries = max_entries
+        self._lru = OrderedDict()
+        self._lock = threading.Lock()
+        self._ensure_table()
+
+    def _ensure_table(self):
+        with transaction(self.db_path) as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS bdl_api_cache (
+                    cache_key TEXT PRIMARY KEY,
+                    endpoint TEXT,
+                    fetched_at REAL,
+                    expires_at REAL,
+                    response_json TEXT
+                )
+            """)
+
+    @staticmethod
+    def make_key(endpoint, params):
+        params_json = json.dumps(params or {}, sort_keys=True, default=str)
+        return hashlib.sha256(f"{endpoint}|{params_json}".encode()).hexdigest()
+
+    def _remember(self, key, expires_at, payload):
+        with self._lock:
+            self._lru[key] = (expires_at, payload)
+            self._lru.move_to_end(key)
+            while len(self._lru) > self.max_entries:
+                self._lru.popitem(last=False)
+
+    def get(self, key):
+        now = time.time()
+        with self._lock:
+            entry = self._lru.get(key)
+            if entry is not None:
+                expires_at, payload = entry
+                if expires_at is None or expires_at > now:
+                    self._lru.move_to_end(key)
+                    return payload
+                del self._lru[key]
+        row = get_connection(self.db_path).execute(
+            "SELECT expires_at, response_json FROM bdl_api_cache WHERE cache_key=?", (key,)
+        ).fetchone()
+        if not row or (row[0] is not None and row[0] <= now):
+            return None
+        payload = json.loads(row[1])
+        self._remember(key, row[0], payload)
+        return payload
+
+    def set(self, key, endpoint, payload, ttl_seconds):
+        now = time.time()
+        expires_at = None if ttl_seconds is None else now + ttl_seconds
+        self._remember(key, expires_at, payload)
+        with transaction(self.db_path) as conn:
+            conn.execute(
+                "REPLACE INTO bdl_api_cache (cache_key, endpoint, fetched_at, expires_at, response_json) VALUES (?, ?, ?, ?, ?)",
+                (key, endpoint, now, expires_at, json.dumps(payload))
+            )
+
+
+_shared_cache = None
+_shared_cache_lock = threading.Lock()
+
+
+def get_shared_response_cache():
+    """Process-wide ResponseCache, so every provider instance shares one LRU."""
+    global _shared_cache
+    with _shared_cache_lock:
+        if _shared_cache is None:
+            _shared_cache = ResponseCache(DB_PATH, max_entries=BDL_CACHE_MAX_ENTRIES)
+        return _shared_cache
+
+
 class BallDontLieProvider:
     BASE = "https://www.balldontlie.io/api/v1"
+    # Use environment variable if set, else fallback to hardcoded key
     API_KEY = os.environ.get("BALLDONTLIE_API_KEY", "0114434c-8ed4-42bf-b10a-132dfa3feb14")
 
-    def fetch_with_retry(self, endpoint, params=None, retries=2, delay=2):
+    # Cache lifetime per endpoint, in seconds. 0 disables caching; None never expires.
+    # Box scores for games with status "Final" are cached forever (see _cache_ttl).
+    CACHE_TTL_SECONDS = {
+        "teams": 24 * 60 * 60,
+        "players": 6 * 60 * 60,
+        "games": 10 * 60,
+        "stats": 10 * 60,
+    }
+
+    # Max ids packed into one game_ids[] / player_ids[] request.
+    BATCH_SIZE = 25
+
+    # Shared by every instance and thread so concurrent prefetches respect the quota.
+    RATE_LIMITER = TokenBucket(BDL_REQUESTS_PER_MINUTE / 60.0, capacity=max(1, BDL_REQUESTS_PER_MINUTE // 6))
+
+    # Backoff/Retry-After handling plus a per-host circuit breaker (see providers/retry_policy.py).
+    RETRY_POLICY = RetryPolicy()
+
+    def __init__(self, cache=None):
+        self.cache = cache if cache is not None else get_shared_response_cache()
+        self._team_ids = {}
+
+    def _cache_ttl(self, endpoint, params, payload):
+        if endpoint == "stats" and (params or {}).get("game_ids[]") is not None:
+            rows = payload.get("data", [])
+            if rows and all(s.get("game", {}).get("status") == "Final" for s in rows):
+                return None
+        return self.CACHE_TTL_SECONDS.get(endpoint, 0)
+
+    def fetch_with_retry(self, endpoint, params=None, retries=2, use_cache=True, raise_on_error=False):
+        """
+        Generic GET request with Authorization header, served from cache when fresh.
+        Retries follow RETRY_POLICY; when the host's circuit is open this returns the
+        empty fallback immediately so callers drop to DB data instead of stalling.
+        With raise_on_error=True failures raise RuntimeError instead of returning the
+        fallback, for callers that must tell "no rows" from "request failed".
+        """
+        cache_key = ResponseCache.make_key(endpoint, params)
+        if use_cache and self.cache is not None:
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                logging.info(f"Cache hit for endpoint {endpoint} with params {params}")
+                return cached
         headers = {"Authorization": self.API_KEY}
-        for attempt in range(retries + 1):
-            r = requests.get(f"{self.BASE}/{endpoint}", params=params, headers=headers)
-            logging.info(f"Request URL: {r.url} | Status: {r.status_code}")
-            logging.info(f"Raw response: {r.text}")
-            if r.status_code == 200:
-                return r.json()
-            else:
-                logging.warning(f"Attempt {attempt+1} failed: {r.status_code}, retrying in {delay}s")
-                time.sleep(delay)
-        logging.error(f"All attempts failed for endpoint {endpoint} with params {params}")
-        return {"data": []}
+        url = f"{self.BASE}/{endpoint}"
+
+        def send():
+            # Replayed cassettes never reach the API, so they are not throttled.
+            if cassette_mode() != "replay":
+                self.RATE_LIMITER.acquire()
+            return http_get(url, params=params, headers=headers)
 
-    def get_recent_team_games(self, team_name):
-        team_id = None
+        try:
+            r = self.RETRY_POLICY.execute(url, send, max_attempts=retries + 1)
+        except CircuitOpenError as e:
+            if raise_on_error:
+                raise
+            logging.warning(f"{e}; returning empty result for {endpoint}")
+            return {"data": []}
+        except Exception as e:
+            logging.error(f"All attempts failed for endpoint {endpoint} with params {params}: {e}")
+            if raise_on_error:
+                raise RuntimeError(f"BallDontLie {endpoint} request failed: {e}") from e
+            return {"data": []}
+        logging.info(f"Request URL: {r.url} | Status: {r.status_code}")
+        logging.info(f"Raw response: {r.text}")
+        if r.status_code == 200:
+            payload = r.json()
+            ttl = self._cache_ttl(endpoint, params, payload)
+            if use_cache and self.cache is not None and ttl != 0:
+                self.cache.set(cache_key, endpoint, payload, ttl)
+            return payload
+        logging.error(f"All attempts failed for endpoint {endpoint} with params {params}: HTTP {r.status_code}")
+        if raise_on_error:
+            raise RuntimeError(f"BallDontLie {endpoint} request failed: HTTP {r.status_code}")
+        return {"data": []}  # safe fallback
+
+    def get_team_id(self, team_name):
+        """Resolve a team's full name to its BallDontLie id via the cached teams endpoint."""
+        key = team_name.lower()
+        if key in self._team_ids:
+            return self._team_ids[key]
         try:
             teams = self.fetch_with_retry("teams")
             for t in teams.get("data", []):
-                if t.get("full_name", "").lower() == team_name.lower():
-                    team_id = t.get("id")
-                    break
+                self._team_ids[t.get("full_name", "").lower()] = t.get("id")
         except Exception as e:
             logging.error(f"Failed to fetch teams for {team_name}: {e}")
+        return self._team_ids.get(key)
+
+    def get_recent_team_games(self, team_name):
+        team_id = self.get_team_id(team_name)
         if not team_id:
             logging.warning(f"Could not find team id for {team_name}")
             return []
@@ -57,53 +236,93 @@ class BallDontLieProvider:
         logging.warning(f"Could not fetch recent games for {team_name} after 3 attempts.")
         return []
 
-    def get_game_box_score(self, game_id):
-        from database.db_manager import save_player, save_game_log
-        for attempt in range(3):
+    def fetch_all_pages(self, endpoint, params=None):
+        """
+        Fetch every page of a list endpoint, following meta.next_cursor (v2) or meta.next_page (v1).
+        Raises RuntimeError if any page fails, so callers never see a silently truncated result.
+        """
+        params = dict(params or {})
+        rows = []
+        while True:
+            page = self.fetch_with_retry(endpoint, params=params, raise_on_error=True)
+            rows.extend(page.get("data", []))
+            meta = page.get("meta") or {}
+            if meta.get("next_cursor"):
+                params["cursor"] = meta["next_cursor"]
+            elif meta.get("next_page"):
+                params["page"] = meta["next_page"]
+            else:
+                return rows
+
+    @staticmethod
+    def _chunks(ids, size):
+        ids = list(ids)
+        for i in range(0, len(ids), size):
+            yield ids[i:i + size]
+
+    @staticmethod
+    def _stat_player_id(s):
+        return s.get('player_id') or s.get('player', {}).get('id')
+
+    def get_box_scores(self, game_ids):
+        """
+        Fetch box scores for many games, packing up to BATCH_SIZE game_ids[] per
+        request and following pagination so large box scores are not cut off.
+        Returns {game_id: [box rows]} with an entry for every requested game whose
+        batch was fetched; games whose batch failed all attempts are left out, so
+        callers can tell them from games without stats and retry them.
+        """
+        from database.db_manager import save_box_scores
+        game_ids = list(dict.fromkeys(game_ids))
+        boxes = {}
+        for chunk in self._chunks(game_ids, self.BATCH_SIZE):
+            for attempt in range(3):
+                try:
+                    rows = self.fetch_all_pages("stats", params={"game_ids[]": chunk, "per_page": 100})
+                    break
+                except Exception as e:
+                    logging.error(f"Box score fetch failed for games {chunk}, attempt {attempt+1}: {e}")
+            else:
+                logging.warning(f"Could not fetch box scores for games {chunk} after 3 attempts.")
+                continue
+            boxes.update((gid, []) for gid in chunk)
+            log_rows = []
+            for s in rows:
+                game_id = s.get('game', {}).get('id')
+                player_id = self._stat_player_id(s)
+                player_name = f"{s.get('player', {}).get('first_name', '')} {s.get('player', {}).get('last_name', '')}"
+                team = s.get('team', {}).get('full_name', '')
+                mins = s.get('min', 0)
+                boxes.setdefault(game_id, []).append({
+                    'player_id': player_id,
+                    'player_name': player_name,
+                    'team': team,
+                    'min': mins
+                })
+                log_rows.append({
+                    'player_id': player_id,
+                    'player_name': player_name,
+                    'team': team,
+                    'game_date': (s.get('game', {}).get('date') or '')[:10],
+                    'minutes': parse_minutes(mins),
+                    'points': s.get('pts', 0),
+                    'rebounds': s.get('reb', 0),
+                    'assists': s.get('ast', 0)
+                })
+            # Save players and game logs to DB in one transaction per batch
             try:
-                stats = self.fetch_with_retry("stats", params={"game_ids[]": game_id, "per_page": 100})
-                box = []
-                for s in stats.get("data", []):
-                    player_id = s.get('player_id')
-                    player_name = f"{s.get('player', {}).get('first_name', '')} {s.get('player', {}).get('last_name', '')}"
-                    team = s.get('team', {}).get('full_name', '')
-                    mins = s.get('min', 0)
-                    points = s.get('pts', 0)
-                    rebounds = s.get('reb', 0)
-                    assists = s.get('ast', 0)
-                    game_date = s.get('game', {}).get('date', '')
-                    box.append({
-                        'player_id': player_id,
-                        'player_name': player_name,
-                        'min': mins
-                    })
-                    # Save player and game log to DB
-                    save_player({'player_id': player_id, 'player_name': player_name, 'team': team})
-                    save_game_log(player_id, {
-                        'game_date': game_date,
-                        'minutes': mins,
-                        'points': points,
-                        'rebounds': rebounds,
-                        'assists': assists
-                    })
-                return box
+                save_box_scores(log_rows)
             except Exception as e:
-                logging.error(f"Box score fetch failed for game {game_id}, attempt {attempt+1}: {e}")
-        logging.warning(f"Could not fetch box score for game {game_id} after 3 attempts.")
-        return []
+                logging.error(f"Failed to persist box scores for games {chunk}: {e}")
+        return boxes
+
+    def get_game_box_score(self, game_id):
+        return self.get_box_scores([game_id]).get(game_id, [])
+
     def get_team_roster_by_name(self, team_name):
         """Fetch roster for a team by name, retry up to 3 times."""
         import logging
-        team_id = None
-        # Find team id
-        try:
-            teams = self.fetch_with_retry("teams")
-            for t in teams.get("data", []):
-                if t.get("full_name", "").lower() == team_name.lower():
-                    team_id = t.get("id")
-                    break
-        except Exception as e:
-            logging.error(f"Failed to fetch teams for {team_name}: {e}")
+        team_id = self.get_team_id(team_name)
         if not team_id:
             logging.warning(f"Could not find team id for {team_name}")
             return []
@@ -117,46 +336,48 @@ class BallDontLieProvider:
         logging.warning(f"Could not fetch roster for {team_name} after 3 attempts.")
         return []
 
-    def get_recent_player_stats(self, player_id):
-        """Fetch last 5 games box scores for player, return averages."""
-        import logging
-        stats = self.fetch_with_retry("stats", params={"player_ids[]": player_id, "per_page": 5})
-        games = stats.get("data", [])
-        if not games:
-            logging.warning(f"No recent stats for player {player_id}")
-            return {"points": 0, "rebounds": 0, "assists": 0, "minutes": 0}
-        pts, rebs, asts, mins = 0, 0, 0, 0
-        for g in games:
-            pts += g.get("pts", 0)
-            rebs += g.get("reb", 0)
-            asts += g.get("ast", 0)
-            mins += g.get("min", 0) if g.get("min") else 0
-        n = len(games)
-        return {
-            "points": round(pts/n, 2),
-            "rebounds": round(rebs/n, 2),
-            "assists": round(asts/n, 2),
-            "minutes": round(mins/n, 2) if n else 0
-        }
-    BASE = "https://www.balldontlie.io/api/v1"
-    # Use environment variable if set, else fallback to hardcoded key
-    API_KEY = os.environ.get("BALLDONTLIE_API_KEY", "0114434c-8ed4-42bf-b10a-132dfa3feb14")
-
-    def fetch_with_retry(self, endpoint, params=None, retries=2, delay=2):
-        """Generic GET request with retry and Authorization header"""
-        headers = {"Authorization": self.API_KEY}
-        for attempt in range(retries + 1):
-            r = requests.get(f"{self.BASE}/{endpoint}", params=params, headers=headers)
-            logging.info(f"Request URL: {r.url} | Status: {r.status_code}")
-            logging.info(f"Raw response: {r.text}")
-            if r.status_code == 200:
-                return r.json()
+    def get_recent_player_stats_batch(self, player_ids, last_n=5, lookback_days=45):
+        """
+        Fetch recent box scores for many players, packing up to BATCH_SIZE
+        player_ids[] per request, and return {player_id: averages over the
+        player's last `last_n` games}. Players with no stats get zeros, as do
+        players in a batch that still fails after 3 attempts (logged).
+        """
+        import datetime
+        player_ids = list(dict.fromkeys(player_ids))
+        start_date = (datetime.date.today() - datetime.timedelta(days=lookback_days)).isoformat()
+        games_by_player = {pid: [] for pid in player_ids}
+        for chunk in self._chunks(player_ids, self.BATCH_SIZE):
+            for attempt in range(3):
+                try:
+                    rows = self.fetch_all_pages("stats", params={"player_ids[]": chunk, "start_date": start_date, "per_page": 100})
+                    break
+                except Exception as e:
+                    logging.error(f"Recent stats fetch failed for players {chunk}, attempt {attempt+1}: {e}")
             else:
-                logging.warning(f"Attempt {attempt+1} failed: {r.status_code}, retrying in {delay}s")
-                time.sleep(delay)
-        logging.error(f"All attempts failed for endpoint {endpoint} with params {params}")
-        return {"data": []}  # safe fallback
+                logging.warning(f"Could not fetch recent stats for players {chunk} after 3 attempts.")
+                continue
+            for g in rows:
+                games_by_player.setdefault(self._stat_player_id(g), []).append(g)
+        averages = {}
+        for pid in player_ids:
+            games = sorted(games_by_player.get(pid, []), key=lambda g: g.get("game", {}).get("date", ""), reverse=True)[:last_n]
+            if not games:
+                logging.warning(f"No recent stats for player {pid}")
+                averages[pid] = {"points": 0, "rebounds": 0, "assists": 0, "minutes": 0}
+                continue
+            n = len(games)
+            averages[pid] = {
+                "points": round(sum(g.get("pts") or 0 for g in games) / n, 2),
+                "rebounds": round(sum(g.get("reb") or 0 for g in games) / n, 2),
+                "assists": round(sum(g.get("ast") or 0 for g in games) / n, 2),
+                "minutes": round(sum(parse_minutes(g.get("min")) for g in games) / n, 2)
+            }
+        return averages
 
+    def get_recent_player_stats(self, player_id):
+        """Fetch last 5 games box scores for player, return averages."""
+        return self.get_recent_player_stats_batch([player_id], last_n=5)[player_id]
     # Removed schedule/game-day fetching. Only stat utilities below.
 
     def get_player_game_logs(self, player_id, num_games=5):
@@ -9,12 +9,19 @@ Functions:
         - Attempts to read from available historical odds/props data in the project.
         - Returns None if data is unavailable, with clear logging.
         - Does NOT break runtime if data is missing.
+    get_closing_lines(keys):
+        The same for many (date, player_name, stat_type[, sportsbook]) keys at once.
+
+Each source file is parsed once into an in-memory index keyed by (date, player,
+stat_type, sportsbook) and re-parsed only when its mtime or size changes, so a
+lookup is a dict read rather than a CSV parse and a scan.
 
 Future:
     Replace MOCK with real sportsbook API integration.
 """
 import logging
 import os
+import threading
 import pandas as pd
 from datetime import datetime
 
@@ -22,6 +29,103 @@ from datetime import datetime
 LOG_PATH = os.path.join('logs', 'clv_tracking.log')
 logging.basicConfig(filename=LOG_PATH, level=logging.INFO, format='%(asctime)s %(levelname)s %(message)s')
 
+# MOCK: read from data/processed/today_props_ai.csv or data/raw/today_props.csv, in that order
+SOURCE_FILES = [
+    os.path.join('data', 'processed', 'today_props_ai.csv'),
+    os.path.join('data', 'raw', 'today_props.csv')
+]
+# Columns a prop is matched on; a column missing from a file matches any value.
+KEY_COLUMNS = ('date', 'player', 'stat_type', 'sportsbook')
+
+_indexes = {}  # path -> ((mtime_ns, size), index)
+_indexes_lock = threading.Lock()
+
+
+def _build_index(df):
+    """
+    First row per key, as {'columns', 'by_book', 'any_book'}: lookups with a
+    sportsbook use by_book, lookups without one use any_book.
+    """
+    columns = [c for c in KEY_COLUMNS if c in df.columns]
+    lines = df['line'] if 'line' in df.columns else [None] * len(df)
+    odds = df['odds'] if 'odds' in df.columns else [None] * len(df)
+    values = list(zip(lines, odds))
+    keys = list(zip(*(df[c] for c in columns)))
+    by_book = {}
+    for key, value in zip(keys, values):
+        by_book.setdefault(key, value)
+    any_book = by_book
+    if 'sportsbook' in columns:
+        book = columns.index('sportsbook')
+        any_book = {}
+        for key, value in zip(keys, values):
+            any_book.setdefault(key[:book] + key[book + 1:], value)
+    return {'columns': columns, 'by_book': by_book, 'any_book': any_book}
+
+
+def _load_index(path):
+    """The index for `path`, re-parsed only if the file's mtime or size changed; None if absent."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    signature = (st.st_mtime_ns, st.st_size)
+    with _indexes_lock:
+        cached = _indexes.get(path)
+        if cached and cached[0] == signature:
+            return cached[1]
+        index = _build_index(pd.read_csv(path))
+        _indexes[path] = (signature, index)
+        return index
+
+
+def _lookup(index, date, player_name, stat_type, sportsbook):
+    query = {'date': date, 'player': player_name, 'stat_type': stat_type, 'sportsbook': sportsbook}
+    if sportsbook and 'sportsbook' in index['columns']:
+        return index['by_book'].get(tuple(query[c] for c in index['columns']))
+    return index['any_book'].get(tuple(query[c] for c in index['columns'] if c != 'sportsbook'))
+
+
+def get_closing_lines(keys):
+    """
+    Batch closing-line lookup; each source file is parsed at most once.
+
+    Args:
+        keys: iterable of (date, player_name, stat_type) or (date, player_name, stat_type, sportsbook)
+
+    Returns:
+        dict: key -> {'closing_line': float, 'closing_odds': float/int} or None if unavailable
+    """
+    keys = list(keys)
+    indexes = []
+    for file in SOURCE_FILES:
+        try:
+            index = _load_index(file)
+        except Exception as e:
+            logging.warning(f"Error reading {file}: {e}")
+            continue
+        if index is None:
+            continue
+        if not index['columns']:
+            logging.warning(f"Error reading {file}: none of {KEY_COLUMNS} present")
+            continue
+        indexes.append(index)
+    results = {}
+    for key in keys:
+        date, player_name, stat_type = key[:3]
+        sportsbook = key[3] if len(key) > 3 else None
+        results[key] = None
+        for index in indexes:
+            value = _lookup(index, date, player_name, stat_type, sportsbook)
+            if value is not None:
+                results[key] = {'closing_line': value[0], 'closing_odds': value[1]}
+                break
+    missing = sum(1 for v in results.values() if v is None)
+    if missing and len(keys) > 1:
+        logging.info(f"No closing line found for {missing} of {len(keys)} props")
+    return results
+
+
 def get_closing_line(date, player_name, stat_type, sportsbook=None):
     """
     Retrieve the closing line and odds for a given prop.
@@ -36,29 +140,8 @@ def get_closing_line(date, player_name, stat_type, sportsbook=None):
     Returns:
         dict or None: {'closing_line': float, 'closing_odds': float/int} or None if unavailable
     """
-    # MOCK: Try to read from data/processed/today_props_ai.csv or data/raw/today_props.csv
-    possible_files = [
-        os.path.join('data', 'processed', 'today_props_ai.csv'),
-        os.path.join('data', 'raw', 'today_props.csv')
-    ]
-    for file in possible_files:
-        if os.path.exists(file):
-            try:
-                df = pd.read_csv(file)
-                # Try to match by date, player, stat_type
-                mask = (
-                    (df.get('date', date) == date) &
-                    (df.get('player', player_name) == player_name) &
-                    (df.get('stat_type', stat_type) == stat_type)
-                )
-                if sportsbook:
-                    mask &= (df.get('sportsbook', sportsbook) == sportsbook)
-                row = df[mask]
-                if not row.empty:
-                    closing_line = row.iloc[0].get('line')
-                    closing_odds = row.iloc[0].get('odds', None)
-                    return {'closing_line': closing_line, 'closing_odds': closing_odds}
-            except Exception as e:
-                logging.warning(f"Error reading {file}: {e}")
-    logging.info(f"No closing line found for {date}, {player_name}, {stat_type}, {sportsbook}")
-    return None
+    key = (date, player_name, stat_type, sportsbook)
+    result = get_closing_lines([key])[key]
+    if result is None:
+        logging.info(f"No closing line found for {date}, {player_name}, {stat_type}, {sportsbook}")
+    return result
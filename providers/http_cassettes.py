@@ -0,0 +1,143 @@
+"""
+http_cassettes.py
+
+Record/replay of outbound HTTP at the http_client boundary, for offline,
+deterministic pipeline runs and benchmarks.
+
+In record mode every response that goes through http_get is written to a
+gzip-compressed JSON cassette named by a hash of the request (method, URL and
+query parameters, with API keys dropped). In replay mode http_get never touches
+the network: it serves the matching cassette after an optional synthetic
+latency, or raises CassetteMissError. A request that differs from the recorded
+one only by dates (e.g. a BallDontLie date window computed from "today") falls
+back to the recorded request with the same shape, so a captured slate still
+replays on a later day.
+
+Functions:
+    configure_cassettes(mode=None, cassette_dir=None, latency_ms=None): Switch mode at runtime.
+    cassette_mode(): Current mode: 'off', 'record' or 'replay'.
+    record_response(method, url, params, response): Write a cassette.
+    replay_response(method, url, params): Serve a cassette as a requests.Response.
+"""
+import base64
+import gzip
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from urllib.parse import urlsplit, parse_qsl, urlencode
+import requests
+from requests.structures import CaseInsensitiveDict
+from config import HTTP_CASSETTE_MODE, HTTP_CASSETTE_DIR, HTTP_REPLAY_LATENCY_MS
+
+_SECRET_PARAMS = {"apikey", "api_key", "key", "token", "access_token"}
+_DATE_RE = re.compile(r"\d{4}-\d{2}-\d{2}(?:T[\d:.]+Z?)?")
+# Headers that describe the wire encoding of the original response, not its content.
+_DROP_HEADERS = {"content-encoding", "content-length", "transfer-encoding", "connection"}
+INDEX_FILE = "index.json"
+
+_settings = {"mode": HTTP_CASSETTE_MODE, "dir": HTTP_CASSETTE_DIR, "latency_ms": HTTP_REPLAY_LATENCY_MS}
+_index = None
+_lock = threading.Lock()
+
+
+class CassetteMissError(RuntimeError):
+    """Replay mode found no cassette for a request."""
+
+
+def configure_cassettes(mode=None, cassette_dir=None, latency_ms=None):
+    global _index
+    with _lock:
+        if mode is not None:
+            if mode not in ("off", "record", "replay"):
+                raise ValueError(f"Unknown cassette mode: {mode}")
+            _settings["mode"] = mode
+        if cassette_dir is not None:
+            _settings["dir"] = cassette_dir
+            _index = None
+        if latency_ms is not None:
+            _settings["latency_ms"] = latency_ms
+
+
+def cassette_mode():
+    return _settings["mode"]
+
+
+def _canonical(method, url, params):
+    parts = urlsplit(url)
+    items = parse_qsl(parts.query, keep_blank_values=True)
+    if isinstance(params, dict):
+        for k, v in params.items():
+            for value in (v if isinstance(v, (list, tuple)) else [v]):
+                items.append((k, str(value)))
+    elif params:
+        items.extend((k, str(v)) for k, v in params)
+    items = sorted((k, v) for k, v in items if k.lower() not in _SECRET_PARAMS)
+    return f"{method.upper()} {parts.scheme}://{parts.netloc.lower()}{parts.path}?{urlencode(items)}"
+
+
+def _hash(text):
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()[:32]
+
+
+def _load_index():
+    global _index
+    if _index is None:
+        path = os.path.join(_settings["dir"], INDEX_FILE)
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                _index = json.load(f)
+        else:
+            _index = {}
+    return _index
+
+
+def record_response(method, url, params, response):
+    canonical = _canonical(method, url, params)
+    key = _hash(canonical)
+    doc = {
+        "request": canonical,
+        "url": canonical.split(" ", 1)[1],  # without API keys
+        "status_code": response.status_code,
+        "reason": response.reason,
+        "encoding": response.encoding,
+        "headers": {k: v for k, v in response.headers.items() if k.lower() not in _DROP_HEADERS},
+        "body": base64.b64encode(response.content or b"").decode("ascii"),
+    }
+    cassette_dir = _settings["dir"]
+    os.makedirs(cassette_dir, exist_ok=True)
+    path = os.path.join(cassette_dir, f"{key}.json.gz")
+    tmp = f"{path}.{threading.get_ident()}.tmp"
+    with gzip.open(tmp, "wt", encoding="utf-8") as f:
+        json.dump(doc, f)
+    os.replace(tmp, path)
+    with _lock:
+        index = _load_index()
+        index[_hash(_DATE_RE.sub("<date>", canonical))] = key
+        with open(os.path.join(cassette_dir, INDEX_FILE), "w", encoding="utf-8") as f:
+            json.dump(index, f)
+
+
+def replay_response(method, url, params):
+    if _settings["latency_ms"]:
+        time.sleep(_settings["latency_ms"] / 1000)
+    canonical = _canonical(method, url, params)
+    path = os.path.join(_settings["dir"], f"{_hash(canonical)}.json.gz")
+    if not os.path.exists(path):
+        with _lock:
+            key = _load_index().get(_hash(_DATE_RE.sub("<date>", canonical)))
+        if key is None:
+            raise CassetteMissError(f"No cassette for {canonical}")
+        path = os.path.join(_settings["dir"], f"{key}.json.gz")
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        doc = json.load(f)
+    response = requests.Response()
+    response.status_code = doc["status_code"]
+    response.reason = doc.get("reason")
+    response.encoding = doc.get("encoding") or "utf-8"
+    response.headers = CaseInsensitiveDict(doc["headers"])
+    response.url = doc["url"]
+    response._content = base64.b64decode(doc["body"])
+    return response
@@ -0,0 +1,67 @@
+"""
+http_client.py
+
+Shared outbound HTTP client for every provider, collector and scraper.
+
+Keeps one requests.Session per host so TCP/TLS connections are reused across
+calls (keep-alive), asks for gzip, caps concurrent connections per host, and
+always applies a (connect, read) timeout so no call can hang forever.
+With HTTP_CASSETTE_MODE=record|replay, responses are recorded to or served
+from cassettes (providers/http_cassettes.py) instead.
+
+Functions:
+    get_session(url): The pooled Session for url's host.
+    http_get(url, params=None, headers=None, timeout=None, **kwargs): GET through the pool.
+"""
+import threading
+from urllib.parse import urlsplit
+import requests
+from requests.adapters import HTTPAdapter
+from config import HTTP_CONNECT_TIMEOUT, HTTP_READ_TIMEOUT, HTTP_POOL_MAXSIZE
+from providers.http_cassettes import cassette_mode, record_response, replay_response
+
+DEFAULT_TIMEOUT = (HTTP_CONNECT_TIMEOUT, HTTP_READ_TIMEOUT)
+
+_sessions = {}
+_sessions_lock = threading.Lock()
+
+
+def get_session(url):
+    host = urlsplit(url).netloc.lower()
+    with _sessions_lock:
+        session = _sessions.get(host)
+        if session is None:
+            session = requests.Session()
+            # pool_block makes HTTP_POOL_MAXSIZE a hard per-host connection limit.
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=HTTP_POOL_MAXSIZE, pool_block=True)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            session.headers.update({"Accept-Encoding": "gzip, deflate", "Connection": "keep-alive"})
+            _sessions[host] = session
+    return session
+
+
+def http_get(url, params=None, headers=None, timeout=None, **kwargs):
+    """
+    Args:
+        timeout: seconds (read timeout) or a (connect, read) tuple; defaults to
+            (HTTP_CONNECT_TIMEOUT, HTTP_READ_TIMEOUT).
+    """
+    mode = cassette_mode()
+    if mode == "replay":
+        return replay_response("GET", url, params)
+    if timeout is None:
+        timeout = DEFAULT_TIMEOUT
+    elif not isinstance(timeout, tuple):
+        timeout = (HTTP_CONNECT_TIMEOUT, timeout)
+    response = get_session(url).get(url, params=params, headers=headers, timeout=timeout, **kwargs)
+    if mode == "record":
+        record_response("GET", url, params, response)
+    return response
+
+
+def close_sessions():
+    with _sessions_lock:
+        for session in _sessions.values():
+            session.close()
+        _sessions.clear()
@@ -0,0 +1,130 @@
+"""
+line_movement.py
+
+Line-movement detection on top of the odds_outcomes last-value table.
+
+ingest_odds_payload reports which (event, book, market, outcome) keys moved or
+were pulled; detect_movements keeps the ones past the market's threshold (on
+point, and on price as implied-probability change), record_movements appends
+them to odds_line_movements, and each consumer reads only what it has not
+seen through consume_movements, so nothing re-walks or re-diffs the slate.
+
+Functions:
+    detect_movements(changes, thresholds=None): Changes that pass their market's thresholds.
+    record_movements(db_path, movements, detected_at): Append movements to odds_line_movements.
+    consume_movements(db_path, consumer): Movements recorded since the consumer's last call.
+    prune_movements(db_path, now=None, retention_days=None): Delete movements past the retention window.
+"""
+import datetime
+import config
+from database.connection import transaction
+
+# Per-market thresholds: 'point' in line units, 'price' in implied probability.
+# Markets are matched exactly, then by the 'player_*' prefix, then 'default'.
+MOVEMENT_THRESHOLDS = {
+    "spreads": {"point": 0.75, "price": 0.03},
+    "totals": {"point": 0.75, "price": 0.03},
+    "h2h": {"point": None, "price": 0.02},
+    "player_*": {"point": 0.5, "price": 0.04},
+    "default": {"point": 0.5, "price": 0.03},
+}
+
+MOVEMENT_COLUMNS = [
+    "event_id", "bookmaker", "market", "outcome", "description", "kind",
+    "old_point", "new_point", "old_price", "new_price"
+]
+
+
+def _threshold(market, thresholds):
+    if market in thresholds:
+        return thresholds[market]
+    for key, value in thresholds.items():
+        if key.endswith("*") and market.startswith(key[:-1]):
+            return value
+    return thresholds["default"]
+
+
+def implied_probability(price):
+    """Implied probability of American (|price| >= 100) or decimal odds; None if unknown."""
+    if price is None:
+        return None
+    price = float(price)
+    if abs(price) >= 100:
+        return 100 / (price + 100) if price > 0 else -price / (100 - price)
+    return 1 / price if price > 0 else None
+
+
+def detect_movements(changes, thresholds=None):
+    """
+    Args:
+        changes: the 'changes' list from ingest_odds_payload.
+        thresholds: overrides for MOVEMENT_THRESHOLDS.
+    Returns:
+        The changes that count as movement: pulled outcomes, and moves whose
+        point or implied-probability change reaches the market's threshold.
+    """
+    thresholds = {**MOVEMENT_THRESHOLDS, **(thresholds or {})}
+    movements = []
+    for change in changes:
+        if change["kind"] == "removed":
+            movements.append(change)
+            continue
+        limits = _threshold(change["market"], thresholds)
+        old_point, new_point = change["old_point"], change["new_point"]
+        if limits["point"] is not None and old_point is not None and new_point is not None:
+            if abs(new_point - old_point) >= limits["point"]:
+                movements.append(change)
+                continue
+        old_prob, new_prob = implied_probability(change["old_price"]), implied_probability(change["new_price"])
+        if limits["price"] is not None and old_prob is not None and new_prob is not None:
+            if abs(new_prob - old_prob) >= limits["price"]:
+                movements.append(change)
+    return movements
+
+
+def record_movements(db_path, movements, detected_at):
+    if not movements:
+        return 0
+    with transaction(db_path) as conn:
+        conn.executemany(
+            f"INSERT INTO odds_line_movements (detected_at, {', '.join(MOVEMENT_COLUMNS)}) "
+            f"VALUES (?, {', '.join('?' for _ in MOVEMENT_COLUMNS)})",
+            [(detected_at, *(m[c] for c in MOVEMENT_COLUMNS)) for m in movements]
+        )
+    return len(movements)
+
+
+def consume_movements(db_path, consumer):
+    """
+    Movements recorded since `consumer` last called this, oldest first, as dicts
+    with detected_at and MOVEMENT_COLUMNS. A new consumer starts at the current
+    end of the table: its first call registers it and returns nothing.
+    """
+    with transaction(db_path) as conn:
+        row = conn.execute("SELECT last_id FROM odds_movement_cursors WHERE consumer=?", (consumer,)).fetchone()
+        if row is None:
+            conn.execute(
+                "INSERT INTO odds_movement_cursors (consumer, last_id) "
+                "SELECT ?, COALESCE(MAX(id), 0) FROM odds_line_movements", (consumer,))
+            return []
+        last_id = row[0]
+        cur = conn.execute(
+            f"SELECT id, detected_at, {', '.join(MOVEMENT_COLUMNS)} FROM odds_line_movements WHERE id > ? ORDER BY id",
+            (last_id,))
+        names = [d[0] for d in cur.description]
+        movements = [dict(zip(names, r)) for r in cur.fetchall()]
+        if movements:
+            conn.execute(
+                "INSERT INTO odds_movement_cursors (consumer, last_id) VALUES (?, ?) "
+                "ON CONFLICT(consumer) DO UPDATE SET last_id=excluded.last_id",
+                (consumer, movements[-1]["id"]))
+    return movements
+
+
+def prune_movements(db_path, now=None, retention_days=None):
+    """Delete movements detected more than retention_days (ODDS_MOVEMENT_RETENTION_DAYS) ago; returns the count."""
+    now = now or datetime.datetime.utcnow()
+    days = config.ODDS_MOVEMENT_RETENTION_DAYS if retention_days is None else retention_days
+    cutoff = (now - datetime.timedelta(days=days)).isoformat()
+    with transaction(db_path) as conn:
+        return conn.execute("DELETE FROM odds_line_movements WHERE detected_at < ?", (cutoff,)).rowcount
@@ -11,29 +11,119 @@ sys.modules["bootstrap"] = bootstrap
 spec.loader.exec_module(bootstrap)
 get_repo_root = bootstrap.get_repo_root
 import config
+from database.connection import get_connection, transaction, close_thread_connections
+from database.schema_migrations import run_migrations
+from providers.http_client import http_get
+from providers.retry_policy import RetryPolicy
+from providers.odds_credit_planner import estimate_cost
+from providers.odds_store import ingest_odds_payload, games_from_payload
+from database.clv_tracking import upsert_games
+from providers.line_movement import detect_movements, record_movements, prune_movements
 import os
 import json
 import hashlib
 import sqlite3
-import requests
 import datetime
 import logging
+import threading
 import time
+import zlib
 from typing import Optional, List
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# Process-wide L1 over odds_api_cache: (fetched_at, parsed payload) keyed by
+# (db_path, cache_key), judged fresh against each caller's TTL exactly like the
+# SQLite row it mirrors. Payloads are shared between callers and must be treated
+# as read-only.
+_l1_cache = {}
+_l1_lock = threading.Lock()
+# Single-flight: one in-flight load per (db_path, cache_key); identical concurrent
+# callers wait on it instead of spending their own API credits.
+_inflight = {}
+_inflight_lock = threading.Lock()
+_cache_stats = {"l1_hits": 0, "sqlite_hits": 0, "misses": 0, "coalesced": 0, "stale_served": 0, "refreshes": 0}
+_stats_lock = threading.Lock()
+# Keys with a stale-while-revalidate refresh running in the background.
+_refreshing = set()
+_refreshing_lock = threading.Lock()
+# Called as listener(event_ids, fetched_at) after every fetched payload is
+# ingested into odds_outcomes, foreground or background.
+_ingest_listeners = []
+
+
+def _count(name):
+    with _stats_lock:
+        _cache_stats[name] += 1
+
+
+def get_cache_stats():
+    """Snapshot of the process-wide odds cache counters."""
+    with _stats_lock:
+        return dict(_cache_stats)
+
+
+def clear_l1_cache():
+    with _l1_lock:
+        _l1_cache.clear()
+
+
+def add_ingest_listener(listener):
+    """Register listener(event_ids, fetched_at), run after each API payload is ingested."""
+    if listener not in _ingest_listeners:
+        _ingest_listeners.append(listener)
+
+
+def _encode_response(text, codec=None):
+    """Compress a response body for odds_api_cache; returns (codec, blob)."""
+    codec = codec or config.ODDS_CACHE_CODEC
+    raw = text.encode("utf-8")
+    if codec == "zstd" and zstandard is not None:
+        return "zstd", zstandard.ZstdCompressor(level=6).compress(raw)
+    return "zlib", zlib.compress(raw, 6)
+
+
+def _decode_response(codec, blob, text):
+    if codec == "zlib":
+        return zlib.decompress(blob).decode("utf-8")
+    if codec == "zstd":
+        if zstandard is None:
+            raise RuntimeError("odds_api_cache row is zstd-compressed but zstandard is not installed")
+        return zstandard.ZstdDecompressor().decompress(blob).decode("utf-8")
+    return text
+
+
+_last_eviction = {}
+_eviction_lock = threading.Lock()
+
+
+class _InFlight:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
 
 class OddsAdapter:
-    def __init__(self, db_path, api_key, daily_credit_budget, default_ttl_minutes):
+    def __init__(self, db_path, api_key, daily_credit_budget, default_ttl_minutes, swr=None, max_stale_minutes=None):
         self.db_path = db_path
         self.api_key = api_key
         self.daily_credit_budget = daily_credit_budget
         self.default_ttl_minutes = default_ttl_minutes
+        # Stale-while-revalidate: serve an expired row (up to max_stale_minutes past its TTL)
+        # instead of failing on budget or provider errors, refreshing in the background.
+        self.swr = config.ODDS_SWR_ENABLED if swr is None else swr
+        self.max_stale_minutes = config.ODDS_SWR_MAX_STALE_MINUTES if max_stale_minutes is None else max_stale_minutes
+        self.retry_policy = RetryPolicy()
         self._ensure_tables()
         self.logger = logging.getLogger("OddsAdapter")
         if not self.logger.hasHandlers():
             logging.basicConfig(level=logging.INFO)
 
     def _ensure_tables(self):
-        with sqlite3.connect(self.db_path) as conn:
+        with transaction(self.db_path) as conn:
             c = conn.cursor()
             c.execute("""
                 CREATE TABLE IF NOT EXISTS odds_api_cache (
@@ -51,22 +141,25 @@ class OddsAdapter:
                     credits_used INTEGER
                 )
             """)
-            conn.commit()
+        run_migrations(self.db_path, "odds")
 
     def _get_today(self):
         return datetime.datetime.utcnow().strftime('%Y-%m-%d')
 
     def _get_credits_used(self):
         today = self._get_today()
-        with sqlite3.connect(self.db_path) as conn:
-            c = conn.cursor()
-            c.execute("SELECT credits_used FROM odds_credit_ledger WHERE date=?", (today,))
-            row = c.fetchone()
-            return row[0] if row else 0
+        c = get_connection(self.db_path).cursor()
+        c.execute("SELECT credits_used FROM odds_credit_ledger WHERE date=?", (today,))
+        row = c.fetchone()
+        return row[0] if row else 0
+
+    def get_credits_used(self):
+        """Credits spent today according to the ledger."""
+        return self._get_credits_used()
 
     def _increment_credits(self, used):
         today = self._get_today()
-        with sqlite3.connect(self.db_path) as conn:
+        with transaction(self.db_path) as conn:
             c = conn.cursor()
             c.execute("SELECT credits_used FROM odds_credit_ledger WHERE date=?", (today,))
             row = c.fetchone()
@@ -74,7 +167,6 @@ class OddsAdapter:
                 c.execute("UPDATE odds_credit_ledger SET credits_used=credits_used+? WHERE date=?", (used, today))
             else:
                 c.execute("INSERT INTO odds_credit_ledger (date, credits_used) VALUES (?, ?)", (today, used))
-            conn.commit()
 
     def _make_cache_key(self, **params):
         # Deterministic hash of sorted params
@@ -82,6 +174,13 @@ class OddsAdapter:
         return hashlib.sha256(params_json.encode()).hexdigest()
 
     def get_odds(self, sport: str, regions: str, markets: str, odds_format: str="decimal", date_format: str="iso", bookmakers: Optional[str]=None, event_ids: Optional[List[str]]=None, ttl_minutes: Optional[int]=None) -> dict:
+        return self.get_odds_with_meta(sport, regions, markets, odds_format, date_format, bookmakers, event_ids, ttl_minutes)["data"]
+
+    def get_odds_with_meta(self, sport: str, regions: str, markets: str, odds_format: str="decimal", date_format: str="iso", bookmakers: Optional[str]=None, event_ids: Optional[List[str]]=None, ttl_minutes: Optional[int]=None) -> dict:
+        """
+        get_odds plus freshness: returns {"data", "fetched_at", "age_seconds", "stale", "source"},
+        where source is 'l1', 'sqlite', 'api' or 'stale' (an expired row served in SWR mode).
+        """
         ttl = ttl_minutes if ttl_minutes is not None else self.default_ttl_minutes
         params = {
             "sport": sport,
@@ -94,31 +193,6 @@ class OddsAdapter:
             params["bookmakers"] = bookmakers
         if event_ids:
             params["eventIds"] = ",".join(event_ids)
-        cache_key = self._make_cache_key(**params)
-        now = datetime.datetime.utcnow()
-        # Check cache
-        with sqlite3.connect(self.db_path) as conn:
-            c = conn.cursor()
-            c.execute("SELECT fetched_at, ttl_minutes, response_json FROM odds_api_cache WHERE cache_key=?", (cache_key,))
-            row = c.fetchone()
-            if row:
-                fetched_at = datetime.datetime.fromisoformat(row[0])
-                cache_ttl = row[1]
-                if (now - fetched_at).total_seconds() < cache_ttl * 60:
-                    self.logger.info(f"CACHE_HIT: {params}")
-                    print("CACHE_HIT")
-                    return json.loads(row[2])
-                else:
-                    self.logger.info(f"CACHE_EXPIRED: {params}")
-            else:
-                self.logger.info(f"CACHE_MISS: {params}")
-                print("CACHE_MISS")
-        # Enforce credit budget
-        credits_used = self._get_credits_used()
-        if credits_used >= self.daily_credit_budget:
-            msg = f"DAILY CREDIT BUDGET EXCEEDED: {credits_used} >= {self.daily_credit_budget}"
-            self.logger.error(msg)
-            raise RuntimeError(msg)
         # Build URL
         url = f"https://api.the-odds-api.com/v4/sports/{sport}/odds/"
         req_params = {
@@ -132,40 +206,251 @@ class OddsAdapter:
             req_params["bookmakers"] = bookmakers
         if event_ids:
             req_params["eventIds"] = ",".join(event_ids)
-        # Retry logic
-        from config import RETRY_ATTEMPTS, RETRY_DELAY
-        attempts = RETRY_ATTEMPTS if 'RETRY_ATTEMPTS' in dir() else 3
-        delay = RETRY_DELAY if 'RETRY_DELAY' in dir() else 2
-        last_exc = None
-        for attempt in range(attempts):
-            try:
-                response = requests.get(url, params=req_params, timeout=10)
-                if response.status_code == 200:
-                    break
-                else:
-                    last_exc = Exception(f"HTTP {response.status_code}: {response.text}")
-            except Exception as e:
-                last_exc = e
-            time.sleep(delay)
+        return self._cached_get(params, url, req_params, ttl)
+
+    def get_event_odds(self, sport: str, event_id: str, regions: str, markets: str, odds_format: str="decimal", date_format: str="iso", bookmakers: Optional[str]=None, ttl_minutes: Optional[int]=None) -> dict:
+        return self.get_event_odds_with_meta(sport, event_id, regions, markets, odds_format, date_format, bookmakers, ttl_minutes)["data"]
+
+    def get_event_odds_with_meta(self, sport: str, event_id: str, regions: str, markets: str, odds_format: str="decimal", date_format: str="iso", bookmakers: Optional[str]=None, ttl_minutes: Optional[int]=None) -> dict:
+        """
+        Odds for a single event (/events/{id}/odds), the only endpoint that serves
+        player-prop markets. Same caching, budget and freshness metadata as get_odds_with_meta.
+        """
+        ttl = ttl_minutes if ttl_minutes is not None else self.default_ttl_minutes
+        params = {
+            "sport": sport,
+            "eventId": event_id,
+            "regions": regions,
+            "markets": markets,
+            "oddsFormat": odds_format,
+            "dateFormat": date_format,
+        }
+        if bookmakers:
+            params["bookmakers"] = bookmakers
+        url = f"https://api.the-odds-api.com/v4/sports/{sport}/events/{event_id}/odds"
+        req_params = {
+            "apiKey": self.api_key,
+            "regions": regions,
+            "markets": markets,
+            "oddsFormat": odds_format,
+            "dateFormat": date_format,
+        }
+        if bookmakers:
+            req_params["bookmakers"] = bookmakers
+        return self._cached_get(params, url, req_params, ttl)
+
+    def _cached_get(self, params, url, req_params, ttl):
+        """L1, then single-flight SQLite lookup / API fetch for one request."""
+        cache_key = self._make_cache_key(**params)
+        l1_key = (self.db_path, cache_key)
+        entry = self._l1_get(l1_key, ttl)
+        if entry is not None:
+            _count("l1_hits")
+            return self._meta(entry[0], entry[1], "l1")
+        with _inflight_lock:
+            flight = _inflight.get(l1_key)
+            leader = flight is None
+            if leader:
+                flight = _inflight[l1_key] = _InFlight()
+        if not leader:
+            _count("coalesced")
+            self.logger.info(f"CACHE_COALESCED: {params}")
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return dict(flight.result)
+        try:
+            flight.result = self._load_or_fetch(l1_key, params, ttl, url, req_params)
+            return flight.result
+        except Exception as e:
+            flight.error = e
+            raise
+        finally:
+            with _inflight_lock:
+                _inflight.pop(l1_key, None)
+            flight.done.set()
+
+    def _l1_get(self, l1_key, ttl_minutes):
+        """Cached payload and fetched_at if younger than the caller's TTL, else None."""
+        with _l1_lock:
+            entry = _l1_cache.get(l1_key)
+            if entry is None:
+                return None
+            fetched_at, payload = entry
+            if datetime.datetime.utcnow() >= fetched_at + datetime.timedelta(minutes=ttl_minutes):
+                return None
+            return payload, fetched_at
+
+    def _l1_set(self, l1_key, fetched_at, payload):
+        with _l1_lock:
+            _l1_cache[l1_key] = (fetched_at, payload)
+
+    def _meta(self, payload, fetched_at, source, stale=False):
+        age = (datetime.datetime.utcnow() - fetched_at).total_seconds()
+        return {"data": payload, "fetched_at": fetched_at.isoformat(), "age_seconds": max(0.0, age),
+                "stale": stale, "source": source}
+
+    def _load_or_fetch(self, l1_key, params, ttl, url, req_params):
+        """SQLite cache lookup, then a budgeted API fetch; runs once per in-flight key."""
+        cache_key = l1_key[1]
+        now = datetime.datetime.utcnow()
+        # Check cache
+        c = get_connection(self.db_path).cursor()
+        c.execute("SELECT fetched_at, ttl_minutes, codec, response_blob, response_json FROM odds_api_cache WHERE cache_key=?", (cache_key,))
+        row = c.fetchone()
+        if row:
+            fetched_at = datetime.datetime.fromisoformat(row[0])
+            # Freshness is judged by the caller's TTL: the credit planner shortens it
+            # near tip-off and lengthens it when a refresh is not budgeted.
+            cache_ttl = ttl
+            age = (now - fetched_at).total_seconds()
+            if age < cache_ttl * 60:
+                self.logger.info(f"CACHE_HIT: {params}")
+                _count("sqlite_hits")
+                payload = json.loads(_decode_response(row[2], row[3], row[4]))
+                self._l1_set(l1_key, fetched_at, payload)
+                return self._meta(payload, fetched_at, "sqlite")
+            if self.swr and age < (cache_ttl + self.max_stale_minutes) * 60:
+                _count("stale_served")
+                self.logger.warning(f"CACHE_STALE: serving {age / 60:.0f}-minute-old odds for {params}")
+                payload = json.loads(_decode_response(row[2], row[3], row[4]))
+                self._refresh_in_background(l1_key, ttl, url, req_params)
+                return self._meta(payload, fetched_at, "stale", stale=True)
+            self.logger.info(f"CACHE_EXPIRED: {params}")
         else:
-            if last_exc is not None:
-                raise last_exc
-            else:
-                raise Exception("Unknown error in OddsAdapter HTTP request retries.")
-        # Track credits
-        credits_this_call = 1
-        for header in ["x-credits-used", "x-requests-used"]:
-            if header in response.headers:
-                try:
-                    credits_this_call = int(response.headers[header])
-                except Exception:
-                    pass
+            self.logger.info(f"CACHE_MISS: {params}")
+        _count("misses")
+        return self._fetch(l1_key, ttl, url, req_params)
+
+    def _refresh_in_background(self, l1_key, ttl, url, req_params):
+        if self._get_credits_used() >= self.daily_credit_budget:
+            self.logger.info("CACHE_STALE: daily credit budget exhausted; not refreshing")
+            return
+        with _refreshing_lock:
+            if l1_key in _refreshing:
+                return
+            _refreshing.add(l1_key)
+        threading.Thread(target=self._background_refresh, args=(l1_key, ttl, url, req_params),
+                         name="odds-swr-refresh", daemon=True).start()
+
+    def _background_refresh(self, l1_key, ttl, url, req_params):
+        try:
+            self._fetch(l1_key, ttl, url, req_params)
+            _count("refreshes")
+        except Exception as e:
+            self.logger.warning(f"Background odds refresh failed: {e}")
+        finally:
+            with _refreshing_lock:
+                _refreshing.discard(l1_key)
+            close_thread_connections()
+
+    def _fetch(self, l1_key, ttl, url, req_params):
+        """Budgeted API fetch; stores the response in SQLite and the L1."""
+        cache_key = l1_key[1]
+        now = datetime.datetime.utcnow()
+        # Enforce credit budget
+        credits_used = self._get_credits_used()
+        if credits_used >= self.daily_credit_budget:
+            msg = f"DAILY CREDIT BUDGET EXCEEDED: {credits_used} >= {self.daily_credit_budget}"
+            self.logger.error(msg)
+            raise RuntimeError(msg)
+        # Retry logic: backoff + Retry-After + per-host circuit breaker (raises CircuitOpenError)
+        response = self.retry_policy.execute(url, lambda: http_get(url, params=req_params, timeout=10))
+        if response.status_code != 200:
+            raise Exception(f"HTTP {response.status_code}: {response.text}")
+        # Track credits: x-requests-last is this call's cost (x-requests-used is the month-to-date total).
+        credits_this_call = estimate_cost(req_params.get("markets", ""), req_params.get("regions", ""),
+                                          req_params.get("bookmakers"))
+        if "x-requests-last" in response.headers:
+            try:
+                credits_this_call = int(float(response.headers["x-requests-last"]))
+            except ValueError:
+                pass
         self._increment_credits(credits_this_call)
         self.logger.info(f"CREDITS_USED: {credits_this_call} (total today: {self._get_credits_used()})")
-        # Store in cache
-        with sqlite3.connect(self.db_path) as conn:
-            c = conn.cursor()
-            c.execute("REPLACE INTO odds_api_cache (cache_key, fetched_at, ttl_minutes, url, params_json, response_json) VALUES (?, ?, ?, ?, ?, ?)",
-                      (cache_key, now.isoformat(), ttl, url, json.dumps(req_params, sort_keys=True), response.text))
+        self._store_response(cache_key, now, ttl, url, req_params, response.text)
+        payload = response.json()
+        self._l1_set(l1_key, now, payload)
+        try:
+            counts = ingest_odds_payload(self.db_path, payload, now.isoformat(), req_params.get("markets"))
+            moved = record_movements(self.db_path, detect_movements(counts.pop("changes")), now.isoformat())
+            self.logger.info(f"ODDS_INGEST: {counts}, {moved} line movements")
+        except Exception as e:
+            self.logger.error(f"Failed to flatten odds into odds_outcomes: {e}")
+        games = games_from_payload(payload)
+        try:
+            upsert_games(games)
+        except Exception as e:
+            self.logger.error(f"Failed to update the games dimension: {e}")
+        for listener in list(_ingest_listeners):
+            try:
+                listener([g[0] for g in games], now.isoformat())
+            except Exception as e:
+                self.logger.error(f"Odds ingest listener {getattr(listener, '__name__', listener)} failed: {e}")
+        return self._meta(payload, now, "api")
+
+    def _store_response(self, cache_key, fetched_at, ttl, url, req_params, text):
+        codec, blob = _encode_response(text)
+        with transaction(self.db_path) as conn:
+            conn.execute(
+                "REPLACE INTO odds_api_cache (cache_key, fetched_at, ttl_minutes, url, params_json, response_json, codec, response_blob, size_bytes) "
+                "VALUES (?, ?, ?, ?, ?, NULL, ?, ?, ?)",
+                (cache_key, fetched_at.isoformat(), ttl, url, json.dumps(req_params, sort_keys=True), codec, blob, len(blob))
+            )
+        self._maybe_evict(fetched_at)
+
+    def _maybe_evict(self, now):
+        """On-write eviction, at most once per ODDS_CACHE_EVICT_INTERVAL_MINUTES per database."""
+        interval = datetime.timedelta(minutes=config.ODDS_CACHE_EVICT_INTERVAL_MINUTES)
+        with _eviction_lock:
+            last = _last_eviction.get(self.db_path)
+            if last is not None and now - last < interval:
+                return
+            _last_eviction[self.db_path] = now
+        self.evict_cache(now)
+        pruned = prune_movements(self.db_path, now)
+        if pruned:
+            self.logger.info(f"Pruned {pruned} line movements older than {config.ODDS_MOVEMENT_RETENTION_DAYS} days")
+
+    def evict_cache(self, now=None):
+        """
+        Delete rows older than ODDS_CACHE_RETENTION_TTLS x their TTL, the SWR
+        window or ODDS_SLATE_HOLD_MINUTES, whichever is longest, then the
+        oldest rows beyond ODDS_CACHE_MAX_MB, and hand the freed pages back to
+        the filesystem. Returns the number of rows deleted.
+        """
+        now = now or datetime.datetime.utcnow()
+        with transaction(self.db_path) as conn:
+            # Rows still inside the SWR window are kept so they can be served stale.
+            stale_minutes = self.max_stale_minutes if self.swr else 0
+            # A row's stored TTL is the one it was fetched under; callers may later read it
+            # under a longer one (the slate, when the credit plan skips its refresh), so no
+            # row goes before ODDS_SLATE_HOLD_MINUTES.
+            expired = conn.execute(
+                "DELETE FROM odds_api_cache WHERE julianday(fetched_at) + MAX(ttl_minutes * ?, ttl_minutes + ?, ?) / 1440.0 < julianday(?)",
+                (config.ODDS_CACHE_RETENTION_TTLS, stale_minutes, config.ODDS_SLATE_HOLD_MINUTES, now.isoformat())
+            ).rowcount
+            over_cap = conn.execute("""
+                DELETE FROM odds_api_cache WHERE cache_key IN (
+                    SELECT cache_key FROM (
+                        SELECT cache_key, SUM(size_bytes) OVER (ORDER BY fetched_at DESC, cache_key) AS running
+                        FROM odds_api_cache
+                    ) WHERE running > ?
+                )
+            """, (config.ODDS_CACHE_MAX_MB * 1024 * 1024,)).rowcount
+        deleted = expired + over_cap
+        if deleted:
+            self.logger.info(f"CACHE_EVICTED: {expired} expired, {over_cap} over size cap")
+            self._incremental_vacuum()
+        return deleted
+
+    def _incremental_vacuum(self):
+        """
+        Return up to ODDS_CACHE_VACUUM_PAGES free pages to the filesystem. A no-op
+        until the database is switched to auto_vacuum=INCREMENTAL, which needs a
+        full VACUUM and so is done offline (scripts/enable_incremental_vacuum.py).
+        """
+        conn = get_connection(self.db_path)
+        if conn.in_transaction:
             conn.commit()
-        return response.json()
+        conn.execute(f"PRAGMA incremental_vacuum({int(config.ODDS_CACHE_VACUUM_PAGES)})").fetchall()
@@ -0,0 +1,149 @@
+"""
+odds_credit_planner.py
+
+Plans how the day's Odds API credits are spent across the slate.
+
+The Odds API charges (markets x regions) credits per call, where a bookmakers
+list counts as one region per 10 books. Given the day's commence times, the
+credits already used and ODDS_DAILY_CREDIT_BUDGET less a reserve, the planner
+lays out a refresh schedule for the slate (featured markets) and for each open
+event's player props. Cadence tightens inside ODDS_PROP_NEAR_TIPOFF_HOURS, and
+when the schedule does not fit the budget it is stretched, then trimmed
+furthest-from-tip first, so snapshots near the close are the last to go.
+
+Functions:
+    estimate_cost(markets, regions="us", bookmakers=None): Credits one call costs.
+    parse_commence_time(value): Odds API commence_time as a naive UTC datetime.
+    OddsCreditPlanner.plan(games, credits_used, now=None): Fetch schedule and per-event TTLs.
+    OddsCreditPlanner.allow(cost, credits_used): Whether a fetch fits the budget.
+"""
+import logging
+import math
+from datetime import datetime, timedelta
+import config
+
+SLATE_MARKETS = "h2h,spreads,totals"
+# Stretch factors tried, in order, on the base cadence until the plan fits.
+CADENCE_SCALES = (1, 1.5, 2, 3, 4, 6, 8, 12, 16)
+
+
+def estimate_cost(markets, regions="us", bookmakers=None):
+    n_markets = len([m for m in markets.split(",") if m.strip()])
+    if bookmakers:
+        n_regions = math.ceil(len([b for b in bookmakers.split(",") if b.strip()]) / 10)
+    else:
+        n_regions = len([r for r in regions.split(",") if r.strip()])
+    return n_markets * max(1, n_regions)
+
+
+def parse_commence_time(value):
+    """Odds API commence_time ('...Z') as a naive UTC datetime, or None."""
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value.replace("Z", "+00:00")).replace(tzinfo=None)
+    except ValueError:
+        return None
+
+
+class OddsCreditPlanner:
+    def __init__(self, daily_budget=None, reserve_credits=None, regions="us",
+                 slate_markets=SLATE_MARKETS, prop_markets=None):
+        self.daily_budget = daily_budget if daily_budget is not None else config.ODDS_DAILY_CREDIT_BUDGET
+        self.reserve_credits = reserve_credits if reserve_credits is not None else config.ODDS_CREDIT_RESERVE
+        self.regions = regions
+        self.slate_markets = slate_markets
+        self.prop_markets = prop_markets or config.ODDS_PROP_MARKETS
+
+    def available(self, credits_used):
+        return max(0, self.daily_budget - self.reserve_credits - credits_used)
+
+    def allow(self, cost, credits_used):
+        return cost <= self.available(credits_used)
+
+    def _cadence_minutes(self, hours_to_tip, scale):
+        # Near tip-off the cadence stretches with sqrt(scale), so budget pressure thins
+        # the early-day refreshes first.
+        if hours_to_tip <= config.ODDS_PROP_NEAR_TIPOFF_HOURS:
+            return config.ODDS_PROP_TTL_NEAR_MINUTES * math.sqrt(scale)
+        return config.ODDS_PROP_TTL_FAR_MINUTES * scale
+
+    def _slots(self, tipoff, now, scale):
+        """Refresh times from now until tipoff; each slot is (due_at, minutes_to_tip, ttl_minutes)."""
+        window_start = tipoff - timedelta(hours=config.ODDS_PROP_NEAR_TIPOFF_HOURS)
+        slots, t = [], now
+        while t < tipoff:
+            minutes_to_tip = (tipoff - t).total_seconds() / 60
+            step = timedelta(minutes=math.ceil(self._cadence_minutes(minutes_to_tip / 60, scale)))
+            if t < window_start:
+                step = min(step, window_start - t)  # never step over the start of the near-tip window
+            slots.append((t, minutes_to_tip, max(1, math.ceil(step.total_seconds() / 60))))
+            t += step
+        return slots
+
+    def _schedule(self, open_events, last_tipoff, now, scale):
+        schedule = []
+        slate_cost = estimate_cost(self.slate_markets, self.regions)
+        prop_cost = estimate_cost(self.prop_markets, self.regions)
+        if last_tipoff is not None:
+            for due_at, minutes_to_tip, ttl in self._slots(last_tipoff, now, scale):
+                schedule.append({"due_at": due_at, "kind": "slate", "event_id": None,
+                                 "cost": slate_cost, "ttl_minutes": ttl, "minutes_to_tip": minutes_to_tip})
+        for event_id, tipoff in open_events:
+            for due_at, minutes_to_tip, ttl in self._slots(tipoff, now, scale):
+                schedule.append({"due_at": due_at, "kind": "props", "event_id": event_id,
+                                 "cost": prop_cost, "ttl_minutes": ttl, "minutes_to_tip": minutes_to_tip})
+        return schedule
+
+    def plan(self, games, credits_used, now=None):
+        """
+        Args:
+            games: dicts with 'game_id' and 'commence_time' (as from fetch_nba_games_and_markets).
+            credits_used: credits already spent today.
+        Returns:
+            dict with 'schedule' (planned fetches sorted by due_at), 'slate_ttl_minutes',
+            'event_ttl_minutes' ({event_id: ttl} for events with a fetch due now; events
+            absent from it should not be fetched), 'planned_cost', 'available' and 'scale'.
+        """
+        now = now or datetime.utcnow()
+        available = self.available(credits_used)
+        open_events = []
+        for game in games:
+            tipoff = parse_commence_time(game.get("commence_time"))
+            if tipoff is not None and tipoff > now and game.get("game_id"):
+                open_events.append((game["game_id"], tipoff))
+        last_tipoff = max((t for _, t in open_events), default=None)
+
+        scale, schedule = CADENCE_SCALES[0], []
+        for scale in CADENCE_SCALES:
+            schedule = self._schedule(open_events, last_tipoff, now, scale)
+            if sum(s["cost"] for s in schedule) <= available:
+                break
+        else:
+            # Even the sparsest cadence overruns: keep the fetches closest to tip-off.
+            kept, spent = [], 0
+            for slot in sorted(schedule, key=lambda s: s["minutes_to_tip"]):
+                if spent + slot["cost"] <= available:
+                    kept.append(slot)
+                    spent += slot["cost"]
+            schedule = kept
+            logging.warning(f"Odds credit plan trimmed to {len(schedule)} fetches ({spent} of {available} credits)")
+        schedule.sort(key=lambda s: s["due_at"])
+
+        # A fetch is "due now" if its first slot starts now; its TTL runs until the next one.
+        slate_ttl, event_ttls = None, {}
+        for slot in schedule:
+            if slot["due_at"] > now:
+                continue
+            if slot["kind"] == "slate":
+                slate_ttl = slot["ttl_minutes"]
+            else:
+                event_ttls[slot["event_id"]] = slot["ttl_minutes"]
+        return {
+            "schedule": schedule,
+            "slate_ttl_minutes": slate_ttl,
+            "event_ttl_minutes": event_ttls,
+            "planned_cost": sum(s["cost"] for s in schedule),
+            "available": available,
+            "scale": scale,
+        }
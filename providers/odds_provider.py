@@ -13,7 +13,10 @@ sys.modules["bootstrap"] = bootstrap
 spec.loader.exec_module(bootstrap)
 get_repo_root = bootstrap.get_repo_root
 import config
+import logging
+from datetime import datetime
 from providers.odds_adapter import OddsAdapter
+from providers.odds_credit_planner import OddsCreditPlanner, estimate_cost, parse_commence_time
 
 # Instantiate the OddsAdapter singleton
 _odds_adapter = OddsAdapter(
@@ -22,19 +25,45 @@ _odds_adapter = OddsAdapter(
     daily_credit_budget=config.ODDS_DAILY_CREDIT_BUDGET,
     default_ttl_minutes=config.ODDS_DEFAULT_TTL_MINUTES
 )
+_credit_planner = OddsCreditPlanner()
+# Last slate seen, so the planner can size the next slate refresh before fetching it.
+_last_slate = []
+
+def plan_odds_fetches(games=None, now=None):
+    """
+    Ask the credit planner what to refresh now. games defaults to the last
+    slate fetched; see OddsCreditPlanner.plan for the returned dict.
+    """
+    games = _last_slate if games is None else games
+    return _credit_planner.plan(games, _odds_adapter.get_credits_used(), now)
 
 def fetch_nba_games_and_markets():
     # Use the adapter for NBA odds
     import os
     fast_mode = os.environ.get("FAST_MODE", "0") == "1"
     markets = "h2h" if fast_mode else "h2h,spreads,totals"
-    odds = _odds_adapter.get_odds(
+    ttl = config.ODDS_DEFAULT_TTL_MINUTES
+    if _last_slate:
+        plan = plan_odds_fetches()
+        if plan["slate_ttl_minutes"] is not None:
+            ttl = plan["slate_ttl_minutes"]
+        else:
+            # The plan trimmed the slate refresh to keep credits for props near
+            # tip-off: any cached slate counts as fresh, even if credits remain.
+            logging.info("Odds credit planner: no slate refresh budgeted; using cached slate")
+            ttl = config.ODDS_SLATE_HOLD_MINUTES
+    result = _odds_adapter.get_odds_with_meta(
         sport="basketball_nba",
         regions="us",
         markets=markets,
         odds_format="american",
-        date_format="iso"
+        date_format="iso",
+        ttl_minutes=ttl
     )
+    if result["stale"]:
+        logging.warning(f"Using stale NBA odds fetched at {result['fetched_at']} "
+                        f"({result['age_seconds'] / 60:.0f} min old)")
+    odds = result["data"]
     clean_games = []
     for game in odds:
         clean_games.append({
@@ -44,4 +73,44 @@ def fetch_nba_games_and_markets():
             'commence_time': game.get('commence_time'),
             'bookmakers': game.get('bookmakers', [])
         })
+    _last_slate[:] = clean_games
     return clean_games
+
+
+def fetch_nba_player_props(games, markets=None, now=None, plan=None):
+    """
+    Per-event player-prop odds for the games in `games` that have not tipped off.
+
+    Each event is cached with the TTL the credit planner gives it (short near
+    tip-off, stretched under budget pressure), so a call only spends credits on
+    open events whose payload has expired; events the plan leaves out are skipped.
+    Returns a list of (game, result) pairs, result being the adapter's
+    get_event_odds_with_meta dict; events that fail are logged and skipped.
+    """
+    markets = markets or config.ODDS_PROP_MARKETS
+    now = now or datetime.utcnow()
+    plan = plan or plan_odds_fetches(games, now)
+    results = []
+    for game in games:
+        tipoff = parse_commence_time(game.get("commence_time"))
+        if tipoff is None or tipoff <= now or not game.get("game_id"):
+            continue
+        ttl = plan["event_ttl_minutes"].get(game["game_id"])
+        if ttl is None:
+            logging.info(f"Odds credit planner: no props refresh budgeted for event {game['game_id']}")
+            continue
+        try:
+            result = _odds_adapter.get_event_odds_with_meta(
+                sport="basketball_nba",
+                event_id=game["game_id"],
+                regions="us",
+                markets=markets,
+                odds_format="american",
+                date_format="iso",
+                ttl_minutes=ttl
+            )
+        except Exception as e:
+            logging.error(f"Player props fetch failed for event {game['game_id']}: {e}")
+            continue
+        results.append((game, result))
+    return results
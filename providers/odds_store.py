@@ -0,0 +1,228 @@
+"""
+odds_store.py
+
+Columnar store for Odds API payloads.
+
+OddsAdapter flattens every fresh /odds or /events/{id}/odds response once, at
+ingest, into the odds_outcomes table (migration odds/0002). Only outcomes
+whose point or price changed are rewritten, and outcomes a book has pulled
+are deleted, so ingest cost scales with what moved. Consumers read a pandas
+DataFrame and filter/group it instead of walking the nested JSON.
+
+Functions:
+    flatten_odds_payload(payload): Row tuples for a list of events or a single event.
+    ingest_odds_payload(db_path, payload, fetched_at, markets=None): Upsert changed rows.
+    get_odds_frame(db_path=None, event_ids=None, markets=None, bookmakers=None): Current odds as a DataFrame.
+    games_from_payload(payload): (event_id, home_team, away_team, commence_time) per event.
+    stat_type_for(label): Canonical stat type for a market key, box-score label or stat type.
+    get_player_prop_quotes(db_path=None, event_ids=None): Over quotes per book, player and stat.
+"""
+import json
+import pandas as pd
+import config
+from database.connection import get_connection, transaction
+
+OUTCOME_COLUMNS = [
+    "event_id", "sport", "commence_time", "home_team", "away_team", "bookmaker",
+    "market", "outcome", "description", "point", "price", "last_update", "fetched_at"
+]
+
+_UPSERT_OUTCOME_SQL = """
+    INSERT INTO odds_outcomes (event_id, sport, commence_time, home_team, away_team, bookmaker,
+                               market, outcome, description, point, price, last_update, fetched_at)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT(event_id, bookmaker, market, outcome, description) DO UPDATE SET
+        commence_time=excluded.commence_time,
+        point=excluded.point,
+        price=excluded.price,
+        last_update=excluded.last_update,
+        fetched_at=excluded.fetched_at
+"""
+
+
+def flatten_odds_payload(payload, fetched_at=None):
+    """Yield one OUTCOME_COLUMNS tuple per outcome in the payload."""
+    events = payload if isinstance(payload, list) else [payload]
+    for event in events:
+        if not isinstance(event, dict) or not event.get("id"):
+            continue
+        for bookmaker in event.get("bookmakers", []):
+            for market in bookmaker.get("markets", []):
+                last_update = market.get("last_update") or bookmaker.get("last_update")
+                for outcome in market.get("outcomes", []):
+                    yield (
+                        event["id"], event.get("sport_key"), event.get("commence_time"),
+                        event.get("home_team"), event.get("away_team"), bookmaker.get("key"),
+                        market.get("key"), outcome.get("name"), outcome.get("description") or "",
+                        outcome.get("point"), outcome.get("price"), last_update, fetched_at
+                    )
+
+
+def games_from_payload(payload):
+    """One (event_id, home_team, away_team, commence_time) tuple per event in the payload."""
+    events = payload if isinstance(payload, list) else [payload]
+    return [
+        (event["id"], event.get("home_team"), event.get("away_team"), event.get("commence_time"))
+        for event in events if isinstance(event, dict) and event.get("id")
+    ]
+
+
+# The one stat-type vocabulary for player props: closing-line snapshots and the
+# pipeline's CLV pick log both record these, so picks settle on the same key.
+STAT_TYPE_BY_MARKET = {
+    "player_points": "POINTS",
+    "player_rebounds": "REBOUNDS",
+    "player_assists": "ASSISTS",
+    "player_threes": "THREES",
+    "player_blocks": "BLOCKS",
+    "player_steals": "STEALS",
+    "player_turnovers": "TURNOVERS",
+    "player_points_rebounds_assists": "POINTS_REBOUNDS_ASSISTS",
+    "player_points_rebounds": "POINTS_REBOUNDS",
+    "player_points_assists": "POINTS_ASSISTS",
+    "player_rebounds_assists": "REBOUNDS_ASSISTS",
+}
+# Box-score labels (prop_generator's StatType) for the same markets.
+MARKET_BY_STAT_LABEL = {
+    "PTS": "player_points",
+    "REB": "player_rebounds",
+    "AST": "player_assists",
+    "3PM": "player_threes",
+    "FG3M": "player_threes",
+    "BLK": "player_blocks",
+    "STL": "player_steals",
+    "TOV": "player_turnovers",
+    "PRA": "player_points_rebounds_assists",
+}
+
+
+def stat_type_for(label):
+    """
+    Canonical stat type for a market key ('player_points'), a box-score label
+    ('PTS') or a stat type already in the vocabulary ('POINTS').
+    """
+    if label is None or pd.isna(label):
+        return None
+    label = str(label).strip()
+    market = MARKET_BY_STAT_LABEL.get(label.upper())
+    if market is None and label.lower().startswith("player_"):
+        market = label.lower()
+    if market is None:
+        return label.upper()
+    return STAT_TYPE_BY_MARKET.get(market, market[len("player_"):].upper())
+
+
+def _key(row):
+    return row[0], row[5], row[6], row[7], row[8]
+
+
+def _change(key, kind, old, new):
+    return {
+        "event_id": key[0], "bookmaker": key[1], "market": key[2], "outcome": key[3],
+        "description": key[4], "kind": kind, "old_point": old[0], "new_point": new[0],
+        "old_price": old[1], "new_price": new[1],
+    }
+
+
+def ingest_odds_payload(db_path, payload, fetched_at, markets=None):
+    """
+    Bring odds_outcomes in line with a fresh payload.
+
+    Args:
+        markets: markets that were requested (comma-separated or list); outcomes in
+            these markets for the payload's events that are absent from it are deleted.
+            Defaults to the markets present in the payload.
+    Returns:
+        dict with inserted, updated, removed and unchanged counts, and 'changes':
+        one dict per updated or removed outcome with its key fields, kind
+        ('moved' or 'removed') and old/new point and price.
+    """
+    rows = {}
+    for row in flatten_odds_payload(payload, fetched_at):
+        rows[_key(row)] = row
+    event_ids = sorted({k[0] for k in rows})
+    if isinstance(markets, str):
+        markets = [m.strip() for m in markets.split(",") if m.strip()]
+    markets = sorted(set(markets or []) | {k[2] for k in rows})
+    counts = {"inserted": 0, "updated": 0, "removed": 0, "unchanged": 0, "changes": []}
+    if not event_ids:
+        return counts
+    with transaction(db_path) as conn:
+        existing = {
+            (r[0], r[1], r[2], r[3], r[4]): (r[5], r[6])
+            for r in conn.execute("""
+                SELECT event_id, bookmaker, market, outcome, description, point, price FROM odds_outcomes
+                WHERE event_id IN (SELECT value FROM json_each(?)) AND market IN (SELECT value FROM json_each(?))
+            """, (json.dumps(event_ids), json.dumps(markets)))
+        }
+        changed = []
+        for key, row in rows.items():
+            current = existing.get(key)
+            if current is None:
+                counts["inserted"] += 1
+                changed.append(row)
+            elif current != (row[9], row[10]):
+                counts["updated"] += 1
+                changed.append(row)
+                counts["changes"].append(_change(key, "moved", current, (row[9], row[10])))
+            else:
+                counts["unchanged"] += 1
+        removed = [key for key in existing if key not in rows]
+        counts["removed"] = len(removed)
+        counts["changes"].extend(_change(key, "removed", existing[key], (None, None)) for key in removed)
+        if changed:
+            conn.executemany(_UPSERT_OUTCOME_SQL, changed)
+        if removed:
+            conn.executemany(
+                "DELETE FROM odds_outcomes WHERE event_id=? AND bookmaker=? AND market=? AND outcome=? AND description=?",
+                removed)
+    return counts
+
+
+def get_odds_frame(db_path=None, event_ids=None, markets=None, bookmakers=None):
+    """
+    Current odds as a DataFrame with OUTCOME_COLUMNS, optionally filtered by
+    event ids, markets (exact keys, or prefixes ending in '*', e.g. 'player_*')
+    and bookmakers.
+    """
+    clauses, params = [], []
+    if event_ids is not None:
+        clauses.append("event_id IN (SELECT value FROM json_each(?))")
+        params.append(json.dumps(list(event_ids)))
+    if markets is not None:
+        exact = [m for m in markets if not m.endswith("*")]
+        prefixes = [m[:-1] for m in markets if m.endswith("*")]
+        market_clauses = []
+        if exact:
+            market_clauses.append("market IN (SELECT value FROM json_each(?))")
+            params.append(json.dumps(exact))
+        for prefix in prefixes:
+            market_clauses.append("market >= ? AND market < ?")
+            params.extend([prefix, prefix + "\uffff"])
+        clauses.append("(" + " OR ".join(market_clauses or ["0"]) + ")")
+    if bookmakers is not None:
+        clauses.append("bookmaker IN (SELECT value FROM json_each(?))")
+        params.append(json.dumps(list(bookmakers)))
+    sql = f"SELECT {', '.join(OUTCOME_COLUMNS)} FROM odds_outcomes"
+    if clauses:
+        sql += " WHERE " + " AND ".join(clauses)
+    return pd.read_sql_query(sql, get_connection(db_path or config.DB_PATH), params=params)
+
+
+def get_player_prop_quotes(db_path=None, event_ids=None):
+    """
+    Current Over quotes for player props as a DataFrame with game_id, game_date,
+    player_name, stat_type, sportsbook, line and odds: one row per (event, book,
+    market, player), the player taken from the outcome description.
+    """
+    df = get_odds_frame(db_path, event_ids=event_ids, markets=["player_*"])
+    df = df[(df["outcome"] == "Over") & (df["description"] != "")]
+    return pd.DataFrame({
+        "game_id": df["event_id"],
+        "game_date": df["commence_time"].fillna("").str[:10],
+        "player_name": df["description"],
+        "stat_type": df["market"].map(stat_type_for),
+        "sportsbook": df["bookmaker"].fillna("unknown"),
+        "line": df["point"],
+        "odds": df["price"],
+    })
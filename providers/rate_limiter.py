@@ -0,0 +1,40 @@
+"""
+rate_limiter.py
+
+Thread-safe token bucket shared by every caller of a provider, so concurrent
+fetches (e.g. the slate prefetch stage) stay inside the provider's quota.
+"""
+import threading
+import time
+
+
+class TokenBucket:
+    def __init__(self, rate_per_second, capacity=None):
+        """
+        Args:
+            rate_per_second (float): Sustained refill rate.
+            capacity (float, optional): Burst size; defaults to one second of tokens.
+        """
+        self.rate = float(rate_per_second)
+        self.capacity = float(capacity) if capacity is not None else max(1.0, self.rate)
+        self._tokens = self.capacity
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._last) * self.rate)
+        self._last = now
+
+    def acquire(self, tokens=1):
+        """Block until `tokens` are available, then consume them. Returns seconds waited."""
+        waited = 0.0
+        while True:
+            with self._lock:
+                self._refill()
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return waited
+                shortfall = (tokens - self._tokens) / self.rate
+            time.sleep(shortfall)
+            waited += shortfall
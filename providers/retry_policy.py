@@ -0,0 +1,161 @@
+"""
+retry_policy.py
+
+Retry policy shared by the outbound providers (BallDontLie, The Odds API).
+
+- Exponential backoff with full jitter between attempts.
+- 429 and 503 honour Retry-After (delta-seconds or HTTP-date), up to a cap.
+- 5xx, 408 and transport errors are retried; other 4xx are returned at once.
+- A per-host circuit breaker opens after `failure_threshold` consecutive
+  failures and fails fast with CircuitOpenError until `cooldown_seconds`
+  have passed, then lets a single probe through: success closes it, failure
+  re-opens it for another cooldown.
+"""
+import logging
+import random
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlsplit
+import requests
+from config import (
+    RETRY_ATTEMPTS, RETRY_BASE_DELAY, RETRY_DELAY, RETRY_AFTER_MAX_SECONDS,
+    CIRCUIT_FAILURE_THRESHOLD, CIRCUIT_COOLDOWN_SECONDS
+)
+
+RETRYABLE_STATUSES = {408, 429, 500, 502, 503, 504}
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised instead of sending a request while a host's circuit is open."""
+
+
+class CircuitBreaker:
+    CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+    def __init__(self, host, failure_threshold, cooldown_seconds):
+        self.host = host
+        self.failure_threshold = failure_threshold
+        self.cooldown_seconds = cooldown_seconds
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._lock = threading.Lock()
+
+    def allow_request(self):
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN and time.monotonic() - self.opened_at >= self.cooldown_seconds:
+                self.state = self.HALF_OPEN
+                logging.info(f"Circuit for {self.host} half-open: sending probe")
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            if self.state != self.CLOSED:
+                logging.info(f"Circuit for {self.host} closed")
+            self.state = self.CLOSED
+            self.failures = 0
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                if self.state != self.OPEN:
+                    logging.warning(f"Circuit for {self.host} open after {self.failures} failures; "
+                                    f"failing fast for {self.cooldown_seconds}s")
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+
+
+_breakers = {}
+_breakers_lock = threading.Lock()
+
+
+def get_circuit_breaker(url, failure_threshold=None, cooldown_seconds=None):
+    host = urlsplit(url).netloc.lower()
+    with _breakers_lock:
+        breaker = _breakers.get(host)
+        if breaker is None:
+            breaker = CircuitBreaker(
+                host,
+                failure_threshold or CIRCUIT_FAILURE_THRESHOLD,
+                cooldown_seconds or CIRCUIT_COOLDOWN_SECONDS
+            )
+            _breakers[host] = breaker
+        return breaker
+
+
+def parse_retry_after(value):
+    """Retry-After as seconds (float), or None if absent/unparseable."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+        if when.tzinfo is None:
+            when = when.replace(tzinfo=timezone.utc)
+        return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+    except (TypeError, ValueError):
+        return None
+
+
+class RetryPolicy:
+    def __init__(self, max_attempts=None, base_delay=None, max_delay=None, max_retry_after=None):
+        self.max_attempts = max_attempts or RETRY_ATTEMPTS
+        self.base_delay = base_delay if base_delay is not None else RETRY_BASE_DELAY
+        self.max_delay = max_delay if max_delay is not None else RETRY_DELAY
+        self.max_retry_after = max_retry_after if max_retry_after is not None else RETRY_AFTER_MAX_SECONDS
+
+    def backoff(self, attempt):
+        """Full-jitter exponential backoff for the given 0-based attempt."""
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+
+    def execute(self, url, send, max_attempts=None):
+        """
+        Call send() (which performs one request to url) under this policy.
+        Returns the last response (possibly non-2xx); raises CircuitOpenError
+        when the host's circuit is open, or the last transport error.
+        """
+        breaker = get_circuit_breaker(url)
+        attempts = max_attempts or self.max_attempts
+        response, last_exc = None, None
+        for attempt in range(attempts):
+            if not breaker.allow_request():
+                if attempt == 0:
+                    raise CircuitOpenError(f"Circuit open for {breaker.host}; skipping {url}")
+                break  # this call tripped the breaker; stop retrying and report what we have
+            delay = self.backoff(attempt)
+            try:
+                response = send()
+                last_exc = None
+            except requests.RequestException as e:
+                breaker.record_failure()
+                last_exc = e
+                logging.warning(f"Attempt {attempt+1}/{attempts} for {url} failed: {e}")
+            else:
+                status = response.status_code
+                if status not in RETRYABLE_STATUSES:
+                    # 2xx/3xx, or a client error retrying won't fix; the host itself is healthy.
+                    breaker.record_success()
+                    return response
+                if status != 429:
+                    breaker.record_failure()
+                retry_after = parse_retry_after(response.headers.get("Retry-After"))
+                if retry_after is not None:
+                    if retry_after > self.max_retry_after:
+                        logging.warning(f"{url} asked to retry after {retry_after:.0f}s; giving up")
+                        return response
+                    delay = retry_after
+                logging.warning(f"Attempt {attempt+1}/{attempts} for {url} returned {status}")
+            if attempt < attempts - 1 and breaker.state != CircuitBreaker.OPEN:
+                time.sleep(delay)
+        if last_exc is not None:
+            raise last_exc
+        return response
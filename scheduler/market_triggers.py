@@ -1,16 +1,17 @@
 import os
 import json
 import logging
+import config
 from datetime import datetime
 from providers.get_injuries import get_latest_injuries
-from providers.odds_provider import fetch_nba_games_and_markets
+from providers.odds_provider import fetch_nba_games_and_markets, plan_odds_fetches, parse_commence_time
 import threading
 import time
 from collectors.closing_line_snapshot_collector import collect_current_prop_odds
+from providers.line_movement import consume_movements
 
 CACHE_DIR = os.path.join("cache")
 INJURY_SNAPSHOT = os.path.join(CACHE_DIR, "injury_snapshot.json")
-ODDS_SNAPSHOT = os.path.join(CACHE_DIR, "odds_snapshot.json")
 GAMES_SNAPSHOT = os.path.join(CACHE_DIR, "games_snapshot.json")
 LOG_PATH = os.path.join("logs", "scheduler.log")
 os.makedirs(CACHE_DIR, exist_ok=True)
@@ -43,43 +44,22 @@ def check_injury_news():
         return False
 
 def check_line_movement():
+    """
+    Line movements since the last check, as recorded when odds are ingested
+    (see providers.line_movement). Returns the list of movement dicts, which
+    is truthy exactly when the pipeline should rerun.
+    """
     try:
-        odds = fetch_nba_games_and_markets()
-        if os.path.exists(ODDS_SNAPSHOT):
-            with open(ODDS_SNAPSHOT, 'r') as f:
-                prev = json.load(f)
-        else:
-            prev = {}
-        changed = False
-        for game in odds:
-            gid = game.get('game_id')
-            for bm in game.get('bookmakers', []):
-                for market in bm.get('markets', []):
-                    for outcome in market.get('outcomes', []):
-                        key = f"{gid}_{market['key']}_{outcome['name']}"
-                        prev_line = prev.get(key, {}).get('line')
-                        curr_line = outcome.get('line')
-                        if prev_line is not None and curr_line is not None:
-                            if abs(curr_line - prev_line) >= 0.75:
-                                changed = True
-                                break
-        if changed:
-            logging.info("Line movement detected: rerun pipeline.")
-        # Save snapshot
-        flat = {}
-        for game in odds:
-            gid = game.get('game_id')
-            for bm in game.get('bookmakers', []):
-                for market in bm.get('markets', []):
-                    for outcome in market.get('outcomes', []):
-                        key = f"{gid}_{market['key']}_{outcome['name']}"
-                        flat[key] = {'line': outcome.get('line')}
-        with open(ODDS_SNAPSHOT, 'w') as f:
-            json.dump(flat, f)
-        return changed
+        # Refreshes (and ingests) the slate if its TTL is up; movements are recorded at ingest.
+        fetch_nba_games_and_markets()
+        movements = consume_movements(config.DB_PATH, "market_triggers")
+        if movements:
+            events = sorted({m["event_id"] for m in movements})
+            logging.info(f"Line movement detected ({len(movements)} moves across {len(events)} games): rerun pipeline.")
+        return movements
     except Exception as e:
         logging.error(f"Line movement check failed: {e}")
-        return False
+        return []
 
 def check_new_games_added():
     try:
@@ -102,7 +82,8 @@ def check_new_games_added():
 
 def run_periodic_odds_snapshot():
     """
-    Periodically collect odds snapshots for games starting soon.
+    Periodically collect odds snapshots for games starting soon, as far as the
+    odds credit planner budgets them.
     """
     while True:
         try:
@@ -110,11 +91,16 @@ def run_periodic_odds_snapshot():
             games = fetch_nba_games_and_markets()
             soon_games = [
                 g for g in games
-                if "commence_time" in g and
-                0 <= (datetime.fromisoformat(g["commence_time"]) - now).total_seconds() / 3600 <= CLOSING_WINDOW_HOURS
+                if parse_commence_time(g.get("commence_time")) and
+                0 <= (parse_commence_time(g["commence_time"]) - now).total_seconds() / 3600 <= CLOSING_WINDOW_HOURS
             ]
-            if soon_games:
-                collect_current_prop_odds()
+            plan = plan_odds_fetches(games, now)
+            if any(g["game_id"] in plan["event_ttl_minutes"] for g in soon_games):
+                logging.info(f"Odds credit plan: {len(plan['event_ttl_minutes'])} events due, "
+                             f"{plan['planned_cost']}/{plan['available']} credits planned (cadence x{plan['scale']})")
+                collect_current_prop_odds(plan)
+            elif soon_games:
+                logging.info("Odds credit planner: no prop snapshots budgeted for games in the closing window.")
             else:
                 logging.info("No games within closing window for odds snapshot.")
         except Exception as e:
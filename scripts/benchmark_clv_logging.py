@@ -0,0 +1,70 @@
+"""
+Caller-side cost of CLV audit logging: 10k log_clv_action calls with the old
+open/append/close-per-line writer against the queued, buffered one, plus the
+time the background writer needs to get everything to disk.
+
+Usage:
+    python scripts/benchmark_clv_logging.py [--calls 10000]
+"""
+import sys
+import importlib.util
+from pathlib import Path
+
+repo_root = Path(__file__).resolve().parents[1]
+bootstrap_path = repo_root / "scripts" / "bootstrap.py"
+spec = importlib.util.spec_from_file_location("bootstrap", bootstrap_path)
+bootstrap = importlib.util.module_from_spec(spec)
+sys.modules["bootstrap"] = bootstrap
+spec.loader.exec_module(bootstrap)
+
+import argparse
+import os
+import tempfile
+import time
+from datetime import datetime
+import database.clv_tracking as clv_tracking
+
+
+def legacy_log_clv_action(path, message):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(f"{datetime.now().isoformat()} | {message}\n")
+
+
+def count_lines(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return sum(1 for _ in f)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--calls", type=int, default=10000)
+    args = parser.parse_args()
+    messages = [f"Set closing line for Player {i} PRA 2025-01-15 (id={i}): line=31.5, odds=-110, clv=1.5"
+                for i in range(args.calls)]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        legacy_path = os.path.join(tmp, "legacy", "clv_tracking.log")
+        start = time.perf_counter()
+        for message in messages:
+            legacy_log_clv_action(legacy_path, message)
+        legacy = time.perf_counter() - start
+
+        clv_tracking.CLV_LOG_PATH = os.path.join(tmp, "buffered", "clv_tracking.log")
+        start = time.perf_counter()
+        for message in messages:
+            clv_tracking.log_clv_action(message)
+        enqueue = time.perf_counter() - start
+        clv_tracking.flush_clv_log(shutdown=True)
+        drained = time.perf_counter() - start
+
+        print(f"{args.calls} calls")
+        print(f"{'writer':<22}{'caller s':>10}{'per call us':>14}{'lines':>8}")
+        print(f"{'open/append/close':<22}{legacy:>10.3f}{legacy / args.calls * 1e6:>14.1f}{count_lines(legacy_path):>8}")
+        print(f"{'queued + buffered':<22}{enqueue:>10.3f}{enqueue / args.calls * 1e6:>14.1f}"
+              f"{count_lines(clv_tracking.CLV_LOG_PATH):>8}")
+        print(f"buffered writer on disk after {drained:.3f}s")
+
+
+if __name__ == "__main__":
+    main()
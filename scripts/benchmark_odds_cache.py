@@ -0,0 +1,152 @@
+"""
+DB size and lookup latency for odds_api_cache after a simulated month of
+10-minute snapshots: the legacy layout (raw TEXT, no eviction) against the
+compressed, self-evicting one in OddsAdapter.
+
+Every snapshot writes one slate request plus one request per event; event ids
+rotate daily, so each day adds new cache keys the legacy table never drops.
+
+Usage:
+    python scripts/benchmark_odds_cache.py [--days 30] [--events 10] [--interval 10]
+"""
+import sys
+import importlib.util
+from pathlib import Path
+
+repo_root = Path(__file__).resolve().parents[1]
+bootstrap_path = repo_root / "scripts" / "bootstrap.py"
+spec = importlib.util.spec_from_file_location("bootstrap", bootstrap_path)
+bootstrap = importlib.util.module_from_spec(spec)
+sys.modules["bootstrap"] = bootstrap
+spec.loader.exec_module(bootstrap)
+
+import argparse
+import datetime
+import json
+import os
+import random
+import statistics
+import tempfile
+import time
+from database.connection import get_connection, transaction, close_thread_connections
+from providers.odds_adapter import OddsAdapter, _decode_response
+
+BOOKS = ["draftkings", "fanduel", "betmgm", "caesars", "pointsbetus", "betrivers", "unibet_us", "wynnbet"]
+
+
+def synthetic_event(rng, event_id, with_props):
+    markets = []
+    for key in ("h2h", "spreads", "totals"):
+        markets.append({"key": key, "last_update": "2025-01-01T00:00:00Z", "outcomes": [
+            {"name": "Home Team", "price": rng.randint(-250, 250), "point": round(rng.uniform(-12, 12), 1)},
+            {"name": "Away Team", "price": rng.randint(-250, 250), "point": round(rng.uniform(-12, 12), 1)},
+        ]})
+    if with_props:
+        for key in ("player_points", "player_rebounds", "player_assists"):
+            outcomes = []
+            for p in range(10):
+                line = round(rng.uniform(2, 30) * 2) / 2
+                outcomes.append({"name": "Over", "description": f"Player {p}", "price": rng.randint(-140, 120), "point": line})
+                outcomes.append({"name": "Under", "description": f"Player {p}", "price": rng.randint(-140, 120), "point": line})
+            markets.append({"key": key, "last_update": "2025-01-01T00:00:00Z", "outcomes": outcomes})
+    return {
+        "id": event_id, "sport_key": "basketball_nba", "commence_time": "2025-01-01T00:00:00Z",
+        "home_team": "Home Team", "away_team": "Away Team",
+        "bookmakers": [{"key": b, "title": b, "last_update": "2025-01-01T00:00:00Z", "markets": markets} for b in BOOKS],
+    }
+
+
+def snapshot_requests(rng, day, events):
+    """(cache_key, response_text) pairs written by one snapshot on `day`."""
+    event_ids = [f"d{day}e{e}" for e in range(events)]
+    slate = [synthetic_event(rng, eid, with_props=False) for eid in event_ids]
+    yield f"slate-{day}", json.dumps(slate)
+    for eid in event_ids:
+        yield f"event-{eid}", json.dumps(synthetic_event(rng, eid, with_props=True))
+
+
+def create_legacy_table(db_path):
+    with transaction(db_path) as conn:
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS odds_api_cache (
+                cache_key TEXT PRIMARY KEY, fetched_at TEXT, ttl_minutes INTEGER,
+                url TEXT, params_json TEXT, response_json TEXT
+            )
+        """)
+
+
+def db_size_mb(db_path):
+    get_connection(db_path).execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    total = sum(os.path.getsize(p) for p in (db_path, db_path + "-wal") if os.path.exists(p))
+    return total / (1024 * 1024)
+
+
+def time_lookups(db_path, keys, repeats):
+    conn = get_connection(db_path)
+    compressed = any(r[1] == "codec" for r in conn.execute("PRAGMA table_info(odds_api_cache)"))
+    samples = []
+    for _ in range(repeats):
+        for key in keys:
+            t = time.perf_counter()
+            if compressed:
+                row = conn.execute("SELECT fetched_at, ttl_minutes, codec, response_blob, response_json "
+                                   "FROM odds_api_cache WHERE cache_key=?", (key,)).fetchone()
+                json.loads(_decode_response(row[2], row[3], row[4]))
+            else:
+                row = conn.execute("SELECT fetched_at, ttl_minutes, response_json "
+                                   "FROM odds_api_cache WHERE cache_key=?", (key,)).fetchone()
+                json.loads(row[2])
+            samples.append((time.perf_counter() - t) * 1000)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--days", type=int, default=30)
+    parser.add_argument("--events", type=int, default=10)
+    parser.add_argument("--interval", type=int, default=10, help="minutes between snapshots (also the TTL)")
+    parser.add_argument("--repeats", type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        legacy_db = os.path.join(tmp, "legacy_odds_cache.db")
+        new_db = os.path.join(tmp, "compressed_odds_cache.db")
+        create_legacy_table(legacy_db)
+        create_legacy_table(new_db)
+        adapter = OddsAdapter(db_path=new_db, api_key="benchmark", daily_credit_budget=0,
+                              default_ttl_minutes=args.interval)
+
+        rng = random.Random(42)
+        start = datetime.datetime(2025, 1, 1)
+        snapshots = args.days * 24 * 60 // args.interval
+        write_legacy = write_new = 0.0
+        last_keys = []
+        for s in range(snapshots):
+            now = start + datetime.timedelta(minutes=s * args.interval)
+            last_keys = []
+            for key, text in snapshot_requests(rng, now.date().toordinal(), args.events):
+                last_keys.append(key)
+                t = time.perf_counter()
+                with transaction(legacy_db) as conn:
+                    conn.execute("REPLACE INTO odds_api_cache (cache_key, fetched_at, ttl_minutes, url, params_json, response_json) "
+                                 "VALUES (?, ?, ?, ?, ?, ?)", (key, now.isoformat(), args.interval, "", "{}", text))
+                write_legacy += time.perf_counter() - t
+                t = time.perf_counter()
+                adapter._store_response(key, now, args.interval, "", {}, text)
+                write_new += time.perf_counter() - t
+        writes = snapshots * (args.events + 1)
+        print(f"Simulated {snapshots:,} snapshots ({writes:,} cache writes) over {args.days} days")
+
+        rows = {db: get_connection(db).execute("SELECT COUNT(*) FROM odds_api_cache").fetchone()[0]
+                for db in (legacy_db, new_db)}
+        sizes = {db: db_size_mb(db) for db in (legacy_db, new_db)}
+        lookups = {db: time_lookups(db, last_keys, args.repeats) for db in (legacy_db, new_db)}
+        close_thread_connections()
+
+    print(f"{'layout':<22} {'rows':>8} {'size MB':>9} {'lookup ms':>10} {'write ms':>9}")
+    for label, db, write_s in (("legacy TEXT", legacy_db, write_legacy), ("compressed + evicting", new_db, write_new)):
+        print(f"{label:<22} {rows[db]:>8,} {sizes[db]:>9.1f} {lookups[db]:>10.3f} {write_s / writes * 1000:>9.3f}")
+
+
+if __name__ == "__main__":
+    main()
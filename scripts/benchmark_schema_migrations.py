@@ -0,0 +1,111 @@
+"""
+Before/after timing report for the schema migrations on a synthetic game_logs.
+
+Builds a throwaway database with N game_logs rows (default 1,000,000, ~1% of
+them duplicate (player_id, game_date) pairs), times the hot queries, applies
+the 'player' migrations, and times the same queries again.
+
+Usage:
+    python scripts/benchmark_schema_migrations.py [--rows 1000000] [--players 2000]
+"""
+import sys
+import importlib.util
+from pathlib import Path
+
+repo_root = Path(__file__).resolve().parents[1]
+bootstrap_path = repo_root / "scripts" / "bootstrap.py"
+spec = importlib.util.spec_from_file_location("bootstrap", bootstrap_path)
+bootstrap = importlib.util.module_from_spec(spec)
+sys.modules["bootstrap"] = bootstrap
+spec.loader.exec_module(bootstrap)
+
+import argparse
+import datetime
+import os
+import random
+import statistics
+import tempfile
+import time
+from database.connection import get_connection, transaction, close_thread_connections
+from database.db_manager import _create_tables
+from database.schema_migrations import run_migrations
+
+
+def build_synthetic_db(db_path, rows, players):
+    days = max(1, rows // players)
+    start = datetime.date(2025, 10, 21)
+    dates = [(start + datetime.timedelta(days=d)).isoformat() for d in range(days)]
+    rng = random.Random(42)
+    with transaction(db_path) as conn:
+        _create_tables(conn)
+        conn.executemany("INSERT INTO players (player_id, name, team) VALUES (?, ?, ?)",
+                         [(p, f"Player {p}", f"Team {p % 30}") for p in range(players)])
+
+        def gen():
+            for i in range(rows):
+                if i and i % 100 == 0:
+                    pid, gd = rng.randrange(players), rng.choice(dates)  # duplicate-prone re-fetch
+                else:
+                    pid, gd = i % players, dates[(i // players) % days]
+                yield (pid, gd, rng.uniform(10, 40), rng.uniform(0, 40), rng.uniform(0, 15), rng.uniform(0, 12))
+        conn.executemany(
+            "INSERT INTO game_logs (player_id, game_date, minutes, points, rebounds, assists) VALUES (?, ?, ?, ?, ?, ?)",
+            gen())
+    return dates
+
+
+def time_queries(db_path, dates, players, repeats):
+    conn = get_connection(db_path)
+    rng = random.Random(7)
+    lo, hi = dates[len(dates) // 3], dates[len(dates) // 3 + 6]
+    queries = {
+        "recent stats (player_id, ORDER BY date LIMIT 5)": lambda: conn.execute(
+            "SELECT minutes, points, rebounds, assists FROM game_logs WHERE player_id=? ORDER BY game_date DESC LIMIT ?",
+            (rng.randrange(players), 5)).fetchall(),
+        "distinct dates (game_date BETWEEN)": lambda: conn.execute(
+            "SELECT DISTINCT game_date FROM game_logs WHERE game_date BETWEEN ? AND ?", (lo, hi)).fetchall(),
+        "recent players (game_date >= ? subquery)": lambda: conn.execute(
+            "SELECT DISTINCT player_id, name, team FROM players WHERE player_id IN "
+            "(SELECT player_id FROM game_logs WHERE game_date >= ?)", (dates[-7],)).fetchall(),
+    }
+    results = {}
+    for name, fn in queries.items():
+        samples = []
+        for _ in range(repeats):
+            t = time.perf_counter()
+            fn()
+            samples.append((time.perf_counter() - t) * 1000)
+        results[name] = statistics.median(samples)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--players", type=int, default=2000)
+    parser.add_argument("--repeats", type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "bench_game_logs.db")
+        t = time.perf_counter()
+        dates = build_synthetic_db(db_path, args.rows, args.players)
+        print(f"Built {args.rows:,} game_logs rows in {time.perf_counter() - t:.1f}s")
+
+        before = time_queries(db_path, dates, args.players, args.repeats)
+        t = time.perf_counter()
+        applied = run_migrations(db_path, "player")
+        migrate_s = time.perf_counter() - t
+        remaining = get_connection(db_path).execute("SELECT COUNT(*) FROM game_logs").fetchone()[0]
+        after = time_queries(db_path, dates, args.players, args.repeats)
+        close_thread_connections()
+
+    print(f"Applied {applied} in {migrate_s:.1f}s; {args.rows - remaining:,} duplicate rows removed")
+    print(f"{'query':<50} {'before ms':>10} {'after ms':>10} {'speedup':>9}")
+    for name in before:
+        speedup = before[name] / after[name] if after[name] else float("inf")
+        print(f"{name:<50} {before[name]:>10.2f} {after[name]:>10.2f} {speedup:>8.0f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""
+Switch a SQLite database (default: config.DB_PATH, which holds the odds cache)
+to auto_vacuum=INCREMENTAL, so odds cache eviction can hand freed pages back to
+the filesystem with PRAGMA incremental_vacuum.
+
+The switch needs one full VACUUM, which rewrites every table under an exclusive
+lock: run this offline, with the pipeline, collectors and scheduler stopped.
+Databases already in incremental mode are left alone.
+
+Usage:
+    python scripts/enable_incremental_vacuum.py [--db-path database/prop_ai.db]
+"""
+import sys
+import importlib.util
+from pathlib import Path
+
+repo_root = Path(__file__).resolve().parents[1]
+bootstrap_path = repo_root / "scripts" / "bootstrap.py"
+spec = importlib.util.spec_from_file_location("bootstrap", bootstrap_path)
+bootstrap = importlib.util.module_from_spec(spec)
+sys.modules["bootstrap"] = bootstrap
+spec.loader.exec_module(bootstrap)
+
+import argparse
+import os
+import sqlite3
+import time
+import config
+
+AUTO_VACUUM_INCREMENTAL = 2
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--db-path", default=config.DB_PATH)
+    args = parser.parse_args()
+    if not os.path.exists(args.db_path):
+        sys.exit(f"No database at {args.db_path}")
+    conn = sqlite3.connect(args.db_path, isolation_level=None)
+    try:
+        if conn.execute("PRAGMA auto_vacuum").fetchone()[0] == AUTO_VACUUM_INCREMENTAL:
+            print(f"{args.db_path} already uses auto_vacuum=INCREMENTAL")
+            return
+        before = os.path.getsize(args.db_path)
+        start = time.perf_counter()
+        conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+        conn.execute("VACUUM")
+        elapsed = time.perf_counter() - start
+    finally:
+        conn.close()
+    after = os.path.getsize(args.db_path)
+    print(f"Enabled incremental vacuum on {args.db_path} in {elapsed:.1f}s "
+          f"({before / 1e6:.1f} MB -> {after / 1e6:.1f} MB)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""
+Run daily_pipeline end to end against recorded HTTP cassettes and print
+per-stage timings, so performance changes can be measured on an offline box.
+
+Capture a slate once with network access (this runs the live pipeline):
+    python scripts/replay_slate.py --record --cassettes data/cassettes/2025-01-15
+
+Replay it any number of times, optionally with synthetic per-request latency:
+    python scripts/replay_slate.py --cassettes data/cassettes/2025-01-15 --latency-ms 80
+
+Each run works in a fresh temporary directory unless --workdir is given: the
+player and CLV databases, data/, output/ and logs/ (and the working directory,
+for modules that write relative paths) all live there, so nothing touches the
+production files and the odds cache never short-circuits replayed requests.
+Notifications are off.
+"""
+import sys
+import importlib.util
+from pathlib import Path
+
+repo_root = Path(__file__).resolve().parents[1]
+bootstrap_path = repo_root / "scripts" / "bootstrap.py"
+spec = importlib.util.spec_from_file_location("bootstrap", bootstrap_path)
+bootstrap = importlib.util.module_from_spec(spec)
+sys.modules["bootstrap"] = bootstrap
+spec.loader.exec_module(bootstrap)
+
+import argparse
+import datetime
+import json
+import logging
+import os
+import tempfile
+import time
+
+MANIFEST_FILE = "manifest.json"
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--cassettes", required=True, help="cassette directory to record to or replay from")
+    parser.add_argument("--record", action="store_true", help="run live and record cassettes instead of replaying")
+    parser.add_argument("--latency-ms", type=float, default=0, help="synthetic latency per replayed request")
+    parser.add_argument("--workdir", help="directory for databases, outputs and logs (default: a fresh temporary one)")
+    args = parser.parse_args()
+    cassettes = os.path.abspath(args.cassettes)
+
+    manifest_path = os.path.join(cassettes, MANIFEST_FILE)
+    if args.record:
+        today = datetime.date.today()
+    else:
+        if not os.path.exists(manifest_path):
+            sys.exit(f"No {MANIFEST_FILE} in {cassettes}; record a slate first with --record")
+        with open(manifest_path, "r", encoding="utf-8") as f:
+            today = datetime.date.fromisoformat(json.load(f)["today"])
+
+    tmp = tempfile.TemporaryDirectory()
+    workdir = os.path.abspath(args.workdir or tmp.name)
+    os.makedirs(workdir, exist_ok=True)
+    # Settings are read at import time, so they must be in place before config loads.
+    os.environ["DB_PATH"] = os.path.join(workdir, "prop_ai.db")
+    os.environ["CLV_DB_PATH"] = os.path.join(workdir, "clv_tracking.db")
+    os.environ["DATA_DIR"] = os.path.join(workdir, "data")
+    os.environ["OUTPUT_DIR"] = os.path.join(workdir, "output")
+    os.environ["LOGS_DIR"] = os.path.join(workdir, "logs")
+    os.environ["HTTP_CASSETTE_MODE"] = "record" if args.record else "replay"
+    os.environ["HTTP_CASSETTE_DIR"] = cassettes
+    os.environ["HTTP_REPLAY_LATENCY_MS"] = str(args.latency_ms)
+    os.environ["USE_EMAIL_NOTIFICATION"] = "False"
+    os.environ["USE_SLACK_NOTIFICATION"] = "False"
+
+    # Some modules write to cwd-relative paths (logs/, data/raw/).
+    cwd = os.getcwd()
+    os.chdir(workdir)
+    try:
+        from database.connection import close_thread_connections
+        from database.clv_tracking import flush_clv_log
+        from daily_pipeline import run_daily_pipeline
+
+        start = time.perf_counter()
+        timings = run_daily_pipeline(reason="record" if args.record else "replay", today=today) or {}
+        total = time.perf_counter() - start
+        flush_clv_log(shutdown=True)
+        close_thread_connections()
+    finally:
+        os.chdir(cwd)
+    logging.shutdown()
+    tmp.cleanup()
+
+    if args.record:
+        os.makedirs(cassettes, exist_ok=True)
+        with open(manifest_path, "w", encoding="utf-8") as f:
+            json.dump({"captured_at": datetime.datetime.now().isoformat(), "today": today.isoformat()}, f)
+
+    mode = "record" if args.record else f"replay, {args.latency_ms:g} ms/request"
+    print(f"\nSlate {today} ({mode})")
+    print(f"{'stage':<22}{'seconds':>10}")
+    for stage, seconds in timings.items():
+        print(f"{stage:<22}{seconds:>10.3f}")
+    print(f"{'total':<22}{total:>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
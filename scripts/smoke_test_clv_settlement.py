@@ -0,0 +1,75 @@
+"""
+Check that picks shaped like daily_pipeline's CLV log settle: a prop_generator
+row (StatType 'PTS') logged at a real book, and one logged with no book, both
+against closing lines captured the way the snapshot collector stores them.
+Runs against a throwaway CLV database; exits non-zero if anything is unsettled.
+"""
+import sys
+import importlib.util
+from pathlib import Path
+
+repo_root = Path(__file__).resolve().parents[1]
+bootstrap_path = repo_root / "scripts" / "bootstrap.py"
+spec = importlib.util.spec_from_file_location("bootstrap", bootstrap_path)
+bootstrap = importlib.util.module_from_spec(spec)
+sys.modules["bootstrap"] = bootstrap
+spec.loader.exec_module(bootstrap)
+
+import os
+import tempfile
+
+tmp = tempfile.TemporaryDirectory()
+# Settings are read at import time, so they must be in place before config loads.
+os.environ["CLV_DB_PATH"] = os.path.join(tmp.name, "clv_tracking.db")
+os.environ["LOGS_DIR"] = os.path.join(tmp.name, "logs")
+
+import pandas as pd
+from database.db_manager import initialize_clv_tracking
+from database.clv_tracking import (
+    insert_clv_snapshots, insert_closing_line_snapshots, upsert_games, get_clv_db_connection, flush_clv_log
+)
+from database.connection import close_thread_connections
+from helpers.clv_utils import update_closing_lines_for_unsettled_props, ANY_SPORTSBOOK
+
+
+def main():
+    initialize_clv_tracking()
+    upsert_games([("evt1", "BOS", "NYK", "2025-01-15T00:10:00Z")])
+    # As player_prop_snapshot_rows writes them: market-derived stat type, real book key.
+    insert_closing_line_snapshots([
+        ("2025-01-15", "evt1", "Jayson Tatum", "POINTS", "draftkings", 27.5, -115, "2025-01-14T22:00:00"),
+        ("2025-01-15", "evt1", "Jayson Tatum", "POINTS", "draftkings", 28.5, -110, "2025-01-15T00:05:00"),
+        ("2025-01-15", "evt1", "Jalen Brunson", "ASSISTS", "fanduel", 7.5, -120, "2025-01-15T00:00:00"),
+    ])
+    # As daily_pipeline logs them from df_ev.
+    picks = pd.DataFrame([
+        {"PLAYER_NAME": "Jayson Tatum", "StatType": "PTS", "line": 27.5, "odds": -115,
+         "Projection": 29.1, "EV_Over": 0.02, "game_id": "evt1", "sportsbook": "draftkings"},
+        {"PLAYER_NAME": "Jalen Brunson", "StatType": "AST", "line": 7.0, "odds": -110,
+         "Projection": 7.9, "EV_Over": 0.01, "game_id": "evt1", "sportsbook": ANY_SPORTSBOOK},
+    ])
+    insert_clv_snapshots(picks, columns={
+        "player_name": "PLAYER_NAME", "stat_type": "StatType", "line_at_pick": "line",
+        "odds_at_pick": "odds", "projected_value": "Projection", "expected_value": "EV_Over",
+    }, defaults={"date": "2025-01-15", "timestamp_at_pick": "2025-01-14T20:00:00"})
+
+    settled = update_closing_lines_for_unsettled_props(now="2025-01-15T03:00:00")
+    rows = get_clv_db_connection().execute(
+        "SELECT player_name, stat_type, sportsbook, closing_line, clv FROM clv_prop_snapshots ORDER BY id"
+    ).fetchall()
+    flush_clv_log(shutdown=True)
+    close_thread_connections()
+    tmp.cleanup()
+    for row in rows:
+        print(row)
+    expected = [
+        ("Jayson Tatum", "POINTS", "draftkings", 28.5, 1.0),
+        ("Jalen Brunson", "ASSISTS", ANY_SPORTSBOOK, 7.5, 0.5),
+    ]
+    if settled != 2 or rows != expected:
+        sys.exit(f"FAIL: settled {settled}, expected 2 rows {expected}")
+    print("OK: pipeline-shaped picks settle")
+
+
+if __name__ == "__main__":
+    main()
@@ -14,7 +14,7 @@ if spec and spec.loader:
 else:
     raise ImportError(f"Could not import bootstrap from {bootstrap_path}")
 import config
-from providers.odds_adapter import OddsAdapter
+from providers.odds_adapter import OddsAdapter, get_cache_stats
 
 adapter = OddsAdapter(
     db_path=config.DB_PATH,
@@ -42,6 +42,7 @@ if __name__ == "__main__":
         date_format="iso"
     )
     print_ledger()
+    print(f"Cache stats: {get_cache_stats()}")
     print("\nSecond call (should be HIT):")
     adapter.get_odds(
         sport="basketball_nba",
@@ -51,3 +52,4 @@ if __name__ == "__main__":
         date_format="iso"
     )
     print_ledger()
+    print(f"Cache stats: {get_cache_stats()}")